@@ -0,0 +1,31 @@
+"""add uploaded_file thumbnail_ready
+
+Revision ID: 1d7e3b5c9a62
+Revises: 8e2d4f6a1b93
+Create Date: 2026-10-19 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d7e3b5c9a62'
+down_revision: Union[str, None] = '8e2d4f6a1b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Уже построенные миниатюры: python -m app.passport_processing mark-ready
+    op.add_column('uploaded_file', sa.Column(
+        'thumbnail_ready', sa.Boolean(), nullable=False, server_default=sa.false()
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('uploaded_file', 'thumbnail_ready')
@@ -0,0 +1,43 @@
+"""add review claim columns
+
+Revision ID: 3c7f1b9e5d28
+Revises: e5a2c8f4b716
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c7f1b9e5d28'
+down_revision: Union[str, None] = 'e5a2c8f4b716'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user', sa.Column('review_claimed_by_id', sa.Integer(), nullable=True))
+    op.add_column('user', sa.Column('review_claim_expires_at', sa.DateTime(), nullable=True))
+    op.create_foreign_key(
+        'user_review_claimed_by_id_fkey', 'user', 'user', ['review_claimed_by_id'], ['id']
+    )
+    # Очередь читает только pending-заявки по возрастанию id — частичный индекс маленький
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_pending_review', 'user', ['id'],
+            unique=False, postgresql_where=sa.text("verification_status = 'pending'"),
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_pending_review', table_name='user', postgresql_concurrently=True)
+    op.drop_constraint('user_review_claimed_by_id_fkey', 'user', type_='foreignkey')
+    op.drop_column('user', 'review_claim_expires_at')
+    op.drop_column('user', 'review_claimed_by_id')
@@ -0,0 +1,96 @@
+"""partition loginattempt and check_log by month
+
+Revision ID: 4f6d2a8c9e31
+Revises: 9a4b7c3e1f52
+Create Date: 2026-10-19 14:20:00.000000
+
+Обе таблицы только дописываются, поэтому переводим их на помесячное
+RANGE-секционирование: старые месяцы удаляются задачей
+app.jobs.partitions (DETACH + DROP) вместо большого DELETE.
+Первичный ключ секционированной таблицы обязан включать ключ секционирования,
+поэтому он становится (id, <колонка времени>); последовательность id сохраняется.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f6d2a8c9e31'
+down_revision: Union[str, None] = '9a4b7c3e1f52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# таблица → (колонка секционирования, индексы под запросы brute_force.py и лимита проверок)
+PARTITIONED_TABLES = {
+    'loginattempt': ('attempt_time', [
+        ('ix_loginattempt_email_attempt_time', ['email', 'attempt_time']),
+        ('ix_loginattempt_ip_address_attempt_time', ['ip_address', 'attempt_time']),
+    ]),
+    'check_log': ('created_at', [
+        ('ix_check_log_user_id_created_at', ['user_id', 'created_at']),
+    ]),
+}
+# Сколько будущих месяцев создаём заранее (дальше их поддерживает app.jobs.partitions)
+PREMAKE_MONTHS = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, (column, indexes) in PARTITIONED_TABLES.items():
+        op.execute(f'ALTER TABLE {table} RENAME TO {table}_old')
+        op.execute(f'ALTER INDEX IF EXISTS {table}_pkey RENAME TO {table}_old_pkey')
+        op.execute(
+            f'CREATE TABLE {table} (LIKE {table}_old INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE ({column})'
+        )
+        op.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, {column})')
+
+        # секции с месяца самой старой записи до текущего + PREMAKE_MONTHS
+        # (или до самой поздней записи, если она дальше): в DEFAULT при переносе
+        # ничего не попадает, иначе создание секции за такой месяц упадёт
+        op.execute(f"""
+            DO $$
+            DECLARE
+                m date := date_trunc('month', COALESCE((SELECT min({column}) FROM {table}_old), now()));
+                last_month date := greatest(
+                    date_trunc('month', now()) + interval '{PREMAKE_MONTHS} months',
+                    date_trunc('month', (SELECT max({column}) FROM {table}_old))
+                );
+            BEGIN
+                WHILE m <= last_month LOOP
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                        '{table}_p' || to_char(m, 'YYYYMM'), m, (m + interval '1 month')::date
+                    );
+                    m := (m + interval '1 month')::date;
+                END LOOP;
+            END $$;
+        """)
+        # страховка от записи вне созданных секций
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+        op.execute(f'INSERT INTO {table} SELECT * FROM {table}_old')
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+        op.drop_table(f'{table}_old')
+
+        for name, columns in indexes:
+            op.create_index(name, table, columns, unique=False)
+
+    op.create_foreign_key('check_log_user_id_fkey', 'check_log', 'user', ['user_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, (column, indexes) in PARTITIONED_TABLES.items():
+        op.execute(f'ALTER TABLE {table} RENAME TO {table}_partitioned')
+        op.execute(
+            f'CREATE TABLE {table} (LIKE {table}_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        op.execute(f'INSERT INTO {table} SELECT * FROM {table}_partitioned')
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+        op.execute(f'DROP TABLE {table}_partitioned CASCADE')
+        op.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id)')
+
+    op.create_foreign_key('check_log_user_id_fkey', 'check_log', 'user', ['user_id'], ['id'])
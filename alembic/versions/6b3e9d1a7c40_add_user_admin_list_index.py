@@ -0,0 +1,39 @@
+"""add user admin list index
+
+Revision ID: 6b3e9d1a7c40
+Revises: 4f6d2a8c9e31
+Create Date: 2026-10-19 16:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b3e9d1a7c40'
+down_revision: Union[str, None] = '4f6d2a8c9e31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Индекс повторяет ORDER BY списка /admin/users/list: keyset-страница читается с индекса без сортировки
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_admin_list', 'user',
+            [
+                sa.text("(verification_status = 'approved') DESC"),
+                sa.text('created_at DESC'),
+                sa.text('id DESC'),
+            ],
+            unique=False, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_admin_list', table_name='user', postgresql_concurrently=True)
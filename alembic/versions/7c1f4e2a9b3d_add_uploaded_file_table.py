@@ -0,0 +1,53 @@
+"""add uploaded_file table
+
+Revision ID: 7c1f4e2a9b3d
+Revises: ca0dddc49a8c
+Create Date: 2026-10-19 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1f4e2a9b3d'
+down_revision: Union[str, None] = 'ca0dddc49a8c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('uploaded_file',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('key', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('filename', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('key')
+    )
+    op.create_index('ix_uploaded_file_owner_id', 'uploaded_file', ['owner_id'], unique=False)
+    op.create_index('ix_uploaded_file_status_created_at', 'uploaded_file', ['status', 'created_at'], unique=False)
+
+    # уже загруженные паспорта попадают в индекс со статусом владельца
+    op.execute("""
+        INSERT INTO uploaded_file (key, filename, owner_id, created_at, status)
+        SELECT 'passports/' || passport_filename, passport_filename, id, created_at,
+               CASE WHEN verification_status IN ('pending', 'approved', 'rejected')
+                    THEN verification_status ELSE 'rejected' END
+        FROM "user"
+        WHERE passport_filename IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_uploaded_file_status_created_at', table_name='uploaded_file')
+    op.drop_index('ix_uploaded_file_owner_id', table_name='uploaded_file')
+    op.drop_table('uploaded_file')
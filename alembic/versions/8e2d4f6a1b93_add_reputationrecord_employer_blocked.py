@@ -0,0 +1,41 @@
+"""add reputationrecord employer_blocked
+
+Revision ID: 8e2d4f6a1b93
+Revises: 3c7f1b9e5d28
+Create Date: 2026-10-19 18:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2d4f6a1b93'
+down_revision: Union[str, None] = '3c7f1b9e5d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reputationrecord', sa.Column(
+        'employer_blocked', sa.Boolean(), nullable=False, server_default=sa.false()
+    ))
+    op.execute("""
+        UPDATE reputationrecord r
+        SET employer_blocked = TRUE
+        FROM "user" u
+        WHERE u.id = r.employer_id AND u.is_blocked
+    """)
+    op.create_index(op.f('ix_reputationrecord_employee_id'), 'reputationrecord', ['employee_id'], unique=False)
+    # По нему блокировка обновляет записи работодателя
+    op.create_index(op.f('ix_reputationrecord_employer_id'), 'reputationrecord', ['employer_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_reputationrecord_employer_id'), table_name='reputationrecord')
+    op.drop_index(op.f('ix_reputationrecord_employee_id'), table_name='reputationrecord')
+    op.drop_column('reputationrecord', 'employer_blocked')
@@ -0,0 +1,34 @@
+"""add pendinguser created_at index
+
+Revision ID: 9a4b7c3e1f52
+Revises: 2d8e6b5f0a17
+Create Date: 2026-10-19 13:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4b7c3e1f52'
+down_revision: Union[str, None] = '2d8e6b5f0a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует вставки в /register на время построения индекса
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_pendinguser_created_at', 'pendinguser', ['created_at'],
+            unique=False, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_pendinguser_created_at', table_name='pendinguser', postgresql_concurrently=True)
@@ -0,0 +1,52 @@
+"""add user search indexes
+
+Revision ID: e5a2c8f4b716
+Revises: 6b3e9d1a7c40
+Create Date: 2026-10-19 17:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a2c8f4b716'
+down_revision: Union[str, None] = '6b3e9d1a7c40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Индексы под app/user_search.py; CONCURRENTLY — без блокировки записи в "user"
+    with op.get_context().autocommit_block():
+        # LIKE 'префикс%' по btree работает только с *_pattern_ops при не-C локали
+        op.create_index(
+            'ix_user_email_prefix', 'user', [sa.text('email varchar_pattern_ops')],
+            unique=False, postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_user_inn_or_ogrn_prefix', 'user', [sa.text('inn_or_ogrn varchar_pattern_ops')],
+            unique=False, postgresql_concurrently=True
+        )
+        # Подстрока в названии компании и городе — триграммы
+        op.create_index(
+            'ix_user_company_name_trgm', 'user', [sa.text('lower(company_name) gin_trgm_ops')],
+            unique=False, postgresql_using='gin', postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_user_city_trgm', 'user', [sa.text('lower(city) gin_trgm_ops')],
+            unique=False, postgresql_using='gin', postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_city_trgm', table_name='user', postgresql_concurrently=True)
+        op.drop_index('ix_user_company_name_trgm', table_name='user', postgresql_concurrently=True)
+        op.drop_index('ix_user_inn_or_ogrn_prefix', table_name='user', postgresql_concurrently=True)
+        op.drop_index('ix_user_email_prefix', table_name='user', postgresql_concurrently=True)
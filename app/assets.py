@@ -0,0 +1,136 @@
+"""
+Сборка статики: имена с хешем содержимого, сжатые варианты и манифест.
+
+    python -m app.assets build
+
+Каждый файл из static/ копируется в каталог сборки под именем с хешем
+(style.css → /static/dist/style.3f9a1c0b7e.css), рядом кладутся .gz и .br
+(brotli — если установлен пакет brotli) для текстовых форматов. Соответствие
+исходных имён собранным пишется в manifest.json там же.
+
+Каталог сборки — ASSETS_DIST_DIR, по умолчанию static/dist. В Docker он вне
+/app: docker-compose монтирует исходники поверх /app, и сборка из образа
+(или старая static/dist с хоста, которая отдавалась бы как immutable)
+оказалась бы под ними. Там же при ASSETS_BUILD_ON_START=1 статика
+пересобирается при старте контейнера (docker/entrypoint.sh) — по тем
+исходникам, что смонтированы.
+
+В шаблонах ссылки на статику строятся через static_url('style.css'): при
+наличии манифеста — на версию с хешем, которую можно кэшировать навсегда
+(см. app.static), без манифеста (разработка) — на исходный файл.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+from typing import Dict
+
+try:
+    import brotli
+except ImportError:  # без brotli собираем только .gz
+    brotli = None
+
+STATIC_DIR = os.getenv("STATIC_DIR", "static")
+STATIC_URL = "/static/"
+DIST_SUBDIR = "dist"
+DIST_DIR = os.getenv("ASSETS_DIST_DIR") or os.path.join(STATIC_DIR, DIST_SUBDIR)
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 10
+# Картинки (png, jpg, woff2) уже сжаты
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg", ".json", ".txt", ".html", ".map"}
+# Не статика сайта: результат сборки и старые загрузки пользователей (app.storage)
+SKIP_DIRS = {DIST_SUBDIR, "uploads"}
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+logger = logging.getLogger(__name__)
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def _write_compressed(path: str) -> None:
+    with open(path, "rb") as f:
+        data = f.read()
+    variants = {".gz": gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=BROTLI_QUALITY)
+    for suffix, compressed in variants.items():
+        # сжатие, которое не уменьшает файл, не нужно
+        if len(compressed) < len(data):
+            with open(path + suffix, "wb") as f:
+                f.write(compressed)
+
+
+def build(static_dir: str = STATIC_DIR, dist_dir: str = DIST_DIR) -> Dict[str, str]:
+    """Собирает dist_dir заново; возвращает манифест"""
+    shutil.rmtree(dist_dir, ignore_errors=True)
+    os.makedirs(dist_dir, exist_ok=True)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        if root == static_dir:
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for filename in sorted(files):
+            if filename.startswith("."):
+                continue
+            source = os.path.join(root, filename)
+            name = os.path.relpath(source, static_dir).replace(os.sep, "/")
+            stem, ext = os.path.splitext(name)
+            built = f"{stem}.{_file_hash(source)}{ext}"
+
+            target = os.path.join(dist_dir, *built.split("/"))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+            if ext.lower() in COMPRESSIBLE_EXTENSIONS:
+                _write_compressed(target)
+            manifest[name] = f"{DIST_SUBDIR}/{built}"
+
+    with open(os.path.join(dist_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(dist_dir: str = DIST_DIR) -> Dict[str, str]:
+    path = os.path.join(dist_dir, MANIFEST_NAME)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+manifest = load_manifest()
+if not manifest:
+    logger.info("Манифест статики не найден — ссылки на исходные файлы (python -m app.assets build)")
+
+
+def static_url(name: str) -> str:
+    """URL статического файла: версия с хешем из манифеста или исходный файл"""
+    return STATIC_URL + manifest.get(name, name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сборка статики с хешами в именах")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--static-dir", default=STATIC_DIR)
+    parser.add_argument("--dist-dir", default=DIST_DIR)
+    args = parser.parse_args()
+
+    result = build(args.static_dir, args.dist_dir)
+    for name, versioned in sorted(result.items()):
+        print(f"{name} → {versioned}")
+    print(f"Собрано файлов: {len(result)}" + ("" if brotli else " (brotli не установлен: только .gz)"))
+
+
+if __name__ == "__main__":
+    main()
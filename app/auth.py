@@ -11,6 +11,7 @@ from starlette.responses import RedirectResponse
 
 from app.database import get_session
 from app.models import User
+from app.tracing import span
 
 # Загружаем переменные окружения
 load_dotenv()
@@ -22,10 +23,12 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def hash_password(password: str):
-    return pwd_context.hash(password)
+    with span("bcrypt.hash"):
+        return pwd_context.hash(password)
 
 def verify_password(plain: str, hashed: str):
-    return pwd_context.verify(plain, hashed)
+    with span("bcrypt.verify"):
+        return pwd_context.verify(plain, hashed)
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -0,0 +1,231 @@
+"""
+Сжатие ответов (zstd, brotli, gzip) — ASGI-middleware без буферизации потока.
+
+Сжимаются только текстовые типы (HTML, JSON, CSS, JS, SVG): PDF, PNG, JPEG
+и архивы уже сжаты, повторное сжатие тратит CPU впустую. Ответы меньше
+COMPRESSION_MIN_SIZE байт отдаются как есть — выигрыш меньше заголовков и
+задержки на сжатие. Не трогаются ответы, у которых уже есть Content-Encoding
+(app.page_cache, собранная статика), HEAD, 206 и Cache-Control: no-transform.
+
+Алгоритм выбирается по Accept-Encoding в порядке COMPRESSION_ENCODINGS из
+доступных: brotli и zstd — если установлены пакеты brotli и zstandard.
+Уровни и порядок подобраны по benchmarks/compression_bench.py: на /check
+(~65 КБ HTML) zstd-3 сжимает примерно до 7% за ~0.1 мс, brotli-4 — до 6% за
+~0.7 мс, gzip-6 — до 6% за ~0.9 мс; максимальные уровни (br-11, zstd-19)
+стоят десятки–сотни миллисекунд на каждый запрос и не окупаются.
+
+Ответ, пришедший целиком, сжимается разом и получает Content-Length;
+потоковый (StreamingResponse) — по кускам с flush после каждого, чтобы
+клиент получал данные сразу.
+"""
+import os
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.content_encoding import choose_encoding
+
+try:
+    import brotli
+except ImportError:  # без brotli — zstd/gzip
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # без zstandard — brotli/gzip
+    zstandard = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") == "1"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_ENCODINGS = tuple(os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(","))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/problem+json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+}
+# Статусы без тела или с частью файла
+SKIP_STATUSES = {204, 206, 304}
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+class _GzipStream:
+    def __init__(self, level: int = GZIP_LEVEL):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 — формат gzip
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int = BROTLI_QUALITY):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int = ZSTD_LEVEL):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def _gzip_once(data: bytes) -> bytes:
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _available() -> Dict[str, tuple]:
+    """кодировка → (сжатие тела целиком, класс потокового сжатия)"""
+    encoders = {"gzip": (_gzip_once, _GzipStream)}
+    if brotli is not None:
+        encoders["br"] = (lambda data: brotli.compress(data, quality=BROTLI_QUALITY), _BrotliStream)
+    if zstandard is not None:
+        zstd = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        encoders["zstd"] = (zstd.compress, _ZstdStream)
+    return encoders
+
+
+ENCODERS = _available()
+
+
+class CompressionMiddleware:
+    """ASGI-middleware: сжатие текстовых ответов больше minimum_size"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        encodings: tuple = COMPRESSION_ENCODINGS
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = tuple(e for e in encodings if e in ENCODERS)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        encoding = choose_encoding(accept_encoding, self.encodings, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self._send = send
+        self._encoding = encoding
+        self._minimum_size = minimum_size
+        self._start: Optional[Message] = None
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._stream = None
+        self._past_threshold = False
+        # None — ещё не решили; False — отдаём без сжатия
+        self._compress: Optional[bool] = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            headers = Headers(raw=message["headers"])
+            eligible = (
+                message["status"] >= 200
+                and message["status"] not in SKIP_STATUSES
+                and "content-encoding" not in headers
+                and "no-transform" not in headers.get("cache-control", "")
+                and is_compressible(headers.get("content-type", ""))
+            )
+            if eligible:
+                if "accept-encoding" not in headers.get("vary", "").lower():
+                    MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+            else:
+                self._compress = False
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self._compress is False:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._compress is None:
+            # Копим начало ответа, пока не станет ясно, больше ли он порога, и ещё
+            # одно сообщение сверх него: BaseHTTPMiddleware отдаёт любой ответ как
+            # «тело + пустой конец», а такой ответ выгоднее сжать целиком
+            self._buffer.append(body)
+            self._buffered += len(body)
+            if more_body and (self._buffered < self._minimum_size or not self._past_threshold):
+                self._past_threshold = self._buffered >= self._minimum_size
+                return
+            body = b"".join(self._buffer)
+            self._buffer = []
+            if self._buffered < self._minimum_size:
+                self._compress = False
+                await self._send(self._start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            self._compress = True
+            if not more_body:
+                await self._send_whole(body)
+                return
+            await self._start_stream()
+
+        chunk = self._stream.compress(body) if body else b""
+        if not more_body:
+            chunk += self._stream.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _set_encoding(self, content_length: Optional[int]) -> None:
+        headers = MutableHeaders(raw=self._start["headers"])
+        headers["Content-Encoding"] = self._encoding
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        # сжатое тело отличается побайтно — сильный ETag становится слабым
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+
+    async def _send_whole(self, body: bytes) -> None:
+        compress: Callable[[bytes], bytes] = ENCODERS[self._encoding][0]
+        compressed = compress(body)
+        self._set_encoding(len(compressed))
+        await self._send(self._start)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    async def _start_stream(self) -> None:
+        self._stream = ENCODERS[self._encoding][1]()
+        self._set_encoding(None)
+        await self._send(self._start)
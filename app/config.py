@@ -2,11 +2,16 @@
 Конфигурация FastAPI приложения
 """
 from fastapi import FastAPI, Depends
-from fastapi.templating import Jinja2Templates
 
 from app.auth_redirect import AuthRedirectMiddleware
+from app.compression import COMPRESSION_ENABLED, CompressionMiddleware
 from app.limit import rate_limit_100_per_minute
+from app.metrics import MetricsMiddleware
+from app.query_budget import QUERY_BUDGET_MODE, QueryBudgetMiddleware
 from app.security_headers import SecurityHeadersMiddleware
+# Глобальный экземпляр templates — общий для всего приложения
+from app.templating import templates  # noqa: F401
+from app.tracing import TRACING_ENABLED, TracingMiddleware
 
 
 def create_app() -> FastAPI:
@@ -18,9 +23,18 @@ def create_app() -> FastAPI:
     # Добавляем middleware
     app.add_middleware(AuthRedirectMiddleware)
     app.add_middleware(SecurityHeadersMiddleware)
+    # Учёт SQL на запрос — только в тестах и на staging (QUERY_BUDGET_MODE)
+    if QUERY_BUDGET_MODE != "off":
+        app.add_middleware(QueryBudgetMiddleware)
+    # Трассировка — при TRACE_SAMPLE_RATE > 0 и настроенном экспорте
+    if TRACING_ENABLED:
+        app.add_middleware(TracingMiddleware)
+    # Сжатие — снаружи остальных, чтобы видеть итоговые заголовки; выключается,
+    # если ответы сжимает прокси (COMPRESSION_ENABLED=0)
+    if COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware)
+    # Последним — значит самым внешним: время запроса включает остальные middleware
+    app.add_middleware(MetricsMiddleware)
     
     return app
 
-
-# Глобальный экземпляр templates
-templates = Jinja2Templates(directory="templates")
@@ -0,0 +1,124 @@
+"""
+Генерация PDF-согласий сотрудников (consent_template.html → wkhtmltopdf)
+"""
+import zipfile
+from contextvars import copy_context
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Iterable, Iterator, List
+
+import pdfkit
+
+from app.metrics import QUEUE_DEPTH, track_queue
+from app.models import Employee
+from app.templating import env
+from app.tracing import span
+
+# Сколько процессов wkhtmltopdf запускаем одновременно при пакетной выгрузке
+CONSENT_PDF_WORKERS = 4
+# Сколько PDF одновременно в работе и готовых, но ещё не записанных в архив
+CONSENT_PDF_WINDOW = CONSENT_PDF_WORKERS * 2
+PDF_QUEUE = "consent_pdf"
+
+
+def consent_context(employee: Employee, **extra) -> dict:
+    """Данные сотрудника для шаблона согласия (без ORM-объекта, чтобы можно было отдать в поток)"""
+    context = {
+        "employee_id": employee.id,
+        "full_name": employee.full_name,
+        "birth_date": employee.birth_date,
+        "contact": employee.contact or "",
+        "today": datetime.now().strftime("%d.%m.%Y"),
+    }
+    context.update(extra)
+    return context
+
+
+def _render(context: dict) -> bytes:
+    with span("wkhtmltopdf", {"employee.id": context["employee_id"]}):
+        template = env.get_template("consent_template.html")
+        html_content = template.render(**context)
+        return pdfkit.from_string(html_content, False)
+
+
+def render_consent_pdf(context: dict) -> bytes:
+    """Один прогон wkhtmltopdf по consent_template.html"""
+    with track_queue(PDF_QUEUE):
+        return _render(context)
+
+
+def _render_queued(context: dict) -> bytes:
+    # в очередь задача попала при постановке в пул (см. stream_consents_zip)
+    try:
+        return _render(context)
+    finally:
+        QUEUE_DEPTH.labels(PDF_QUEUE).dec()
+
+
+class _ZipSink:
+    """
+    Несикуемый буфер для zipfile: всё, что записано, забирается через drain().
+    Благодаря этому архив отдаётся клиенту по частям и целиком в памяти не лежит.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._buffer.extend(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        return chunk
+
+
+def stream_consents_zip(contexts: Iterable[dict]) -> Iterator[bytes]:
+    """
+    Генерирует PDF параллельно и отдаёт ZIP-архив по мере готовности файлов.
+    Каждая запись добавляется в архив сразу после завершения своего wkhtmltopdf.
+    В работе не больше CONSENT_PDF_WINDOW файлов: готовый PDF отпускается, как
+    только записан, поэтому в памяти не копится весь архив. Если клиент
+    оборвал загрузку, ещё не начатые PDF отменяются.
+    """
+    remaining = iter(contexts)
+    sink = _ZipSink()
+    pool = ThreadPoolExecutor(max_workers=CONSENT_PDF_WORKERS)
+    pending = {}
+
+    def submit_next() -> bool:
+        ctx = next(remaining, None)
+        if ctx is None:
+            return False
+        QUEUE_DEPTH.labels(PDF_QUEUE).inc()
+        # copy_context: спаны wkhtmltopdf из потоков пула попадают в трассу запроса
+        pending[pool.submit(copy_context().run, _render_queued, ctx)] = ctx
+        return True
+
+    try:
+        while len(pending) < CONSENT_PDF_WINDOW and submit_next():
+            pass
+        # PDF уже сжат внутри, повторно жать его нет смысла
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    ctx = pending.pop(future)
+                    archive.writestr(f"consent_{ctx['employee_id']}.pdf", future.result())
+                    submit_next()
+                    yield sink.drain()
+    finally:
+        # не начатые задачи в очередь уже не попадут — убираем их из метрики
+        for future in pending:
+            if future.cancel():
+                QUEUE_DEPTH.labels(PDF_QUEUE).dec()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    # центральный каталог дописывается при закрытии архива
+    tail = sink.drain()
+    if tail:
+        yield tail
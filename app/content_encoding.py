@@ -0,0 +1,40 @@
+"""
+Выбор сжатия ответа по заголовку Accept-Encoding
+"""
+from typing import Dict, Iterable, Optional
+
+# Порядок предпочтения, если клиент принимает несколько (тот же, что у
+# app.compression: zstd распаковывается быстрее всех при близком сжатии)
+PREFERRED_ENCODINGS = ("zstd", "br", "gzip")
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """Accept-Encoding → {кодировка: q}"""
+    result = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        result[coding.strip().lower()] = q
+    return result
+
+
+def choose_encoding(
+    header: str,
+    available: Iterable[str],
+    preferred: Iterable[str] = PREFERRED_ENCODINGS
+) -> Optional[str]:
+    """Лучшая из available, которую принимает клиент (q=0 — отказ)"""
+    accepted = accepted_encodings(header)
+    available = set(available)
+    for coding in preferred:
+        if coding in available and accepted.get(coding, accepted.get("*", 0)) > 0:
+            return coding
+    return None
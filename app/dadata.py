@@ -0,0 +1,296 @@
+"""
+Клиент подсказок DaData (организации, type=party) для автокомплита.
+
+- один httpx.AsyncClient на процесс: keep-alive и HTTP/2 (если установлен
+  пакет h2 — httpx[http2]) вместо нового соединения и TLS на каждое нажатие;
+- жёсткие таймауты: подсказка, пришедшая через несколько секунд, уже не нужна;
+- предохранитель (circuit breaker): после DADATA_BREAKER_FAILURES ошибок
+  подряд (сеть, таймаут, 429, 5xx; прочие 4xx его не трогают) запросы
+  к DaData не отправляются DADATA_BREAKER_RESET_SECONDS секунд и сразу
+  получают DadataUnavailable; затем один пробный запрос;
+- LRU-кэш с TTL по нормализованному запросу («ООО  Ромашка» = «ооо ромашка»).
+  Если для начала запроса («ромаш») уже есть ответ, в котором подсказок
+  меньше DADATA_COUNT (то есть это все найденные организации), ответ на
+  более длинный запрос («ромашка») отбирается из него без обращения к DaData.
+
+Для локального стенда адрес задаётся DADATA_URL (см. benchmarks/dadata_stub.py).
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional
+
+import httpx
+
+from app.metrics import DADATA_REQUESTS
+from app.tracing import http_client_span
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # без h2 — HTTP/1.1 с keep-alive
+    HTTP2_AVAILABLE = False
+
+DADATA_URL = os.getenv("DADATA_URL", "https://suggestions.dadata.ru/suggestions/api/4_1/rs/suggest/party")
+DADATA_TOKEN = os.getenv("DADATA_TOKEN")
+DADATA_COUNT = 10
+DADATA_CONNECT_TIMEOUT = float(os.getenv("DADATA_CONNECT_TIMEOUT", "1.0"))
+DADATA_READ_TIMEOUT = float(os.getenv("DADATA_READ_TIMEOUT", "2.0"))
+DADATA_MAX_CONNECTIONS = int(os.getenv("DADATA_MAX_CONNECTIONS", "20"))
+DADATA_KEEPALIVE_SECONDS = 60
+DADATA_BREAKER_FAILURES = int(os.getenv("DADATA_BREAKER_FAILURES", "5"))
+DADATA_BREAKER_RESET_SECONDS = float(os.getenv("DADATA_BREAKER_RESET_SECONDS", "30"))
+DADATA_CACHE_SIZE = int(os.getenv("DADATA_CACHE_SIZE", "2000"))
+DADATA_CACHE_TTL_SECONDS = float(os.getenv("DADATA_CACHE_TTL_SECONDS", "3600"))
+
+WHITESPACE = re.compile(r"\s+")
+WORD = re.compile(r"\w+")
+
+logger = logging.getLogger(__name__)
+
+
+class DadataUnavailable(Exception):
+    """DaData не ответила, ответила ошибкой или предохранитель разомкнут"""
+
+
+class DadataRejected(DadataUnavailable):
+    """DaData отклонила запрос (4xx, кроме 429) или прислала неразборчивый ответ"""
+
+
+@dataclass
+class Suggestion:
+    value: str
+    inn: str
+    address: str
+
+    @property
+    def display(self) -> str:
+        return f"{self.value}\n{self.inn}  {self.address}"
+
+    def as_dict(self) -> dict:
+        return {"value": self.value, "inn": self.inn, "address": self.address, "display": self.display}
+
+
+def normalize_query(query: str) -> str:
+    return WHITESPACE.sub(" ", query.strip().casefold())
+
+
+# === Предохранитель ===
+
+class CircuitBreaker:
+    """closed → (failures ошибок подряд) → open → (reset_seconds) → half-open → closed/open"""
+
+    def __init__(
+        self,
+        failures: int = DADATA_BREAKER_FAILURES,
+        reset_seconds: float = DADATA_BREAKER_RESET_SECONDS,
+        clock=time.monotonic
+    ):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at < self.reset_seconds:
+            return "open"
+        return "half-open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._probing:
+            # пропускаем один пробный запрос, остальные ждут его результата
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._consecutive = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._consecutive += 1
+        if self._probing or self._consecutive >= self.failures:
+            if self._opened_at is None or self._probing:
+                logger.warning("DaData: предохранитель разомкнут на %.0f с", self.reset_seconds)
+            self._opened_at = self._clock()
+        self._probing = False
+
+
+# === Кэш ===
+
+def _matches(suggestion: Suggestion, words: List[str]) -> bool:
+    """Каждое слово запроса — начало какого-то слова в названии, ИНН или адресе"""
+    haystack = WORD.findall(f"{suggestion.value} {suggestion.inn} {suggestion.address}".casefold())
+    return all(any(token.startswith(word) for token in haystack) for word in words)
+
+
+class SuggestionCache:
+    """LRU с TTL: нормализованный запрос → подсказки"""
+
+    def __init__(
+        self,
+        max_size: int = DADATA_CACHE_SIZE,
+        ttl_seconds: float = DADATA_CACHE_TTL_SECONDS,
+        complete_below: int = DADATA_COUNT,
+        clock=time.monotonic
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # ответ короче этого — полный список совпадений, его можно фильтровать
+        self.complete_below = complete_below
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[List[Suggestion]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, suggestions = entry
+        if expires <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return suggestions
+
+    def get_by_prefix(self, key: str) -> Optional[List[Suggestion]]:
+        """Подсказки для key из полного ответа на его начало, если такой есть"""
+        words = WORD.findall(key)
+        for end in range(len(key) - 1, 1, -1):
+            suggestions = self.get(key[:end].rstrip())
+            if suggestions is None or len(suggestions) >= self.complete_below:
+                continue
+            found = [s for s in suggestions if _matches(s, words)]
+            # DaData ищет нечётко: пустой отбор не доказывает, что совпадений нет
+            return found or None
+        return None
+
+    def put(self, key: str, suggestions: List[Suggestion]) -> None:
+        self._entries[key] = (self._clock() + self.ttl_seconds, suggestions)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# === Клиент ===
+
+def create_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE and transport is None,
+        transport=transport,
+        timeout=httpx.Timeout(DADATA_READ_TIMEOUT, connect=DADATA_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=DADATA_MAX_CONNECTIONS,
+            max_keepalive_connections=DADATA_MAX_CONNECTIONS,
+            keepalive_expiry=DADATA_KEEPALIVE_SECONDS,
+        ),
+        headers={"Authorization": f"Token {DADATA_TOKEN}", "Content-Type": "application/json"},
+    )
+
+
+class DadataSuggestions:
+    def __init__(
+        self,
+        url: str = DADATA_URL,
+        client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[SuggestionCache] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.url = url
+        self._client = client
+        self.cache = cache or SuggestionCache()
+        self.breaker = breaker or CircuitBreaker()
+        # одинаковые запросы, пришедшие одновременно, ждут один ответ DaData
+        self._in_flight: dict = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # создаётся при первом запросе — уже внутри цикла событий воркера
+        if self._client is None:
+            self._client = create_client()
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def suggest(self, query: str) -> List[Suggestion]:
+        key = normalize_query(query)
+        suggestions = self.cache.get(key)
+        if suggestions is not None:
+            DADATA_REQUESTS.labels("hit").inc()
+            return suggestions
+        suggestions = self.cache.get_by_prefix(key)
+        if suggestions is not None:
+            DADATA_REQUESTS.labels("prefix_hit").inc()
+            return suggestions
+
+        pending = self._in_flight.get(key)
+        if pending is None:
+            pending = self._in_flight[key] = asyncio.ensure_future(self._fetch(key))
+            pending.add_done_callback(lambda future: self._forget(key, future))
+        # запрос клиента может оборваться, а ответ DaData всё равно попадёт в кэш
+        return await asyncio.shield(pending)
+
+    def _forget(self, key: str, future: asyncio.Future) -> None:
+        self._in_flight.pop(key, None)
+        if not future.cancelled():
+            future.exception()  # ошибку уже обработали в _fetch; не «never retrieved»
+
+    async def _fetch(self, key: str) -> List[Suggestion]:
+        if not self.breaker.allow():
+            DADATA_REQUESTS.labels("circuit_open").inc()
+            raise DadataUnavailable("предохранитель разомкнут")
+
+        # Предохранитель считает только признаки перегрузки или недоступности
+        # DaData: транспортные ошибки, таймауты, 429 и 5xx
+        try:
+            with http_client_span("POST", self.url):
+                response = await self.client.post(self.url, json={"query": key, "count": DADATA_COUNT})
+            if response.status_code == 429 or response.status_code >= 500:
+                raise DadataUnavailable(f"HTTP {response.status_code}")
+        except (httpx.HTTPError, DadataUnavailable) as exc:
+            self.breaker.record_failure()
+            DADATA_REQUESTS.labels("error").inc()
+            logger.warning("DaData: ошибка подсказок: %r", exc)
+            raise DadataUnavailable(str(exc)) from exc
+
+        self.breaker.record_success()
+        try:
+            # 400/401/403 — ошибка запроса или токена: DaData доступна, ждать нечего
+            response.raise_for_status()
+            suggestions = [
+                Suggestion(
+                    value=item["value"],
+                    inn=item["data"].get("inn") or "",
+                    address=(item["data"].get("address") or {}).get("value") or "",
+                )
+                for item in response.json().get("suggestions", [])
+            ]
+        except (httpx.HTTPError, ValueError, KeyError, TypeError, AttributeError) as exc:
+            DADATA_REQUESTS.labels("rejected").inc()
+            logger.error("DaData: запрос отклонён или ответ не разобран: %r", exc)
+            raise DadataRejected(str(exc)) from exc
+
+        DADATA_REQUESTS.labels("fetched").inc()
+        self.cache.put(key, suggestions)
+        return suggestions
+
+
+dadata = DadataSuggestions()
@@ -1,13 +1,74 @@
 import os
+import time
+from typing import List, Optional
+
 from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlmodel import create_engine, Session
 from sqlalchemy.orm import sessionmaker
 
+from app.metrics import SqlMetrics
+from app.query_budget import QUERY_BUDGET_MODE, QueryBudgetObserver
+from app.tracing import TRACING_ENABLED, SqlTracing
+
 load_dotenv()
 
+
+def instrument_statements(engine: Engine, observers: List) -> None:
+    """
+    Один набор событий engine для всех, кому нужны SQL-выражения: метрики,
+    бюджет запросов, трассировка. Время выражения меряется один раз.
+
+    У наблюдателя два метода:
+      start(statement) -> state            — перед выполнением;
+      end(state, statement, elapsed, error) — после (error — исключение или None).
+    """
+    if not observers:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        states = [observer.start(statement) for observer in observers]
+        conn.info.setdefault("sql_observed", []).append((time.perf_counter(), states))
+
+    def _finish(conn, statement: str, error: Optional[BaseException]) -> None:
+        started, states = conn.info["sql_observed"].pop()
+        elapsed = time.perf_counter() - started
+        raised = None
+        for observer, state in zip(observers, states):
+            # QueryBudgetObserver в режиме raise бросает исключение — остальные
+            # наблюдатели (например, спан трассировки) всё равно должны закончить
+            try:
+                observer.end(state, statement, elapsed, error)
+            except Exception as exc:
+                raised = raised or exc
+        if raised is not None:
+            raise raised
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        _finish(conn, statement, None)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        # after_cursor_execute при ошибке не вызывается
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("sql_observed"):
+            _finish(conn, exception_context.statement or "", exception_context.original_exception)
+
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 engine = create_engine(DATABASE_URL, echo=True, pool_pre_ping=True)
 
+_observers = [SqlMetrics()]
+# Учёт SQL на запрос — только в тестах и на staging (QUERY_BUDGET_MODE)
+if QUERY_BUDGET_MODE != "off":
+    _observers.append(QueryBudgetObserver())
+if TRACING_ENABLED:
+    _observers.append(SqlTracing(engine.dialect.name))
+instrument_statements(engine, _observers)
+
 def get_session():
     with Session(engine) as session:
         yield session
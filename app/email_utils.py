@@ -1,3 +1,4 @@
+import logging
 import smtplib
 import os
 from dotenv import load_dotenv
@@ -5,6 +6,9 @@ import ssl
 from email.mime.text import MIMEText
 from email.utils import formataddr
 
+from app.metrics import EMAILS_SENT, track_queue
+from app.tracing import KIND_CLIENT, span
+
 load_dotenv()
 
 SMTP_USER = "noreply@truststaff.ru"
@@ -13,6 +17,29 @@ SMTP_HOST = os.getenv("SMTP_HOST")
 SMTP_PORT = os.getenv("SMTP_PORT")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
 
+logger = logging.getLogger(__name__)
+
+
+def _send(msg: MIMEText, to_addr: str, kind: str) -> bool:
+    """Отправка через SMTP_SSL; kind — тип письма для логов и метрик"""
+    try:
+        with track_queue("email"), span("smtp.send", {"email.kind": kind, "server.address": SMTP_HOST or ""}, KIND_CLIENT):
+            # Безопасный TLS-контекст — проверка сертификата включена
+            ctx = ssl.create_default_context()
+
+            # ➜ подключение, авторизация, отправка
+            with smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, context=ctx) as server:
+                server.login(SMTP_USER, SMTP_PASSWORD)
+                server.sendmail(SMTP_USER, [to_addr], msg.as_string())
+    except Exception as exc:
+        EMAILS_SENT.labels(kind, "error").inc()
+        logger.error("Ошибка отправки письма (%s) через %s: %r", kind, SMTP_HOST, exc)
+        return False
+
+    EMAILS_SENT.labels(kind, "ok").inc()
+    logger.info("Письмо (%s) отправлено через %s", kind, SMTP_HOST)
+    return True
+
 # ----------------------------------------------------------
 def send_verification_email(to_addr: str, token: str) -> bool:
     link = f"https://app.truststaff.ru/verify?token={token}"
@@ -63,21 +90,7 @@ def send_verification_email(to_addr: str, token: str) -> bool:
     msg["From"] = formataddr((SENDER_NAME, SMTP_USER))
     msg["To"] = to_addr
 
-    try:
-        # Безопасный TLS-контекст — проверка сертификата включена
-        ctx = ssl.create_default_context()
-
-        # ➜ подключение, авторизация, отправка
-        with smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, context=ctx) as server:
-            server.login(SMTP_USER, SMTP_PASSWORD)
-            server.sendmail(SMTP_USER, [to_addr], msg.as_string())
-
-        print("📤 Email отправлен через sm17.hosting.reg.ru")
-        return True
-
-    except Exception as exc:
-        print("❌ Ошибка отправки письма:", repr(exc))
-        return False
+    return _send(msg, to_addr, "verification")
 
 
 def send_password_reset_email(to_addr: str, token: str) -> bool:
@@ -130,18 +143,7 @@ def send_password_reset_email(to_addr: str, token: str) -> bool:
     msg["From"] = formataddr((SENDER_NAME, SMTP_USER))
     msg["To"] = to_addr
 
-    try:
-        ctx = ssl.create_default_context()
-        with smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, context=ctx) as server:
-            server.login(SMTP_USER, SMTP_PASSWORD)
-            server.sendmail(SMTP_USER, [to_addr], msg.as_string())
-
-        print("📤 Email отправлен через sm17.hosting.reg.ru")
-        return True
-
-    except Exception as exc:
-        print("❌ Ошибка отправки письма:", repr(exc))
-        return False
+    return _send(msg, to_addr, "password_reset")
 
 
 def send_2fa_code(to_addr: str, code: str) -> bool:
@@ -178,13 +180,4 @@ def send_2fa_code(to_addr: str, code: str) -> bool:
     msg["From"] = formataddr((SENDER_NAME, SMTP_USER))
     msg["To"] = to_addr
 
-    try:
-        ctx = ssl.create_default_context()
-        with smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, context=ctx) as server:
-            server.login(SMTP_USER, SMTP_PASSWORD)
-            server.sendmail(SMTP_USER, [to_addr], msg.as_string())
-        print("2FA код отправлен на email:", to_addr)
-        return True
-    except Exception as exc:
-        print("Ошибка отправки 2FA-кода:", repr(exc))
-        return False
+    return _send(msg, to_addr, "2fa")
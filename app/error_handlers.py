@@ -2,9 +2,8 @@
 Обработчики ошибок приложения
 """
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.templating import Jinja2Templates
 
-templates = Jinja2Templates(directory="templates")
+from app.page_cache import cached_page
 
 
 def setup_error_handlers(app: FastAPI) -> None:
@@ -13,8 +12,4 @@ def setup_error_handlers(app: FastAPI) -> None:
     @app.exception_handler(404)
     async def not_found(request: Request, exc: HTTPException):
         """Отдаём HTML-страницу 404 с кнопкой «На главную»."""
-        return templates.TemplateResponse(
-            "404.html",
-            {"request": request},
-            status_code=404
-        )
+        return cached_page(request, "404.html", status_code=404)
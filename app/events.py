@@ -1,23 +1,33 @@
 """
 Обработчики событий приложения (startup/shutdown)
+
+Периодические задачи здесь не запускаются: они выполняются отдельным
+процессом `python -m app.worker`, чтобы не дублироваться в каждом
+uvicorn-воркере.
 """
 from fastapi import FastAPI
-from apscheduler.schedulers.background import BackgroundScheduler
 
-from app.jobs.cleanup_PU import cleanup_pending_users
+from app.dadata import dadata
+from app.metrics import mark_process_dead
+from app.passport_processing import shutdown_processing_pool
+from app.templating import precompile_templates
 
 
 def setup_events(app: FastAPI) -> None:
     """Настройка обработчиков событий приложения"""
-    scheduler = BackgroundScheduler()
 
     @app.on_event("startup")
     def startup_event():
-        """Запуск фоновых задач при старте приложения"""
-        scheduler.add_job(cleanup_pending_users, 'interval', minutes=10)
-        scheduler.start()
+        """Компиляция всех шаблонов до первого запроса"""
+        precompile_templates()
 
     @app.on_event("shutdown")
     def shutdown_event():
-        """Остановка фоновых задач при завершении приложения"""
-        scheduler.shutdown()
+        """Остановка пула обработки загрузок при завершении приложения"""
+        shutdown_processing_pool()
+        mark_process_dead()
+
+    @app.on_event("shutdown")
+    async def close_http_clients():
+        """Закрытие соединений с DaData"""
+        await dadata.close()
@@ -2,7 +2,7 @@ from sqlmodel import SQLModel
 from app.database import engine # или app.database, если внутри пакета
 
 # Явный импорт всех моделей
-from app.models import User, Employee, ReputationRecord, LoginAttempt, PendingUser, CheckLog, RateLimit
+from app.models import User, Employee, ReputationRecord, LoginAttempt, PendingUser, CheckLog, RateLimit, UploadedFile, JobRun
 
 def init():
     SQLModel.metadata.create_all(engine)
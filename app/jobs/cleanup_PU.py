@@ -1,23 +1,63 @@
 from datetime import datetime, timedelta
+import logging
+import os
+import time
+
+from sqlalchemy import delete, select
+
 from app.database import SessionLocal
+from app.metrics import JOB_ROWS
 from app.models import PendingUser
-import logging
+
+# Сколько живёт незавершённая регистрация
+PENDING_USER_TTL_MINUTES = int(os.getenv("PENDING_USER_TTL_MINUTES", "30"))
+# Короткие транзакции: пачка строк по индексу created_at, затем commit
+BATCH_SIZE = 500
+MAX_BATCHES_PER_RUN = 200
 
 
-def cleanup_pending_users():
+def _delete_batch(session, cutoff: datetime) -> int:
+    ids = select(PendingUser.id).where(
+        PendingUser.created_at < cutoff
+    ).order_by(PendingUser.created_at).limit(BATCH_SIZE).with_for_update(skip_locked=True)
+
+    result = session.execute(
+        delete(PendingUser).where(PendingUser.id.in_(ids.scalar_subquery()))
+    )
+    session.commit()
+    return result.rowcount
+
+
+def cleanup_pending_users() -> dict:
+    started = time.monotonic()
+    cutoff = datetime.utcnow() - timedelta(minutes=PENDING_USER_TTL_MINUTES)
+    deleted_count = 0
+    batches = 0
+
     session = SessionLocal()
     try:
-        cutoff = datetime.utcnow() - timedelta(minutes=30)
-        deleted_count = session.query(PendingUser).filter(
-            PendingUser.created_at < cutoff
-        ).delete(synchronize_session=False)
-        session.commit()
-        msg = f"Удалено {deleted_count} PendingUser старше 30 минут (до {cutoff.isoformat()}Z)"
-        logging.info(msg)
-        print(msg)
+        while batches < MAX_BATCHES_PER_RUN:
+            count = _delete_batch(session, cutoff)
+            batches += 1
+            deleted_count += count
+            # после каждого коммита: удалённое уже не вернётся, даже если следующая пачка упадёт
+            JOB_ROWS.labels("cleanup_pending_users", "deleted").inc(count)
+            if count < BATCH_SIZE:
+                break
     finally:
         session.close()
 
+    metrics = {
+        "rows_deleted": deleted_count,
+        "batches": batches,
+        "duration_seconds": round(time.monotonic() - started, 3),
+    }
+    logging.info(
+        "Удалено %s PendingUser старше %s минут (до %sZ): %s",
+        deleted_count, PENDING_USER_TTL_MINUTES, cutoff.isoformat(), metrics
+    )
+    return metrics
+
 
 if __name__ == "__main__":
-    cleanup_pending_users()
\ No newline at end of file
+    print(cleanup_pending_users())
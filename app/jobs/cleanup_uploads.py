@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+import logging
+import os
+import time
+
+from sqlalchemy import delete, select, update
+
+from app.database import SessionLocal
+from app.models import UploadedFile, User
+from app.passport_processing import preview_name, thumb_name
+from app.storage import get_storage, preview_key
+
+# Сколько храним документ после того, как заявка рассмотрена
+UPLOAD_RETENTION_HOURS = int(os.getenv("UPLOAD_RETENTION_HOURS", "24"))
+# Размер пачки и предел пачек за один запуск: короткие транзакции, ограниченное время работы
+BATCH_SIZE = 200
+MAX_BATCHES_PER_RUN = 50
+
+# Документы по заявкам на рассмотрении не трогаем никогда
+RETAINED_STATUSES = ("pending",)
+
+
+def _delete_batch(session, cutoff: datetime) -> int:
+    rows = session.execute(
+        select(UploadedFile.id, UploadedFile.key, UploadedFile.filename)
+        .where(
+            UploadedFile.status.not_in(RETAINED_STATUSES),
+            UploadedFile.created_at < cutoff
+        )
+        .order_by(UploadedFile.created_at)
+        .limit(BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        return 0
+
+    storage = get_storage()
+    for _, key, filename in rows:
+        storage.delete_object(key)
+        storage.delete_object(preview_key(preview_name(filename)))
+        storage.delete_object(preview_key(thumb_name(filename)))
+
+    filenames = [filename for _, _, filename in rows]
+    session.execute(
+        update(User)
+        .where(User.passport_filename.in_(filenames))
+        .values(passport_filename=None)
+    )
+    session.execute(delete(UploadedFile).where(UploadedFile.id.in_([row_id for row_id, _, _ in rows])))
+    session.commit()
+    return len(rows)
+
+
+def cleanup_expired_uploads() -> dict:
+    """Удаляет документы рассмотренных заявок старше UPLOAD_RETENTION_HOURS"""
+    started = time.monotonic()
+    cutoff = datetime.utcnow() - timedelta(hours=UPLOAD_RETENTION_HOURS)
+    deleted = 0
+    batches = 0
+
+    session = SessionLocal()
+    try:
+        while batches < MAX_BATCHES_PER_RUN:
+            count = _delete_batch(session, cutoff)
+            if not count:
+                break
+            deleted += count
+            batches += 1
+    finally:
+        session.close()
+
+    metrics = {
+        "files_deleted": deleted,
+        "batches": batches,
+        "duration_seconds": round(time.monotonic() - started, 3),
+        "backlog_left": batches == MAX_BATCHES_PER_RUN,
+    }
+    logging.info("Очистка загрузок: %s (до %sZ)", metrics, cutoff.isoformat())
+    return metrics
+
+
+if __name__ == "__main__":
+    print(cleanup_expired_uploads())
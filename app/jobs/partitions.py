@@ -0,0 +1,159 @@
+from datetime import date
+import logging
+import os
+import re
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.database import engine
+
+# таблица → (колонка секционирования, сколько месяцев храним)
+PARTITIONED_TABLES = {
+    "loginattempt": ("attempt_time", int(os.getenv("LOGIN_ATTEMPT_RETENTION_MONTHS", "3"))),
+    "check_log": ("created_at", int(os.getenv("CHECK_LOG_RETENTION_MONTHS", "12"))),
+}
+# Сколько будущих месяцев держим созданными заранее
+PREMAKE_MONTHS = 3
+# Если задано — устаревшие секции не удаляются, а переносятся в эту схему (архив)
+PARTITION_ARCHIVE_SCHEMA = os.getenv("PARTITION_ARCHIVE_SCHEMA")
+
+PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def _existing_partitions(conn, table: str) -> list:
+    rows = conn.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:parent AS regclass)
+    """), {"parent": table}).scalars().all()
+    return list(rows)
+
+
+def _default_partition(conn, table: str) -> Optional[str]:
+    return conn.execute(text("""
+        SELECT c.relname
+        FROM pg_partitioned_table p
+        JOIN pg_class c ON c.oid = p.partdefid
+        WHERE p.partrelid = CAST(:parent AS regclass)
+    """), {"parent": table}).scalar()
+
+
+def _months_in_default(conn, default: str, column: str) -> list:
+    return [
+        row.date() for row in conn.execute(text(
+            f"SELECT DISTINCT date_trunc('month', {column}) FROM {default}"
+        )).scalars()
+    ]
+
+
+def _create_from_default(conn, table: str, default: str, column: str, name: str, month: date) -> int:
+    """
+    Секция за месяц, строки которого уже попали в DEFAULT: CREATE ... PARTITION OF
+    в этом случае падает. Создаём отдельную таблицу, переносим в неё строки
+    из DEFAULT и присоединяем её как секцию — всё в одной транзакции.
+    """
+    start, end = month.isoformat(), _add_months(month, 1).isoformat()
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = conn.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {default} WHERE {column} >= '{start}' AND {column} < '{end}' RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """)).rowcount
+    conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"))
+    logging.warning("Секция %s создана из %s: перенесено строк %s", name, default, moved)
+    return moved
+
+
+def _maintain_table(conn, table: str, column: str, retention_months: int, this_month: date) -> dict:
+    existing = set(_existing_partitions(conn, table))
+    created = []
+    removed = []
+    moved_from_default = 0
+    oldest_kept = _add_months(this_month, -retention_months)
+
+    # Строки вне созданных секций (воркер долго не работал, даты из будущего)
+    # лежат в DEFAULT; для месяцев в сроке хранения делаем им секции
+    default = _default_partition(conn, table)
+    default_months = set(_months_in_default(conn, default, column)) if default else set()
+    months = {_add_months(this_month, offset) for offset in range(PREMAKE_MONTHS + 1)}
+    months |= {month for month in default_months if month >= oldest_kept}
+
+    for month in sorted(months):
+        name = _partition_name(table, month)
+        if name in existing:
+            continue
+        if month in default_months:
+            moved_from_default += _create_from_default(conn, table, default, column, name, month)
+        else:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+            ))
+        created.append(name)
+
+    # Секция целиком старше срока хранения → DETACH + DROP вместо DELETE по строкам
+    for name in sorted(existing):
+        match = PARTITION_SUFFIX.search(name)
+        if not match:
+            continue
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if month >= oldest_kept:
+            continue
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if PARTITION_ARCHIVE_SCHEMA:
+            conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {PARTITION_ARCHIVE_SCHEMA}"))
+        else:
+            conn.execute(text(f"DROP TABLE {name}"))
+        removed.append(name)
+
+    result = {"created": created, "removed": removed, "moved_from_default": moved_from_default}
+    # Осталось только то, что старше срока хранения или у существующей секции
+    # (не должно быть) — разбираться вручную
+    left_in_default = conn.execute(text(f"SELECT count(*) FROM {default}")).scalar() if default else 0
+    if left_in_default:
+        logging.error("В %s остались строки вне секций: %s", default, left_in_default)
+        result["left_in_default"] = left_in_default
+    return result
+
+
+def maintain_partitions() -> dict:
+    """
+    Создаёт секции на будущие месяцы (и на месяцы, строки которых попали в
+    DEFAULT) и убирает секции старше срока хранения
+    """
+    if engine.dialect.name != "postgresql":
+        return {"skipped": "секционирование есть только в PostgreSQL"}
+
+    started = time.monotonic()
+    this_month = date.today().replace(day=1)
+    metrics = {}
+
+    if PARTITION_ARCHIVE_SCHEMA:
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {PARTITION_ARCHIVE_SCHEMA}"))
+
+    for table, (column, retention_months) in PARTITIONED_TABLES.items():
+        # отдельная короткая транзакция на таблицу
+        with engine.begin() as conn:
+            metrics[table] = _maintain_table(conn, table, column, retention_months, this_month)
+
+    metrics["duration_seconds"] = round(time.monotonic() - started, 3)
+    logging.info("Обслуживание секций: %s", metrics)
+    return metrics
+
+
+if __name__ == "__main__":
+    print(maintain_partitions())
@@ -0,0 +1,60 @@
+import logging
+import time
+
+from sqlalchemy import func, select, update
+
+from app.database import SessionLocal
+from app.models import ReputationRecord, User
+
+# Проход по id-диапазонам: каждая пачка — отдельная короткая транзакция
+BATCH_SIZE = 5000
+
+
+def _employer_blocked():
+    return (
+        select(User.is_blocked)
+        .where(User.id == ReputationRecord.employer_id)
+        .scalar_subquery()
+    )
+
+
+def repair_employer_blocked() -> dict:
+    """Сверяет ReputationRecord.employer_blocked с User.is_blocked и исправляет расхождения"""
+    started = time.monotonic()
+    repaired = 0
+    batches = 0
+
+    session = SessionLocal()
+    try:
+        max_id = session.execute(select(func.max(ReputationRecord.id))).scalar() or 0
+        for low in range(0, max_id, BATCH_SIZE):
+            result = session.execute(
+                update(ReputationRecord)
+                .where(
+                    ReputationRecord.id > low,
+                    ReputationRecord.id <= low + BATCH_SIZE,
+                    ReputationRecord.employer_blocked != _employer_blocked()
+                )
+                .values(employer_blocked=_employer_blocked())
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+            repaired += result.rowcount
+            batches += 1
+    finally:
+        session.close()
+
+    metrics = {
+        "rows_repaired": repaired,
+        "batches": batches,
+        "duration_seconds": round(time.monotonic() - started, 3),
+    }
+    if repaired:
+        logging.warning("Флаг employer_blocked расходился с user.is_blocked: %s", metrics)
+    else:
+        logging.info("Проверка employer_blocked: %s", metrics)
+    return metrics
+
+
+if __name__ == "__main__":
+    print(repair_employer_blocked())
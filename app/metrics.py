@@ -0,0 +1,233 @@
+"""
+Метрики Prometheus.
+
+Что собираем:
+  - задержку, число и статусы HTTP-запросов по шаблону маршрута (/admin/user/{user_id},
+    а не по конкретному URL — иначе число рядов растёт без предела);
+  - запросы «в работе»;
+  - SQL: число и время выражений всего и в пересчёте на один HTTP-запрос
+    (через события engine, см. app/database.py);
+  - занятость пула потоков anyio, в котором выполняются sync-обработчики;
+  - глубину фоновых очередей: письма, PDF-согласия, обработка паспортов;
+  - подсказки DaData: ответы из кэша, запросы к DaData, ошибки;
+  - фоновые задачи воркера: запуски по статусам, длительность, обработанные строки.
+
+Отдаются на GET /metrics (app/routes/metrics.py); метрики воркера — на его
+собственном порту WORKER_METRICS_PORT (app/worker.py).
+
+Несколько процессов (uvicorn --workers N / gunicorn): задайте
+PROMETHEUS_MULTIPROC_DIR — пустой каталог, который очищается перед запуском
+сервера. Каждый процесс пишет значения в свои файлы, /metrics их суммирует.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from dotenv import load_dotenv
+
+# PROMETHEUS_MULTIPROC_DIR должен быть в окружении до импорта prometheus_client
+load_dotenv()
+
+import anyio.to_thread
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess, start_http_server
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+STATEMENTS_PER_REQUEST_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+SQL_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP-запросы", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+# маршрут известен только после роутинга, поэтому «в работе» считаем по методу
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP-запросы в работе",
+    ["method"], multiprocess_mode="livesum"
+)
+
+DB_STATEMENTS = Counter(
+    "db_statements_total", "Выполненные SQL-выражения", ["operation"]
+)
+DB_STATEMENT_LATENCY = Histogram(
+    "db_statement_duration_seconds", "Время одного SQL-выражения",
+    ["operation"], buckets=DB_STATEMENT_BUCKETS
+)
+DB_STATEMENTS_PER_REQUEST = Histogram(
+    "http_request_db_statements", "SQL-выражений на один HTTP-запрос",
+    ["route"], buckets=STATEMENTS_PER_REQUEST_BUCKETS
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "http_request_db_seconds", "Суммарное время SQL за HTTP-запрос",
+    ["route"], buckets=LATENCY_BUCKETS
+)
+
+THREADPOOL_IN_USE = Gauge(
+    "threadpool_threads_in_use", "Занятые потоки пула anyio (sync-обработчики)",
+    multiprocess_mode="livesum"
+)
+THREADPOOL_CAPACITY = Gauge(
+    "threadpool_threads_total", "Размер пула потоков anyio",
+    multiprocess_mode="livesum"
+)
+
+QUEUE_DEPTH = Gauge(
+    "background_queue_depth", "Задачи в очереди и в работе",
+    ["queue"], multiprocess_mode="livesum"
+)
+EMAILS_SENT = Counter(
+    "emails_sent_total", "Отправка писем", ["kind", "result"]
+)
+# hit / prefix_hit — из кэша, fetched — запрос к DaData, error, rejected, circuit_open
+DADATA_REQUESTS = Counter(
+    "dadata_suggest_requests_total", "Подсказки DaData", ["result"]
+)
+# Задачи app.worker: success / failed / skipped (задачу уже выполняет другой воркер)
+JOB_RUNS = Counter(
+    "background_job_runs_total", "Запуски фоновых задач", ["job", "status"]
+)
+JOB_DURATION = Histogram(
+    "background_job_duration_seconds", "Длительность фоновых задач", ["job"],
+    buckets=LATENCY_BUCKETS + (60.0, 300.0, 900.0)
+)
+JOB_ROWS = Counter(
+    "background_job_rows_total", "Строки, обработанные фоновыми задачами", ["job", "action"]
+)
+
+
+class _RequestDbUsage:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Счётчик SQL текущего HTTP-запроса; контекст копируется в поток sync-обработчика,
+# поэтому объект общий для middleware и обработчика
+_request_db: ContextVar[Optional[_RequestDbUsage]] = ContextVar("request_db_usage", default=None)
+
+
+def _operation(statement: str) -> str:
+    head = statement.lstrip()[:6].upper()
+    return head if head in SQL_OPERATIONS else "OTHER"
+
+
+class SqlMetrics:
+    """Счётчики SQL-выражений (подключается в app/database.py)"""
+
+    def start(self, statement: str) -> None:
+        return None
+
+    def end(self, state, statement: str, elapsed: float, error: Optional[BaseException]) -> None:
+        if error is not None:
+            return
+        operation = _operation(statement)
+        DB_STATEMENTS.labels(operation).inc()
+        DB_STATEMENT_LATENCY.labels(operation).observe(elapsed)
+        usage = _request_db.get()
+        if usage is not None:
+            usage.statements += 1
+            usage.seconds += elapsed
+
+
+def _sample_threadpool() -> None:
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    THREADPOOL_IN_USE.set(limiter.borrowed_tokens)
+    THREADPOOL_CAPACITY.set(limiter.total_tokens)
+
+
+def _route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    # смонтированные приложения (/static) маршрут не выставляют
+    return scope.get("root_path") or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: время, статус и SQL каждого HTTP-запроса"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        usage = _RequestDbUsage()
+        token = _request_db.set(usage)
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        _sample_threadpool()
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = _route_label(scope)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_LATENCY.labels(method, route).observe(elapsed)
+            DB_STATEMENTS_PER_REQUEST.labels(route).observe(usage.statements)
+            DB_TIME_PER_REQUEST.labels(route).observe(usage.seconds)
+            in_progress.dec()
+            _sample_threadpool()
+            _request_db.reset(token)
+
+
+@contextmanager
+def track_queue(queue: str):
+    """Задача в очереди queue на время блока"""
+    QUEUE_DEPTH.labels(queue).inc()
+    try:
+        yield
+    finally:
+        QUEUE_DEPTH.labels(queue).dec()
+
+
+def _registry() -> CollectorRegistry:
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_latest() -> tuple:
+    """Текст для /metrics и его Content-Type"""
+    _sample_threadpool()
+    return generate_latest(_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int) -> None:
+    """Отдельный HTTP-сервер метрик для процессов без веб-приложения (воркер)"""
+    start_http_server(port, registry=_registry())
+
+
+def mark_process_dead() -> None:
+    """Убирает livesum-показатели завершившегося процесса"""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
@@ -1,4 +1,4 @@
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional
 from datetime import datetime, date
@@ -25,6 +25,9 @@ class User(SQLModel, table=True):
     twofa_code: Optional[str] = Field(default=None, max_length=6)
     twofa_expires_at: Optional[datetime] = Field(default=None)
     twofa_sent_at: Optional[datetime] = Field(default=None)
+    # Аренда заявки на верификацию администратором (app.review_queue)
+    review_claimed_by_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    review_claim_expires_at: Optional[datetime] = None
 
 
 class Employee(SQLModel, table=True):
@@ -43,9 +46,13 @@ class Employee(SQLModel, table=True):
 
 class ReputationRecord(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    employee_id: int = Field(foreign_key="employee.id")
-    employer_id: int = Field(foreign_key="user.id")
+    employee_id: int = Field(foreign_key="employee.id", index=True)
+    employer_id: int = Field(foreign_key="user.id", index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Копия User.is_blocked работодателя: проверка не читает таблицу user.
+    # Обновляется вместе с блокировкой (superadmin.set_users_blocked),
+    # расхождения чинит app.jobs.reputation_consistency
+    employer_blocked: bool = Field(default=False)
 
     position: str
     hired_at: datetime
@@ -58,6 +65,8 @@ class ReputationRecord(SQLModel, table=True):
     employee: Optional[Employee] = Relationship(back_populates="records")
 
 
+# Таблица секционирована по месяцам attempt_time (миграция 4f6d2a8c9e31,
+# обслуживание — app.jobs.partitions); PK в БД — (id, attempt_time)
 class LoginAttempt(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     email: str
@@ -71,10 +80,11 @@ class PendingUser(SQLModel, table=True):
     name: str
     email: str
     password_hash: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     email_verification_token: str  # Храним токен подтверждения
 
 
+# Таблица секционирована по месяцам created_at, как и loginattempt
 class CheckLog(SQLModel, table=True):
     __tablename__ = "check_log"
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -99,3 +109,33 @@ class EmployeeReaction(SQLModel, table=True):
     reaction: str  # 'like' | 'dislike'
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class UploadedFile(SQLModel, table=True):
+    """Индекс загруженных документов: по нему работает очистка, без обхода каталога"""
+    __tablename__ = "uploaded_file"
+    __table_args__ = (Index("ix_uploaded_file_status_created_at", "status", "created_at"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    key: str = Field(unique=True)  # ключ объекта в хранилище (app.storage)
+    filename: str
+    owner_id: int = Field(foreign_key="user.id", index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    status: str = Field(default="pending")  # pending / approved / rejected — как verification_status владельца
+    thumbnail_ready: bool = Field(default=False)  # миниатюра построена (app.passport_processing)
+
+
+class JobRun(SQLModel, table=True):
+    """История запусков фоновых задач воркера (app.worker)"""
+    __tablename__ = "job_run"
+    __table_args__ = (Index("ix_job_run_job_name_started_at", "job_name", "started_at"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    job_name: str
+    worker: str  # hostname:pid процесса, который выполнил задачу
+    started_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    duration_ms: Optional[int] = None
+    status: str = Field(default="running")  # running / success / failed / skipped
+    result: Optional[str] = None  # JSON с метриками задачи
+    error: Optional[str] = None
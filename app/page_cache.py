@@ -0,0 +1,138 @@
+"""
+Кэш готового HTML для статических страниц (/policy, /terms, формы входа,
+регистрации, восстановления пароля, 404).
+
+Страница рендерится один раз на процесс. Единственное, что в ней меняется от
+запроса к запросу, — CSP-nonce из SecurityHeadersMiddleware: при рендере
+вместо него подставляется NONCE_PLACEHOLDER, а при отдаче — nonce текущего
+запроса.
+
+Для страниц без nonce (сейчас это все) заранее считаются сжатые варианты
+(gzip; brotli и zstd — если установлены пакеты brotli и zstandard) и ETag
+для каждого: тела побайтно разные, поэтому и валидаторы разные ("<хэш>",
+"<хэш>-br", ...). Повторный запрос с If-None-Match получает 304, остальные —
+готовые байты без рендера и сжатия.
+Страница с nonce каждый раз разная, поэтому отдаётся без ETag и не сжимается
+заранее.
+
+Кэшировать можно только страницы, которые не зависят от пользователя и
+параметров запроса. При TEMPLATES_AUTO_RELOAD=1 (разработка) кэш не используется.
+"""
+import gzip
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, Response
+
+from app.content_encoding import choose_encoding
+from app.templating import TEMPLATES_AUTO_RELOAD, templates
+
+try:
+    import brotli
+except ImportError:  # без brotli — gzip/zstd
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # без zstandard — gzip/brotli
+    zstandard = None
+
+NONCE_PLACEHOLDER = "__csp_nonce_placeholder__"
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+ZSTD_LEVEL = 19
+CACHE_CONTROL = "no-cache"  # всегда перепроверять по ETag
+
+
+@dataclass
+class CachedPage:
+    body: bytes
+    status_code: int
+    has_nonce: bool
+    etag: Optional[str] = None
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+    # кодировка → ETag сжатого тела
+    encoded_etags: Dict[str, str] = field(default_factory=dict)
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        return self.encoded_etags[encoding] if encoding else self.etag
+
+
+class _PlaceholderState:
+    csp_nonce = NONCE_PLACEHOLDER
+
+
+class _RenderRequest:
+    """Запрос для рендера в кэш: вместо nonce — заглушка, остальное от настоящего запроса"""
+
+    def __init__(self, request: Request):
+        self._request = request
+        self.state = _PlaceholderState()
+
+    def __getattr__(self, name):
+        return getattr(self._request, name)
+
+
+_pages: Dict[Tuple[str, int], CachedPage] = {}
+_lock = threading.Lock()
+
+
+def _build(request: Request, name: str, status_code: int) -> CachedPage:
+    html = templates.get_template(name).render({"request": _RenderRequest(request)})
+    body = html.encode("utf-8")
+    page = CachedPage(body=body, status_code=status_code, has_nonce=NONCE_PLACEHOLDER in html)
+    if not page.has_nonce:
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        page.etag = f'"{digest}"'
+        page.encoded["gzip"] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        if brotli is not None:
+            page.encoded["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+        if zstandard is not None:
+            page.encoded["zstd"] = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+        page.encoded_etags = {encoding: f'"{digest}-{encoding}"' for encoding in page.encoded}
+    return page
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match сравнивается слабо (RFC 9110): W/"x" совпадает с "x" """
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _get(request: Request, name: str, status_code: int) -> CachedPage:
+    key = (name, status_code)
+    page = _pages.get(key)
+    if page is None:
+        with _lock:
+            page = _pages.get(key)
+            if page is None:
+                page = _pages[key] = _build(request, name, status_code)
+    return page
+
+
+def cached_page(request: Request, name: str, status_code: int = 200) -> Response:
+    """Ответ со страницей name из кэша (рендерится при первом обращении)"""
+    if TEMPLATES_AUTO_RELOAD:
+        return templates.TemplateResponse(name, {"request": request}, status_code=status_code)
+
+    page = _get(request, name, status_code)
+    if page.has_nonce:
+        nonce = getattr(request.state, "csp_nonce", "")
+        body = page.body.replace(NONCE_PLACEHOLDER.encode(), nonce.encode())
+        return HTMLResponse(body, status_code=page.status_code, headers={"Cache-Control": "no-store"})
+
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""), page.encoded)
+    headers = {"ETag": page.etag_for(encoding), "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if page.status_code == 200 and _etag_matches(request.headers.get("if-none-match", ""), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        return HTMLResponse(page.encoded[encoding], status_code=page.status_code, headers=headers)
+    return HTMLResponse(page.body, status_code=page.status_code, headers=headers)
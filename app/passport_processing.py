@@ -0,0 +1,196 @@
+"""
+Фоновая обработка загруженных паспортов: превью и миниатюры для /admin/review.
+
+Оригинал не трогаем. В хранилище (app.storage) под префиксом previews/ складываем:
+  <имя>_preview.jpg — ограниченное по стороне JPEG без EXIF
+                      (для PDF — первая страница, отрисованная pdftoppm);
+  <имя>_thumb.jpg   — маленькая миниатюра для списка заявок.
+
+Работа CPU-ёмкая, поэтому выполняется в отдельном пуле процессов,
+а не в потоках uvicorn. Готовность миниатюры отмечается в UploadedFile.thumbnail_ready:
+страница заявок читает флаг одним запросом, без HEAD в хранилище на каждую заявку.
+
+Отметить миниатюры, построенные до появления флага:
+    python -m app.passport_processing mark-ready
+"""
+import logging
+import multiprocessing
+import os
+import subprocess
+import shutil
+import sys
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional, Set
+
+from PIL import Image, ImageOps
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, engine
+from app.metrics import QUEUE_DEPTH
+from app.models import UploadedFile, User
+from app.storage import STORAGE_TMP_DIR, get_storage, passport_key, preview_key
+from app.uploads import file_extension
+
+PREVIEW_MAX_SIDE = 1600
+THUMB_MAX_SIDE = 320
+PREVIEW_QUALITY = 82
+THUMB_QUALITY = 75
+
+PROCESSING_WORKERS = 2
+PDF_RENDER_TIMEOUT = 30
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+logger = logging.getLogger(__name__)
+
+
+def _stem(filename: str) -> str:
+    return os.path.splitext(filename)[0]
+
+
+def preview_name(filename: str) -> str:
+    return f"{_stem(filename)}_preview.jpg"
+
+
+def thumb_name(filename: str) -> str:
+    return f"{_stem(filename)}_thumb.jpg"
+
+
+def users_with_thumbnails(db: Session, users: Iterable[User]) -> Set[int]:
+    """id пользователей, у паспортов которых уже есть миниатюра; один запрос на всю пачку"""
+    keys = [passport_key(u.passport_filename) for u in users if u.passport_filename]
+    if not keys:
+        return set()
+    return set(db.execute(
+        select(UploadedFile.owner_id)
+        .where(UploadedFile.key.in_(keys), UploadedFile.thumbnail_ready)
+    ).scalars())
+
+
+def _mark_thumbnail_ready(filename: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            update(UploadedFile)
+            .where(UploadedFile.key == passport_key(filename))
+            .values(thumbnail_ready=True)
+        )
+
+
+def _save_bounded(image: Image.Image, name: str, max_side: int, quality: int) -> None:
+    """Уменьшаем до max_side и сохраняем JPEG; метаданные (EXIF) не переносятся"""
+    image = image.copy()
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+    os.makedirs(STORAGE_TMP_DIR, exist_ok=True)
+    tmp_path = os.path.join(STORAGE_TMP_DIR, f"{uuid.uuid4().hex}.part")
+    image.save(tmp_path, "JPEG", quality=quality, optimize=True, progressive=True)
+    get_storage().put_object(preview_key(name), tmp_path)
+
+
+def _load_image(source: str) -> Image.Image:
+    with Image.open(source) as img:
+        # учитываем ориентацию из EXIF до того, как его выбросить
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "L"):
+            background = Image.new("RGB", img.size, "white")
+            rgba = img.convert("RGBA")
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            return background
+        return img.convert("RGB")
+
+
+def _render_pdf_first_page(source: str) -> Image.Image:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        out_prefix = os.path.join(tmp_dir, "page")
+        subprocess.run(
+            [
+                "pdftoppm", "-f", "1", "-l", "1", "-singlefile",
+                "-jpeg", "-scale-to", str(PREVIEW_MAX_SIDE),
+                source, out_prefix,
+            ],
+            check=True,
+            timeout=PDF_RENDER_TIMEOUT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        return _load_image(f"{out_prefix}.jpg")
+
+
+def process_passport(filename: str) -> bool:
+    """Строит превью и миниатюру для загруженного паспорта. Выполняется в пуле процессов."""
+    storage = get_storage()
+    key = passport_key(filename)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = storage.local_path(key)
+        if source is None:
+            # удалённое хранилище: скачиваем оригинал во временный файл
+            source = os.path.join(tmp_dir, filename)
+            with storage.get_object(key) as src, open(source, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+
+        if file_extension(filename) == "pdf":
+            image = _render_pdf_first_page(source)
+        else:
+            image = _load_image(source)
+
+    _save_bounded(image, preview_name(filename), PREVIEW_MAX_SIDE, PREVIEW_QUALITY)
+    _save_bounded(image, thumb_name(filename), THUMB_MAX_SIDE, THUMB_QUALITY)
+    _mark_thumbnail_ready(filename)
+    return True
+
+
+def _log_result(filename: str):
+    def callback(future):
+        QUEUE_DEPTH.labels("passport_processing").dec()
+        exc = future.exception()
+        if exc is not None:
+            logger.warning("Не удалось обработать %s: %r", filename, exc)
+    return callback
+
+
+def schedule_passport_processing(filename: str) -> None:
+    """Ставит файл в очередь обработки; запрос не ждёт результата"""
+    global _pool
+    if _pool is None:
+        # spawn: не наследуем потоки и соединения uvicorn-процесса
+        _pool = ProcessPoolExecutor(
+            max_workers=PROCESSING_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    QUEUE_DEPTH.labels("passport_processing").inc()
+    future = _pool.submit(process_passport, filename)
+    future.add_done_callback(_log_result(filename))
+
+
+def shutdown_processing_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def mark_existing_thumbnails() -> int:
+    """Проставляет thumbnail_ready документам, миниатюры которых уже лежат в хранилище"""
+    storage = get_storage()
+    session = SessionLocal()
+    try:
+        uploads = session.query(UploadedFile).filter(UploadedFile.thumbnail_ready.is_(False)).all()
+        marked = 0
+        for upload in uploads:
+            if storage.exists(preview_key(thumb_name(upload.filename))):
+                upload.thumbnail_ready = True
+                marked += 1
+        session.commit()
+        return marked
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["mark-ready"]:
+        print(f"Отмечено миниатюр: {mark_existing_thumbnails()}")
+    else:
+        print(__doc__)
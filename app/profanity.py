@@ -0,0 +1,178 @@
+"""
+Поиск нецензурных слов из app.bad_words за один проход по тексту.
+
+Список компилируется при импорте в автомат Ахо–Корасик (полная таблица
+переходов), поэтому проверка линейна по длине текста и не зависит от числа
+слов. Несколько полей проверяются одним вызовом: contains_profanity(*поля).
+
+Перед поиском и текст, и слова из списка нормализуются одинаково:
+  - нижний регистр (ё не сворачивается в е: иначе «ёб» находится в «тебе»);
+  - leetspeak: цифры и символы рядом с буквами — sh1t, a$$, п0дор, 3алупа;
+    серии длиннее двух символов не трогаем, чтобы телефоны и почта
+    вида ivan455@mail.ru не превращались в слова. Поэтому слово из списка
+    ищется и в исходном написании (строчными) по тексту, где leet не
+    раскрыт: «wh0r3123», «a$$123» — серия с цифрами после слова длинная;
+  - маскировка: f*ck, s.hit, a**hole — символы внутри слова убираются;
+  - латинские двойники кириллицы (a, c, e, o, p, x, y, k, m, t, i): текст
+    дополнительно проверяется в написании, где они заменены кириллицей —
+    «xуй», «мандa», «cyka». Кириллица в латиницу не переводится — иначе
+    «соска» совпала бы с «cock»;
+  - повторы букв: «хуууй», «reeetard» — сжатое написание проверяется вместе
+    с исходным (слова короче MIN_COLLAPSED_LENGTH после сжатия не сжимаются:
+    «ass» не должно превращаться в «as»). В тексте сжимаются только серии
+    из трёх и более букв: обычные двойные буквы в именах и названиях
+    («Cook», «Kookaburra») иначе совпадали бы с короткими словами списка.
+"""
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+from app.bad_words import BAD_WORDS
+
+MIN_COLLAPSED_LENGTH = 3
+
+# Символы, которыми заменяют или маскируют буквы
+LEET_CHARS = "0123456789@$!+|*#._-"
+LEET_LATIN = str.maketrans({
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "6": "g", "7": "t", "9": "g",
+    "@": "a", "$": "s", "!": "i", "+": "t", "|": "l",
+    "*": None, "#": None, ".": None, "_": None, "-": None,
+})
+LEET_CYRILLIC = str.maketrans({
+    "0": "о", "1": "и", "3": "з", "4": "ч", "6": "б",
+    "@": "а", "!": "и", "+": "т",
+    "*": None, "#": None, ".": None, "_": None, "-": None,
+})
+HOMOGLYPHS = str.maketrans({
+    "a": "а", "c": "с", "e": "е", "o": "о", "p": "р", "x": "х", "y": "у",
+    "k": "к", "m": "м", "t": "т", "i": "и",
+})
+
+_LETTER = r"[^\W\d_]"
+_LEET = "[" + re.escape(LEET_CHARS) + "]"
+# серия из 1–2 leet-символов, вплотную к букве слева или справа
+LEET_RUN = re.compile(
+    rf"(?<={_LETTER}){_LEET}{{1,2}}(?!{_LEET})|(?<!{_LEET}){_LEET}{{1,2}}(?={_LETTER})"
+)
+CYRILLIC = re.compile(r"[а-яё]")
+LATIN = re.compile(r"[a-z]")
+# латинские буквы подряд, у которых у всех есть кириллический двойник
+HOMOGLYPH_RUN = re.compile(r"(?<![a-z])[aceopxykmti]+(?![a-z])")
+REPEATS = re.compile(r"(.)\1+")
+# в тексте — только нарочитые повторы
+TEXT_REPEATS = re.compile(r"(.)\1{2,}")
+
+
+def _unleet(match: re.Match) -> str:
+    # таблица — по соседней букве: 3 в «3алупа» — это «з», в «wh0r3» — «e»
+    text, start, end = match.string, match.start(), match.end()
+    neighbour = text[start - 1] if start and text[start - 1].isalpha() else text[end:end + 1]
+    table = LEET_CYRILLIC if CYRILLIC.match(neighbour) else LEET_LATIN
+    return match.group().translate(table)
+
+
+def _with_collapsed(variants: List[str], repeats: re.Pattern, min_length: int = 0) -> List[str]:
+    result = list(variants)
+    for variant in variants:
+        collapsed = repeats.sub(r"\1", variant)
+        if collapsed != variant and len(collapsed) >= min_length:
+            result.append(collapsed)
+    return result
+
+
+def normalize_word(word: str) -> List[str]:
+    """Написания слова из списка, которые ищутся в тексте"""
+    raw = word.lower()
+    word = LEET_RUN.sub(_unleet, raw)
+    if CYRILLIC.search(word):
+        word = word.translate(HOMOGLYPHS)
+    variants = _with_collapsed([word], REPEATS, MIN_COLLAPSED_LENGTH)
+    if raw not in variants:
+        variants.append(raw)
+    return variants
+
+
+def normalize(text: str) -> str:
+    """
+    Текст для поиска: написание с раскрытым leet, кириллическое (латинские
+    двойники заменены), со сжатыми сериями от трёх букв и исходное строчными —
+    через перевод строки, который не входит ни в одно слово.
+    """
+    raw = text.lower()
+    text = LEET_RUN.sub(_unleet, raw)
+    variants = [text]
+    if LATIN.search(text):
+        folded = HOMOGLYPH_RUN.sub(lambda m: m.group().translate(HOMOGLYPHS), text)
+        if folded != text:
+            variants.append(folded)
+    variants = _with_collapsed(variants, TEXT_REPEATS)
+    if raw != text:
+        variants.append(raw)
+    return "\n".join(variants)
+
+
+class ProfanityMatcher:
+    """Автомат Ахо–Корасик по нормализованным написаниям слов"""
+
+    def __init__(self, words: Iterable[str]):
+        goto: List[Dict[str, int]] = [{}]
+        output: List[Optional[str]] = [None]
+        for word in words:
+            for pattern in normalize_word(word):
+                if not pattern:
+                    continue
+                state = 0
+                for ch in pattern:
+                    nxt = goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[state][ch] = nxt
+                        goto.append({})
+                        output.append(None)
+                    state = nxt
+                if output[state] is None:
+                    output[state] = word
+
+        # Ссылки неудач обходом в ширину и сразу полная таблица переходов:
+        # при поиске на каждый символ приходится один dict.get
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            if output[state] is None:
+                output[state] = output[fail[state]]
+            transitions = dict(delta[fail[state]])
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                transitions[ch] = nxt
+                queue.append(nxt)
+            delta[state] = transitions
+
+        self._delta = delta
+        self._output = output
+
+    def search(self, *texts: Optional[str]) -> Optional[str]:
+        """Первое найденное слово из списка (в исходном написании) или None"""
+        delta, output = self._delta, self._output
+        state = 0
+        for text in texts:
+            if not text:
+                continue
+            # перевод строки сбрасывает автомат между полями
+            for ch in normalize(text) + "\n":
+                state = delta[state].get(ch, 0)
+                if output[state] is not None:
+                    return output[state]
+        return None
+
+    def contains(self, *texts: Optional[str]) -> bool:
+        return self.search(*texts) is not None
+
+
+matcher = ProfanityMatcher(BAD_WORDS)
+
+
+def contains_profanity(*texts: Optional[str]) -> bool:
+    """Есть ли нецензурные слова хотя бы в одном из текстов"""
+    return matcher.contains(*texts)
@@ -0,0 +1,189 @@
+"""
+Бюджет SQL-запросов на HTTP-запрос и поиск N+1 (для тестов и staging).
+
+Включается переменной QUERY_BUDGET_MODE:
+  off   — по умолчанию, ничего не подключается;
+  warn  — превышения пишутся в лог (staging);
+  raise — первое превышение бросает QueryBudgetExceeded прямо из выполняющегося
+          SQL, так что тест падает на строке, которая сделала лишний запрос.
+
+Проверяется:
+  - число SQL-выражений за запрос;
+  - суммарное время SQL;
+  - повторы одного и того же выражения, отличающиеся только параметрами
+    (типичный N+1: запрос в цикле по строкам).
+
+Бюджет по умолчанию задаётся переменными окружения, для отдельного
+обработчика — декоратором @query_budget(...).
+
+В тестах:
+    with observe_requests() as logs:
+        client.get("/check")
+    logs[-1].assert_within(max_statements=10)
+"""
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off")
+DEFAULT_MAX_STATEMENTS = int(os.getenv("QUERY_BUDGET_STATEMENTS", "30"))
+DEFAULT_MAX_DB_MS = int(os.getenv("QUERY_BUDGET_DB_MS", "500"))
+# Сколько раз одно выражение может повториться за запрос, прежде чем это считается N+1
+DEFAULT_MAX_REPEATS = int(os.getenv("QUERY_BUDGET_REPEATS", "5"))
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Budget:
+    max_statements: int = DEFAULT_MAX_STATEMENTS
+    max_db_ms: int = DEFAULT_MAX_DB_MS
+    max_repeats: int = DEFAULT_MAX_REPEATS
+
+
+DEFAULT_BUDGET = Budget()
+
+
+def query_budget(
+    max_statements: int = DEFAULT_MAX_STATEMENTS,
+    max_db_ms: int = DEFAULT_MAX_DB_MS,
+    max_repeats: int = DEFAULT_MAX_REPEATS
+):
+    """Свой бюджет для обработчика (ставится под @router.get/post)"""
+    def decorator(func):
+        func.query_budget = Budget(max_statements, max_db_ms, max_repeats)
+        return func
+    return decorator
+
+
+class QueryLog:
+    """SQL одного HTTP-запроса"""
+
+    def __init__(self, scope: Optional[Scope] = None):
+        self.scope = scope
+        self.statements = 0
+        self.seconds = 0.0
+        self.by_statement = Counter()
+        self.violations: List[str] = []
+        self._slow_reported = False
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route") if self.scope else None
+        return getattr(route, "path", None) or (self.scope or {}).get("path", "")
+
+    def budget(self) -> Budget:
+        # маршрут выставляется роутером, т.е. уже известен, когда обработчик пошёл в БД
+        route = self.scope.get("route") if self.scope else None
+        return getattr(getattr(route, "endpoint", None), "query_budget", DEFAULT_BUDGET)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.statements += 1
+        self.seconds += elapsed
+        self.by_statement[statement] += 1
+
+        budget = self.budget()
+        # каждое нарушение фиксируем один раз — в момент, когда порог перейдён
+        if self.statements == budget.max_statements + 1:
+            self._violate(f"больше {budget.max_statements} SQL-выражений")
+        if self.by_statement[statement] == budget.max_repeats + 1:
+            self._violate(
+                f"N+1: выражение повторено больше {budget.max_repeats} раз: {statement[:200]}"
+            )
+        if self.seconds * 1000 > budget.max_db_ms and not self._slow_reported:
+            self._slow_reported = True
+            self._violate(f"SQL дольше {budget.max_db_ms} мс")
+
+    def _violate(self, message: str) -> None:
+        self.violations.append(message)
+        if QUERY_BUDGET_MODE == "raise":
+            raise QueryBudgetExceeded(f"{self.route}: {message}")
+
+    def repeated(self, min_count: int = 2) -> List[tuple]:
+        return [(stmt, count) for stmt, count in self.by_statement.most_common() if count >= min_count]
+
+    def assert_within(self, max_statements: int, max_repeats: Optional[int] = None) -> None:
+        assert self.statements <= max_statements, (
+            f"{self.route}: {self.statements} SQL-выражений при бюджете {max_statements}"
+        )
+        if max_repeats is not None:
+            worst = self.repeated(max_repeats + 1)
+            assert not worst, f"{self.route}: повторяющиеся выражения {worst[:3]}"
+
+
+_current: ContextVar[Optional[QueryLog]] = ContextVar("query_log", default=None)
+_observers: List[List[QueryLog]] = []
+
+
+class QueryBudgetObserver:
+    """Передаёт выражения в QueryLog текущего запроса (подключается в app/database.py)"""
+
+    def start(self, statement: str) -> None:
+        return None
+
+    def end(self, state, statement: str, elapsed: float, error: Optional[BaseException]) -> None:
+        if error is not None:
+            return
+        log = _current.get()
+        if log is not None:
+            log.record(statement, elapsed)
+
+
+class QueryBudgetMiddleware:
+    """Заводит QueryLog на каждый HTTP-запрос и сообщает о превышениях"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog(scope)
+        token = _current.set(log)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # видно в DevTools браузера (вкладка Timing)
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={log.seconds * 1000:.1f};desc="{log.statements} SQL"'.encode("latin-1")
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if log.violations:
+                logger.warning(
+                    "Бюджет SQL превышен на %s %s: %s (всего %d выражений, %.1f мс)",
+                    scope["method"], log.route, "; ".join(log.violations),
+                    log.statements, log.seconds * 1000
+                )
+            for observed in _observers:
+                observed.append(log)
+
+
+@contextmanager
+def observe_requests():
+    """Собирает QueryLog всех запросов, обработанных внутри блока (для тестов)"""
+    logs: List[QueryLog] = []
+    _observers.append(logs)
+    try:
+        yield logs
+    finally:
+        _observers.remove(logs)
@@ -0,0 +1,133 @@
+"""
+Проверка полей отзыва о сотруднике (ReputationRecord) — общая для HTML-форм
+добавления/редактирования и API.
+
+Все поля отзыва (или пачки отзывов) нормализуются один раз, затем за один
+проход проверяются длина, даты и нецензурные слова во всех текстовых полях.
+Ошибки возвращаются списком {field, message}: форма показывает первую,
+API отдаёт все.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from app.profanity import contains_profanity
+
+MAX_TEXT_LENGTH = 500
+DATE_FORMAT = "%Y-%m-%d"
+
+# Порядок полей — порядок ошибок
+TEXT_FIELDS = {
+    "position": "Должность",
+    "misconduct": "Нарушение",
+    "dismissal_reason": "Причина увольнения",
+    "commendation": "Поощрение",
+}
+RECORD_FIELDS = ("position", "hired_at", "fired_at", "misconduct", "dismissal_reason", "commendation")
+
+
+@dataclass
+class FieldError:
+    field: str
+    message: str
+
+
+@dataclass
+class RecordValidation:
+    # очищенные строки — чтобы заново показать форму с введёнными данными
+    values: Dict[str, str]
+    errors: List[FieldError] = field(default_factory=list)
+    hired_at: Optional[datetime] = None
+    fired_at: Optional[datetime] = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def error(self) -> Optional[str]:
+        return self.errors[0].message if self.errors else None
+
+    def error_list(self) -> List[dict]:
+        return [{"field": e.field, "message": e.message} for e in self.errors]
+
+    def record_fields(self) -> dict:
+        """Значения для ReputationRecord(...) / обновления записи"""
+        return {
+            "position": self.values["position"],
+            "hired_at": self.hired_at,
+            "fired_at": self.fired_at,
+            "misconduct": self.values["misconduct"] or None,
+            "dismissal_reason": self.values["dismissal_reason"] or None,
+            "commendation": self.values["commendation"] or None,
+        }
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(value, DATE_FORMAT)
+    except ValueError:
+        return None
+
+
+def _validate(values: Dict[str, str], now: datetime, scan_profanity: bool) -> RecordValidation:
+    result = RecordValidation(values=values)
+    errors = result.errors
+
+    if not values["position"]:
+        errors.append(FieldError("position", "Укажите должность"))
+    for name, label in TEXT_FIELDS.items():
+        if len(values[name]) > MAX_TEXT_LENGTH:
+            errors.append(FieldError(name, f"{label} не может превышать {MAX_TEXT_LENGTH} символов"))
+
+    result.hired_at = _parse_date(values["hired_at"])
+    if result.hired_at is None:
+        errors.append(FieldError("hired_at", "Некорректная дата приёма"))
+    elif result.hired_at > now:
+        errors.append(FieldError("hired_at", "Дата приёма не может быть в будущем"))
+
+    if values["fired_at"]:
+        result.fired_at = _parse_date(values["fired_at"])
+        if result.fired_at is None:
+            errors.append(FieldError("fired_at", "Некорректная дата увольнения"))
+        elif result.hired_at and result.fired_at < result.hired_at:
+            errors.append(FieldError("fired_at", "Дата увольнения раньше даты приёма"))
+
+    if scan_profanity and contains_profanity(*(values[name] for name in TEXT_FIELDS)):
+        for name, label in TEXT_FIELDS.items():
+            if contains_profanity(values[name]):
+                errors.append(FieldError(name, f"{label}: текст содержит недопустимые слова"))
+
+    return result
+
+
+def _clean(raw: dict) -> Dict[str, str]:
+    return {name: (raw.get(name) or "").strip() for name in RECORD_FIELDS}
+
+
+def validate_records(records: Iterable[dict]) -> List[RecordValidation]:
+    """Проверка пачки отзывов (dict с полями RECORD_FIELDS, значения — строки или None)"""
+    now = datetime.now()
+    cleaned = [_clean(raw) for raw in records]
+    # Один проход автомата по текстовым полям всей пачки; в каких отзывах
+    # и полях совпадение, выясняем, только если что-то нашлось
+    flagged = contains_profanity(*(values[name] for values in cleaned for name in TEXT_FIELDS))
+    return [_validate(values, now, flagged) for values in cleaned]
+
+
+def validate_record(
+    position: Optional[str],
+    hired_at: Optional[str],
+    fired_at: Optional[str] = None,
+    misconduct: Optional[str] = None,
+    dismissal_reason: Optional[str] = None,
+    commendation: Optional[str] = None
+) -> RecordValidation:
+    return validate_records([{
+        "position": position,
+        "hired_at": hired_at,
+        "fired_at": fired_at,
+        "misconduct": misconduct,
+        "dismissal_reason": dismissal_reason,
+        "commendation": commendation,
+    }])[0]
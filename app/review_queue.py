@@ -0,0 +1,150 @@
+"""
+Очередь заявок на верификацию для нескольких администраторов.
+
+Администратор берёт пачку заявок в аренду (claim) на REVIEW_LEASE_MINUTES
+кнопкой на /admin/review (POST; сама страница только показывает уже взятые
+заявки — перезагрузка, prefetch и превью ссылок очередь не трогают).
+Выборка идёт через SELECT ... FOR UPDATE SKIP LOCKED, поэтому двое
+одновременно взявших заявки получают непересекающиеся пачки.
+Незавершённая аренда по истечении срока просто перестаёт учитываться,
+и заявки снова попадают в общую очередь.
+
+Решение (одобрить/отклонить) применяется одним UPDATE на всю пачку и только
+к заявкам, которые ещё pending и арендованы этим администратором.
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models import UploadedFile, User
+
+REVIEW_LEASE_MINUTES = 15
+REVIEW_BATCH_SIZE = 20
+REVIEW_BATCH_MAX = 100
+
+
+def _available_to(admin_id: int, now: datetime):
+    """Заявка свободна, аренда истекла или она уже у этого администратора"""
+    return or_(
+        User.review_claimed_by_id.is_(None),
+        User.review_claim_expires_at < now,
+        User.review_claimed_by_id == admin_id
+    )
+
+
+def claim_batch(db: Session, admin_id: int, size: int = REVIEW_BATCH_SIZE, after_id: int = 0) -> List[User]:
+    """
+    Берёт (или продлевает) аренду до size заявок, начиная после after_id.
+    Свои действующие заявки идут первыми, чтобы обновление страницы не меняло пачку.
+    """
+    now = datetime.utcnow()
+    own_first = case((User.review_claimed_by_id == admin_id, 0), else_=1)
+    ids = db.execute(
+        select(User.id)
+        .where(
+            User.verification_status == "pending",
+            User.id > after_id,
+            _available_to(admin_id, now)
+        )
+        .order_by(own_first, User.id)
+        .limit(size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+
+    if ids:
+        db.execute(
+            update(User)
+            .where(User.id.in_(ids))
+            .values(review_claimed_by_id=admin_id, review_claim_expires_at=now + timedelta(minutes=REVIEW_LEASE_MINUTES))
+        )
+    db.commit()
+    if not ids:
+        return []
+    return db.query(User).filter(User.id.in_(ids)).order_by(User.id).all()
+
+
+def held_batch(db: Session, admin_id: int) -> List[User]:
+    """Заявки, которые сейчас в аренде у администратора; ничего не меняет"""
+    return (
+        db.query(User)
+        .filter(
+            User.verification_status == "pending",
+            User.review_claimed_by_id == admin_id,
+            User.review_claim_expires_at >= datetime.utcnow()
+        )
+        .order_by(User.id)
+        .all()
+    )
+
+
+def release_claims(db: Session, admin_id: int) -> None:
+    """Возвращает все заявки администратора в общую очередь"""
+    db.execute(
+        update(User)
+        .where(User.review_claimed_by_id == admin_id)
+        .values(review_claimed_by_id=None, review_claim_expires_at=None)
+    )
+    db.commit()
+
+
+def queue_stats(db: Session, admin_id: int) -> dict:
+    """Сколько заявок всего и сколько сейчас в работе у других администраторов"""
+    now = datetime.utcnow()
+    claimed_by_others = and_(
+        User.review_claimed_by_id.is_not(None),
+        User.review_claimed_by_id != admin_id,
+        User.review_claim_expires_at >= now
+    )
+    total, busy = db.execute(
+        select(
+            func.count(User.id),
+            func.count(case((claimed_by_others, User.id)))
+        ).where(User.verification_status == "pending")
+    ).one()
+    return {"pending_total": total, "claimed_by_others": busy}
+
+
+def decide(
+    db: Session,
+    admin_id: int,
+    user_ids: List[int],
+    new_status: str,
+    rejection_reason: Optional[str] = None
+) -> List[int]:
+    """
+    Одобряет (approved) или отклоняет (rejected) заявки одним UPDATE.
+    Решение применяется только к заявкам, взятым этим администратором: если аренда
+    истекла, но заявку никто не перехватил, она всё ещё его.
+    Возвращает id заявок, к которым решение действительно применилось.
+    """
+    if not user_ids:
+        return []
+    decided = db.execute(
+        update(User)
+        .where(
+            User.id.in_(user_ids),
+            User.verification_status == "pending",
+            User.review_claimed_by_id == admin_id
+        )
+        .values(
+            verification_status=new_status,
+            is_approved=new_status == "approved",
+            rejection_reason=rejection_reason if new_status == "rejected" else None,
+            review_claimed_by_id=None,
+            review_claim_expires_at=None
+        )
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+    if decided:
+        # Документы заявки после решения становятся доступны для очистки по сроку хранения
+        db.execute(
+            update(UploadedFile)
+            .where(UploadedFile.owner_id.in_(decided), UploadedFile.status == "pending")
+            .values(status=new_status)
+        )
+    db.commit()
+    return decided
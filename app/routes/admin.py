@@ -1,15 +1,33 @@
-from fastapi import APIRouter, Request, Depends, HTTPException, Query
-from fastapi.responses import HTMLResponse, RedirectResponse
+import base64
+import mimetypes
+import os
+import time
+
+from fastapi import APIRouter, Request, Depends, HTTPException, Query, Form
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
-from fastapi.templating import Jinja2Templates
 from starlette import status
+from sqlalchemy import func, case, tuple_
+from typing import List, Optional
+from datetime import datetime, timedelta
 
 from app.auth import get_current_user
 from app.database import get_session
-from app.models import User, Employee
+from app.models import User, Employee, JobRun
+from app.passport_processing import preview_name, thumb_name, users_with_thumbnails
+from app.review_queue import (
+    REVIEW_BATCH_MAX, REVIEW_BATCH_SIZE, REVIEW_LEASE_MINUTES,
+    claim_batch, decide, held_batch, queue_stats, release_claims
+)
+from app.storage import STORAGE_ROOT, get_storage, passport_key, preview_key
+from app.user_search import normalize_query, search_users
+from app.templating import templates
+
+# Если перед приложением стоит nginx с internal-location на STORAGE_ROOT,
+# файл отдаёт сам nginx (sendfile) по заголовку X-Accel-Redirect
+STORAGE_X_ACCEL_PREFIX = os.getenv("STORAGE_X_ACCEL_PREFIX")
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 
 def ensure_admin(current_user: User = Depends(get_current_user)) -> User:
@@ -24,11 +42,78 @@ def ensure_admin(current_user: User = Depends(get_current_user)) -> User:
 def review_employers(
     request: Request,
     db: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    size: int = Query(REVIEW_BATCH_SIZE, ge=1, le=REVIEW_BATCH_MAX)
 ):
     current_user = ensure_admin(current_user)
-    pending = db.query(User).filter(User.verification_status == "pending").all()
-    return templates.TemplateResponse("admin_review.html", {"request": request, "pending": pending})
+    # Только просмотр: заявки берутся в аренду через POST /admin/review/claim
+    pending = held_batch(db, current_user.id)
+    # Миниатюры строятся в фоне; если ещё не готовы — показываем только ссылку на оригинал
+    previews = users_with_thumbnails(db, pending)
+    return templates.TemplateResponse("admin_review.html", {
+        "request": request,
+        "pending": pending,
+        "previews": previews,
+        "stats": queue_stats(db, current_user.id),
+        "lease_minutes": REVIEW_LEASE_MINUTES,
+        "size": size
+    })
+
+
+@router.post("/admin/review/claim")
+def review_claim_batch(
+    after: int = Form(0, ge=0),
+    size: int = Form(REVIEW_BATCH_SIZE, ge=1, le=REVIEW_BATCH_MAX),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(ensure_admin)
+):
+    """Берёт (или продлевает) пачку заявок в аренду этому администратору"""
+    claim_batch(db, current_user.id, size=size, after_id=after)
+    return RedirectResponse(f"/admin/review?size={size}", status_code=302)
+
+
+@router.post("/admin/review/next")
+def review_next_batch(
+    after: int = Form(0, ge=0),
+    size: int = Form(REVIEW_BATCH_SIZE, ge=1, le=REVIEW_BATCH_MAX),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(ensure_admin)
+):
+    """Отпускает текущую пачку и берёт следующую за ней"""
+    release_claims(db, current_user.id)
+    claim_batch(db, current_user.id, size=size, after_id=after)
+    return RedirectResponse(f"/admin/review?size={size}", status_code=302)
+
+
+@router.post("/admin/review/release")
+def review_release(
+    db: Session = Depends(get_session),
+    current_user: User = Depends(ensure_admin)
+):
+    """Возвращает все заявки администратора в общую очередь"""
+    release_claims(db, current_user.id)
+    return RedirectResponse("/", status_code=302)
+
+
+@router.post("/admin/review/approve")
+def bulk_approve(
+    user_ids: List[int] = Form([]),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(ensure_admin)
+):
+    decide(db, current_user.id, user_ids, "approved")
+    return RedirectResponse("/admin/review", status_code=302)
+
+
+@router.post("/admin/review/reject")
+def bulk_reject(
+    user_ids: List[int] = Form([]),
+    rejection_reason: str = Form(...),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(ensure_admin)
+):
+    decide(db, current_user.id, user_ids, "rejected", rejection_reason)
+    return RedirectResponse("/admin/review", status_code=302)
 
 
 @router.post("/admin/approve/{user_id}")
@@ -37,16 +122,62 @@ def approve_user(
     db: Session = Depends(get_session),
     current_user: User = Depends(ensure_admin)
 ):
-    user = db.query(User).get(user_id)
-    if user:
-        user.verification_status = "approved"
-        user.is_approved = True
-        user.rejection_reason = None
-        db.commit()
+    decide(db, current_user.id, [user_id], "approved")
     return RedirectResponse("/admin/review", status_code=302)
 
 
-from fastapi import Form
+def _stored_file_response(key: str, download_name: str) -> Response:
+    """Отдаёт объект из приватного хранилища"""
+    storage = get_storage()
+    media_type = mimetypes.guess_type(download_name)[0] or "application/octet-stream"
+    headers = {
+        "Cache-Control": "private, no-store",
+        "Content-Disposition": f'inline; filename="{download_name}"'
+    }
+
+    path = storage.local_path(key)
+    if path is not None:
+        if STORAGE_X_ACCEL_PREFIX:
+            rel_path = os.path.relpath(path, STORAGE_ROOT).replace(os.sep, "/")
+            headers["X-Accel-Redirect"] = f"{STORAGE_X_ACCEL_PREFIX.rstrip('/')}/{rel_path}"
+            return Response(media_type=media_type, headers=headers)
+        # FileResponse использует zero-copy отправку, если сервер её поддерживает
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    if not storage.exists(key):
+        raise HTTPException(status_code=404)
+    return StreamingResponse(storage.get_object(key), media_type=media_type, headers=headers)
+
+
+@router.get("/admin/passport/{user_id}")
+def admin_passport_original(
+    user_id: int,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(ensure_admin)
+):
+    """Оригинал паспорта — только по явному запросу администратора"""
+    user = db.query(User).get(user_id)
+    if not user or not user.passport_filename:
+        raise HTTPException(status_code=404)
+    return _stored_file_response(passport_key(user.passport_filename), user.passport_filename)
+
+
+@router.get("/admin/passport/{user_id}/{variant}")
+def admin_passport_preview(
+    user_id: int,
+    variant: str,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(ensure_admin)
+):
+    """Превью (preview) или миниатюра (thumb) паспорта"""
+    if variant not in ("preview", "thumb"):
+        raise HTTPException(status_code=404)
+    user = db.query(User).get(user_id)
+    if not user or not user.passport_filename:
+        raise HTTPException(status_code=404)
+    name = preview_name(user.passport_filename) if variant == "preview" else thumb_name(user.passport_filename)
+    return _stored_file_response(preview_key(name), name)
+
 
 @router.post("/admin/reject/{user_id}")
 def reject_user(
@@ -55,87 +186,137 @@ def reject_user(
     db: Session = Depends(get_session),
     current_user: User = Depends(ensure_admin)
 ):
-    user = db.query(User).get(user_id)
-    if user:
-        user.verification_status = "rejected"
-        user.rejection_reason = rejection_reason
-        user.is_approved = False
-        db.commit()
+    decide(db, current_user.id, [user_id], "rejected", rejection_reason)
     return RedirectResponse("/admin/review", status_code=302)
 
 
 @router.get("/admin/search/user", response_class=HTMLResponse)
 def search_user_form(request: Request,
                      current_user: User = Depends(ensure_admin)):
-    """Страница с формой поиска по email"""
+    """Страница поиска: email, компания, ИНН/ОГРН или город"""
     return templates.TemplateResponse("admin_search_user.html",
                                       {"request": request})
 
+@router.get("/admin/search/users", response_class=HTMLResponse)
+def search_users_typeahead(request: Request,
+                           q: str = Query("", max_length=100),
+                           db: Session = Depends(get_session),
+                           current_user: User = Depends(ensure_admin)):
+    """Подсказки для поля поиска: кусок <li>...</li> для вставки в список"""
+    return templates.TemplateResponse("admin_search_users_partial.html",
+                                      {"request": request,
+                                       "users": search_users(db, q)})
+
 @router.post("/admin/search/user", response_class=HTMLResponse)
 def search_user_result(request: Request,
                        email: str = Form(...),
                        db: Session = Depends(get_session),
                        current_user: User = Depends(ensure_admin)):
-    """Обрабатываем форму, показываем пользователя и его сотрудников"""
-    email_clean = email.strip().lower()
-    user = db.query(User).filter(User.email == email_clean).first()
-
+    """Обрабатываем форму: единственное совпадение открываем сразу, иначе показываем список"""
+    query = normalize_query(email)
+    user = db.query(User).filter(User.email == query).first()
     if user is None:
-        return templates.TemplateResponse("admin_search_user.html",
-                                          {"request": request,
-                                           "error": f"Пользователь {email_clean} не найден."})
+        users = search_users(db, query)
+        if len(users) != 1:
+            return templates.TemplateResponse("admin_search_user.html",
+                                              {"request": request,
+                                               "query": query,
+                                               "users": users,
+                                               "error": None if users else f"По запросу «{query}» никого не найдено."})
+        user = users[0]
 
     employees = db.query(Employee).filter(Employee.created_by_user_id == user.id).all()
 
     return templates.TemplateResponse("admin_search_user_result.html",
                                       {"request": request,
-                                       "searched_email": email_clean,
+                                       "searched_email": user.email,
                                        "found_user": user,
                                        "employees": employees})
 
 
+# --- Список пользователей: keyset-пагинация ---
+
+# Порядок списка: сначала одобренные, затем по дате регистрации (новые выше), id — для однозначности.
+# Под него есть индекс ix_user_admin_list по тем же выражениям.
+USERS_LIST_ORDER = (
+    (User.verification_status == "approved").desc(),
+    User.created_at.desc(),
+    User.id.desc()
+)
+USERS_COUNT_TTL_SECONDS = 60
+
+_users_count_cache = {"value": None, "expires": 0.0}
+
+
+def _cached_users_count(db: Session) -> int:
+    """Общее число пользователей, пересчитывается не чаще раза в USERS_COUNT_TTL_SECONDS"""
+    now = time.monotonic()
+    if _users_count_cache["value"] is None or now >= _users_count_cache["expires"]:
+        _users_count_cache["value"] = db.query(func.count(User.id)).scalar()
+        _users_count_cache["expires"] = now + USERS_COUNT_TTL_SECONDS
+    return _users_count_cache["value"]
+
+
+def encode_users_cursor(user: User) -> str:
+    raw = f"{int(user.verification_status == 'approved')}|{user.created_at.isoformat()}|{user.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_users_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        approved, created_at, user_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        if approved not in ("0", "1"):
+            raise ValueError(approved)
+        return approved == "1", datetime.fromisoformat(created_at), int(user_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
+
 @router.get("/admin/users/list", response_class=HTMLResponse)
 def admin_users_list(
     request: Request,
     db: Session = Depends(get_session),
     current_user: User = Depends(ensure_admin),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     limit: int = Query(10, ge=1, le=100),
     partial: bool = Query(False)
 ):
-    total_count = db.query(User).count()
-
-    users = (
-        db.query(User)
-        .order_by(
-            (User.verification_status == "approved").desc(),
-            User.created_at.desc()
+    query = db.query(User)
+    if cursor:
+        # Всё, что идёт в USERS_LIST_ORDER после последней показанной строки
+        query = query.filter(
+            tuple_(User.verification_status == "approved", User.created_at, User.id)
+            < tuple_(*decode_users_cursor(cursor))
         )
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
 
-    has_more = (skip + limit) < total_count
+    # limit + 1: лишняя строка говорит, есть ли следующая страница
+    users = query.order_by(*USERS_LIST_ORDER).limit(limit + 1).all()
+    has_more = len(users) > limit
+    users = users[:limit]
+    next_cursor = encode_users_cursor(users[-1]) if has_more else ""
 
     if partial:
-        # Возвращаем кусок <li>...</li>
-        return templates.TemplateResponse(
+        # Возвращаем кусок <li>...</li>, курсор следующей страницы — в заголовке
+        response = templates.TemplateResponse(
             "admin_users_list_partial.html",
             {
                 "request": request,
-                "users": users
+                "users": users,
+                "current_user": current_user
             }
         )
+        response.headers["X-Next-Cursor"] = next_cursor
+        return response
     else:
         # Возвращаем полный шаблон
         return templates.TemplateResponse("admin_users_list.html", {
             "request": request,
             "users": users,
-            "skip": skip,
             "limit": limit,
             "has_more": has_more,
-            "total_count": total_count,
+            "next_cursor": next_cursor,
+            "total_count": _cached_users_count(db),
             "current_user": current_user
         })
 
@@ -168,3 +349,35 @@ def admin_user_details(
         "found_user": found_user,
         "employees": employees
     })
+
+
+@router.get("/admin/jobs", response_class=HTMLResponse)
+def admin_jobs(
+    request: Request,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(ensure_admin),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """История запусков фоновых задач воркера: длительности и ошибки"""
+    since = datetime.utcnow() - timedelta(hours=24)
+    summary = (
+        db.query(
+            JobRun.job_name,
+            func.count(JobRun.id).label("runs"),
+            func.sum(case((JobRun.status == "failed", 1), else_=0)).label("failures"),
+            func.avg(JobRun.duration_ms).label("avg_ms"),
+            func.max(JobRun.duration_ms).label("max_ms"),
+            func.max(JobRun.started_at).label("last_started_at")
+        )
+        .filter(JobRun.started_at >= since)
+        .group_by(JobRun.job_name)
+        .order_by(JobRun.job_name)
+        .all()
+    )
+    runs = db.query(JobRun).order_by(JobRun.started_at.desc()).limit(limit).all()
+
+    return templates.TemplateResponse("admin_jobs.html", {
+        "request": request,
+        "summary": summary,
+        "runs": runs
+    })
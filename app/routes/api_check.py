@@ -61,8 +61,7 @@ def api_check_employee(
 
         records = db.query(ReputationRecord).filter(ReputationRecord.employee_id == emp.id).all()
         for record in records:
-            employer = db.get(User, record.employer_id)
-            if employer and employer.is_blocked:
+            if record.employer_blocked:
                 emp_data["records"].append({
                     "is_blocked_employer": True,
                     "blocked_message": "Предприниматель заблокирован, отзыв неактуален."
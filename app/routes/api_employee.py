@@ -4,6 +4,7 @@ from typing import Optional
 from sqlmodel import Session
 
 from app.models import User, ReputationRecord
+from app.record_validation import validate_record
 from app.routes.api_auth import get_api_user, get_session, only_approved_api_user
 
 router = APIRouter(prefix="/api")
@@ -24,6 +25,13 @@ def add_record_api(
     if current_user.is_blocked:
         return JSONResponse(status_code=403, content={"error": "Пользователь заблокирован"})
 
+    check = validate_record(position, hired_at, fired_at, misconduct, dismissal_reason, commendation)
+    if not check.ok:
+        return JSONResponse(status_code=400, content={
+            "error": check.error,
+            "errors": check.error_list()
+        })
+
     existing_records_count = db.query(ReputationRecord).filter(
         ReputationRecord.employee_id == employee_id,
         ReputationRecord.employer_id == current_user.id
@@ -37,12 +45,8 @@ def add_record_api(
     record = ReputationRecord(
         employee_id=employee_id,
         employer_id=current_user.id,
-        position=position,
-        hired_at=hired_at,
-        fired_at=fired_at or None,
-        misconduct=misconduct or None,
-        dismissal_reason=dismissal_reason or None,
-        commendation=commendation or None
+        employer_blocked=current_user.is_blocked,
+        **check.record_fields()
     )
     db.add(record)
     db.commit()
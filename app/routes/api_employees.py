@@ -78,11 +78,11 @@ def list_employees_api(
 from fastapi.responses import StreamingResponse
 from fastapi import UploadFile, File, Form, Request, HTTPException, Depends
 from sqlmodel import Session
-from datetime import datetime
-from jinja2 import Environment, FileSystemLoader
-import pdfkit, io
+from typing import List
+import io
 
 from app.models import User, Employee
+from app.consent_pdf import consent_context, render_consent_pdf, stream_consents_zip
 
 @router.post("/{employee_id}/generate-consent")
 def api_generate_consent_pdf(
@@ -99,22 +99,44 @@ def api_generate_consent_pdf(
     if employee.created_by_user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Нет доступа к сотруднику")
 
-    env = Environment(loader=FileSystemLoader("templates"))
-    template = env.get_template("consent_template.html")
-
-    html = template.render(
-        full_name=employee.full_name,
-        birth_date=employee.birth_date,
-        contact=employee.contact or "",
+    pdf_bytes = render_consent_pdf(consent_context(
+        employee,
         employer_company_name=employer_company_name,
-        employer_inn=employer_inn,
-        today=datetime.now().strftime("%d.%m.%Y")
-    )
-
-    pdf_bytes = pdfkit.from_string(html, False)
+        employer_inn=employer_inn
+    ))
     return StreamingResponse(
         io.BytesIO(pdf_bytes),
         media_type="application/pdf",
         headers={"Content-Disposition": f"attachment; filename=consent_{employee.id}.pdf"}
     )
 
+
+@router.post("/generate-consents")
+def api_generate_consents_zip(
+    employer_company_name: str = Form(...),
+    employer_inn: str = Form(...),
+    employee_ids: List[int] = Form([]),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(only_approved_api_user)
+):
+    """ZIP с согласиями по выбранным сотрудникам (или по всем, если список пуст)"""
+    query = db.query(Employee).filter(Employee.created_by_user_id == current_user.id)
+    if employee_ids:
+        query = query.filter(Employee.id.in_(employee_ids))
+    employees = query.all()
+    if not employees:
+        raise HTTPException(status_code=404, detail="Сотрудники не найдены")
+
+    contexts = [
+        consent_context(
+            emp,
+            employer_company_name=employer_company_name,
+            employer_inn=employer_inn
+        )
+        for emp in employees
+    ]
+    return StreamingResponse(
+        stream_consents_zip(contexts),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=consents.zip"}
+    )
@@ -1,24 +1,18 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
+from fastapi import APIRouter, Request, Depends
 from fastapi.responses import JSONResponse
 from sqlmodel import Session
-import os
-import shutil
+from starlette.concurrency import run_in_threadpool
 
 from app.models import User
 from app.routes.api_auth import get_api_user, get_session
-from app.routes.onboarding import ALLOWED_EXTENSIONS, generate_safe_filename
+from app.routes.onboarding import REQUIRED_FIELDS, generate_safe_filename, save_verification_request
+from app.uploads import UploadError, delete_upload, receive_upload
 
 router = APIRouter(prefix="/api/employer")
 
-PASSPORT_UPLOAD_DIR = "media/passports"
-os.makedirs(PASSPORT_UPLOAD_DIR, exist_ok=True)
-
 @router.post("/submit-verification")
 async def submit_verification_api(
-    company_name: str = Form(...),
-    city: str = Form(...),
-    inn_or_ogrn: str = Form(...),
-    passport_file: UploadFile = File(...),
+    request: Request,
     db: Session = Depends(get_session),
     current_user: User = Depends(get_api_user)
 ):
@@ -29,35 +23,22 @@ async def submit_verification_api(
     if current_user.verification_status == "approved":
         return JSONResponse(status_code=400, content={"error": "Вы уже верифицированы"})
 
-    # Проверка формата файла
-    _, ext = os.path.splitext(passport_file.filename)
-    ext = ext.lower().lstrip(".")
-    if ext not in ALLOWED_EXTENSIONS:
-        return JSONResponse(status_code=400, content={"error": f"Недопустимый формат .{ext}"})
-
-    # Проверка размера
-    MAX_MB = 10
-    MAX_SIZE = MAX_MB * 1024 * 1024
-    passport_file.file.seek(0, 2)
-    size = passport_file.file.tell()
-    passport_file.file.seek(0)
-    if size > MAX_SIZE:
-        return JSONResponse(status_code=400, content={"error": "Файл больше 10 МБ"})
-
-    # Сохраняем
-    filename = generate_safe_filename(passport_file.filename, current_user.id)
-    filepath = os.path.join("static", "uploads", filename)
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, "wb") as f:
-        shutil.copyfileobj(passport_file.file, f)
-
-    # Обновляем пользователя
-    current_user.company_name = company_name
-    current_user.city = city
-    current_user.inn_or_ogrn = inn_or_ogrn
-    current_user.passport_filename = filename
-    current_user.verification_status = "pending"
-    current_user.rejection_reason = None
-    db.commit()
-
-    return JSONResponse(status_code=200, content={"message": "Заявка отправлена"})
\ No newline at end of file
+    # Потоковое сохранение с проверкой формата, сигнатуры и размера
+    try:
+        fields, filename = await receive_upload(
+            request,
+            "passport_file",
+            lambda original: generate_safe_filename(original, current_user.id)
+        )
+    except UploadError as exc:
+        return JSONResponse(status_code=400, content={"error": exc.message})
+
+    missing = [name for name in REQUIRED_FIELDS if not fields.get(name, "").strip()]
+    if missing:
+        await run_in_threadpool(delete_upload, filename)
+        return JSONResponse(status_code=400, content={"error": f"Не заполнены поля: {', '.join(missing)}"})
+
+    # Обновляем пользователя (БД — в пуле потоков, не в event loop)
+    await run_in_threadpool(save_verification_request, db, current_user, fields, filename)
+
+    return JSONResponse(status_code=200, content={"message": "Заявка отправлена"})
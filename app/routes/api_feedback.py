@@ -7,6 +7,7 @@ import os
 
 from app.routes.api_auth import get_api_user
 from app.models import User
+from app.tracing import http_client_span
 
 router = APIRouter(prefix="/api")
 
@@ -40,9 +41,11 @@ def submit_feedback(data: FeedbackRequest, current_user: User = Depends(get_api_
     )
 
     if TELEGRAM_TOKEN and TELEGRAM_CHAT_ID:
-        requests.post(
-            f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-            data={"chat_id": TELEGRAM_CHAT_ID, "text": text}
-        )
+        url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
+        with http_client_span("POST", url):
+            requests.post(
+                url,
+                data={"chat_id": TELEGRAM_CHAT_ID, "text": text}
+            )
 
     return {"status": "ok"}
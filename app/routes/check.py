@@ -1,26 +1,28 @@
 from fastapi import APIRouter, Request, Depends, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
-from typing import Optional, List
+from typing import Dict, Optional, List
 from sqlalchemy.orm import Session
 from datetime import date, datetime
 
 from app.database import get_session
 from app.models import User, Employee, ReputationRecord, CheckLog
 from app.auth import get_session_user, only_approved_user
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import text, func
+from app.templating import templates
+from sqlalchemy import bindparam, text, func
 
-templates = Jinja2Templates(directory="templates")
 router = APIRouter()
 
 # === Метрики ===
 
-def inc_check(db, employee_id: int) -> None:
+def inc_checks(db, employee_ids: List[int]) -> None:
+    """+1 пробив всем найденным одним UPDATE"""
+    if not employee_ids:
+        return
     db.execute(text("""
         UPDATE employee
         SET checks_count = COALESCE(checks_count, 0) + 1
-        WHERE id = :id
-    """), {"id": employee_id})
+        WHERE id IN :ids
+    """).bindparams(bindparam("ids", expanding=True)), {"ids": employee_ids})
 
 
 def set_reaction(db: Session, employee_id: int, employer_id: int, new_reaction: str) -> None:
@@ -79,6 +81,54 @@ def set_reaction(db: Session, employee_id: int, employer_id: int, new_reaction:
 
     db.commit()
 
+# === Результат проверки ===
+
+def prepare_record(record: ReputationRecord) -> dict:
+    if record.employer_blocked:
+        return {
+            "is_blocked_employer": True,
+            "blocked_message": "Предприниматель заблокирован, отзыв неактуален."
+        }
+    return {
+        "is_blocked_employer": False,
+        "employer_id": record.employer_id,
+        "position": record.position,
+        "hired_at": record.hired_at,
+        "fired_at": record.fired_at,
+        "misconduct": record.misconduct,
+        "dismissal_reason": record.dismissal_reason,
+        "commendation": record.commendation,
+    }
+
+
+def assemble_check_result(
+    employees: List[Employee],
+    records_by_employee: Dict[int, List[ReputationRecord]],
+    counts: Dict[int, dict],
+    my_reactions: Dict[int, str]
+) -> List[dict]:
+    """Результат проверки для check.html (без обращений к БД)"""
+    result = []
+    for emp in employees:
+        prepared_records = [prepare_record(record) for record in records_by_employee.get(emp.id, [])]
+
+        c = counts.get(emp.id, {"checks": getattr(emp, "checks_count", 0),
+                                "likes": getattr(emp, "likes_count", 0),
+                                "dislikes": getattr(emp, "dislikes_count", 0)})
+
+        result.append({
+            "employee_id": emp.id,
+            "full_name": emp.full_name,
+            "birth_date": emp.birth_date,
+            "records": prepared_records,
+            "record_count": len(prepared_records),
+            "checks_count": c["checks"],
+            "likes_count": c["likes"],
+            "dislikes_count": c["dislikes"],
+            "my_reaction": my_reactions.get(emp.id),
+        })
+    return result
+
 # === Роуты ===
 
 @router.post("/employee/{emp_id}/react")
@@ -157,20 +207,18 @@ def check_employee(
 
     employees = q.all()
 
-    for emp in employees:
-        inc_check(db, emp.id)
-    db.commit()
-
     emp_ids = [e.id for e in employees]
 
+    inc_checks(db, emp_ids)
+
     counts = {}
     if emp_ids:
         rows = db.execute(
             text("""
                 SELECT id, checks_count, likes_count, dislikes_count
                 FROM employee
-                WHERE id = ANY(:ids)
-            """),
+                WHERE id IN :ids
+            """).bindparams(bindparam("ids", expanding=True)),
             {"ids": emp_ids}
         ).fetchall()
         counts = {row[0]: {"checks": row[1], "likes": row[2], "dislikes": row[3]} for row in rows}
@@ -181,50 +229,22 @@ def check_employee(
             text("""
                 SELECT employee_id, reaction
                 FROM employee_reaction
-                WHERE employer_id = :u AND employee_id = ANY(:ids)
-            """),
+                WHERE employer_id = :u AND employee_id IN :ids
+            """).bindparams(bindparam("ids", expanding=True)),
             {"u": current_user.id, "ids": emp_ids}
         ).fetchall()
         my_reactions = {row[0]: row[1] for row in rows}
 
-    result = []
-    for emp in employees:
-        records = db.query(ReputationRecord).filter(ReputationRecord.employee_id == emp.id).all()
-        prepared_records = []
+    # отзывы всех найденных — одним запросом, а не по запросу на сотрудника
+    records_by_employee: Dict[int, List[ReputationRecord]] = {}
+    if emp_ids:
+        records = db.query(ReputationRecord).filter(ReputationRecord.employee_id.in_(emp_ids)).all()
         for record in records:
-            employer = db.get(User, record.employer_id)
-            if employer and employer.is_blocked:
-                prepared_records.append({
-                    "is_blocked_employer": True,
-                    "blocked_message": "Предприниматель заблокирован, отзыв неактуален."
-                })
-            else:
-                prepared_records.append({
-                    "is_blocked_employer": False,
-                    "employer_id": record.employer_id,
-                    "position": record.position,
-                    "hired_at": record.hired_at,
-                    "fired_at": record.fired_at,
-                    "misconduct": record.misconduct,
-                    "dismissal_reason": record.dismissal_reason,
-                    "commendation": record.commendation,
-                })
-
-        c = counts.get(emp.id, {"checks": getattr(emp, "checks_count", 0),
-                                "likes": getattr(emp, "likes_count", 0),
-                                "dislikes": getattr(emp, "dislikes_count", 0)})
-
-        result.append({
-            "employee_id": emp.id,
-            "full_name": emp.full_name,
-            "birth_date": emp.birth_date,
-            "records": prepared_records,
-            "record_count": len(prepared_records),
-            "checks_count": c["checks"],
-            "likes_count": c["likes"],
-            "dislikes_count": c["dislikes"],
-            "my_reaction": my_reactions.get(emp.id),
-        })
+            records_by_employee.setdefault(record.employee_id, []).append(record)
+    result = assemble_check_result(employees, records_by_employee, counts, my_reactions)
+    # коммит после сборки результата: иначе объекты Employee истекут и
+    # перечитаются из БД по одному
+    db.commit()
 
     return templates.TemplateResponse("check.html", {
         "request": request,
@@ -1,30 +1,28 @@
 from datetime import datetime
 from fastapi import APIRouter, Request, Depends, HTTPException, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from typing import Optional
-from jinja2 import Environment, FileSystemLoader
-import pdfkit
+from typing import Optional, List
 import io
 from fastapi.responses import StreamingResponse
 
 from app.database import get_session
 from app.models import Employee, ReputationRecord, User
 from app.auth import get_session_user, only_approved_user, get_current_user_safe, oauth2_scheme_optional
-from app.bad_words import BAD_WORDS
+from app.profanity import contains_profanity
+from app.record_validation import validate_record
+from app.consent_pdf import consent_context, render_consent_pdf, stream_consents_zip
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 # Константы
 MAX_EMPLOYERS_COUNT = 30
-MAX_TEXT_LENGTH = 500
 
 
 def contains_bad_words(text: str) -> bool:
     """Проверка на плохие слова"""
-    return any(bad in text.lower() for bad in BAD_WORDS)
+    return contains_profanity(text)
 
 
 def enforce_login_and_verification(
@@ -81,11 +79,11 @@ def add_employee(
                 "request": request,
                 "error": "Слишком длинное имя или фамилия"
             })
-        if contains_bad_words(value):
-            return templates.TemplateResponse("add_employee.html", {
-                "request": request,
-                "error": "Имя содержит недопустимые слова"
-            })
+    if contains_profanity(last_name, first_name, middle_name):
+        return templates.TemplateResponse("add_employee.html", {
+            "request": request,
+            "error": "Имя содержит недопустимые слова"
+        })
 
     # Валидация даты рождения
     try:
@@ -200,32 +198,14 @@ def add_record(
         response.delete_cookie("access_token")
         return response
 
-    position = position.strip()
-    hired_at = hired_at.strip()
-    fired_at = (fired_at or "").strip()
-    misconduct = (misconduct or "").strip()
-    dismissal_reason = (dismissal_reason or "").strip()
-    commendation = (commendation or "").strip()
-
-    # Валидация длины полей
-    for field_name, field_value in {
-        "Должность": position,
-        "Нарушение": misconduct,
-        "Причина увольнения": dismissal_reason,
-        "Поощрение": commendation
-    }.items():
-        if field_value and len(field_value) > MAX_TEXT_LENGTH:
-            return templates.TemplateResponse("add_record.html", {
-                "request": request,
-                "employee_id": employee_id,
-                "error": f"{field_name} не может превышать {MAX_TEXT_LENGTH} символов",
-                "position": position,
-                "hired_at": hired_at,
-                "fired_at": fired_at,
-                "misconduct": misconduct,
-                "dismissal_reason": dismissal_reason,
-                "commendation": commendation
-            })
+    check = validate_record(position, hired_at, fired_at, misconduct, dismissal_reason, commendation)
+    if not check.ok:
+        return templates.TemplateResponse("add_record.html", {
+            "request": request,
+            "employee_id": employee_id,
+            "error": check.error,
+            **check.values
+        })
 
     # Проверка лимита записей
     existing_records_count = db.query(ReputationRecord).filter(
@@ -238,24 +218,15 @@ def add_record(
             "request": request,
             "employee_id": employee_id,
             "error": "Вы уже добавили 2 записи об этом сотруднике. Дальше добавлять нельзя.",
-            "position": position,
-            "hired_at": hired_at,
-            "fired_at": fired_at,
-            "misconduct": misconduct,
-            "dismissal_reason": dismissal_reason,
-            "commendation": commendation
+            **check.values
         })
 
     # Создание записи
     record = ReputationRecord(
         employee_id=employee_id,
         employer_id=current_user.id,
-        position=position,
-        hired_at=hired_at,
-        fired_at=fired_at or None,
-        misconduct=misconduct or None,
-        dismissal_reason=dismissal_reason or None,
-        commendation=commendation or None
+        employer_blocked=current_user.is_blocked,
+        **check.record_fields()
     )
     db.add(record)
     db.commit()
@@ -293,17 +264,7 @@ def generate_consent_pdf(
     if not employee:
         raise HTTPException(status_code=404, detail="Сотрудник не найден")
 
-    env = Environment(loader=FileSystemLoader("templates"))
-    template = env.get_template("consent_template.html")
-
-    html_content = template.render(
-        full_name=employee.full_name,
-        birth_date=employee.birth_date,
-        contact=employee.contact or "",
-        today=datetime.now().strftime("%d.%m.%Y")
-    )
-
-    pdf_bytes = pdfkit.from_string(html_content, False)
+    pdf_bytes = render_consent_pdf(consent_context(employee))
     pdf_stream = io.BytesIO(pdf_bytes)
 
     return StreamingResponse(
@@ -313,6 +274,30 @@ def generate_consent_pdf(
     )
 
 
+@router.post("/employees/generate-consents")
+def generate_consents_zip(
+    employee_ids: List[int] = Form([]),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(only_approved_user)
+):
+    """Пакетная генерация согласий: выбранные сотрудники или все, если ничего не выбрано"""
+    query = db.query(Employee).filter(Employee.created_by_user_id == current_user.id)
+    if employee_ids:
+        query = query.filter(Employee.id.in_(employee_ids))
+    employees = query.all()
+    if not employees:
+        raise HTTPException(status_code=404, detail="Сотрудники не найдены")
+
+    # Контексты собираем до ответа: сессия закроется раньше, чем архив будет дописан
+    contexts = [consent_context(emp) for emp in employees]
+
+    return StreamingResponse(
+        stream_consents_zip(contexts),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=consents.zip"}
+    )
+
+
 @router.get("/record/{record_id}/edit", response_class=HTMLResponse)
 def edit_record_form(
     request: Request,
@@ -359,33 +344,6 @@ def edit_record(
         response.delete_cookie("access_token")
         return response
 
-    position = position.strip()
-    hired_at = hired_at.strip()
-    fired_at = (fired_at or "").strip()
-    misconduct = (misconduct or "").strip()
-    dismissal_reason = (dismissal_reason or "").strip()
-    commendation = (commendation or "").strip()
-
-    # Валидация длины полей
-    for name, val in {
-        "Должность": position,
-        "Нарушение": misconduct,
-        "Причина увольнения": dismissal_reason,
-        "Поощрение": commendation
-    }.items():
-        if val and len(val) > MAX_TEXT_LENGTH:
-            record = db.query(ReputationRecord).filter(
-                ReputationRecord.id == record_id,
-                ReputationRecord.employer_id == current_user.id
-            ).first()
-            if not record:
-                raise HTTPException(status_code=404)
-            return templates.TemplateResponse("edit_record.html", {
-                "request": request,
-                "record": record,
-                "error": f"{name} не может превышать {MAX_TEXT_LENGTH} символов"
-            })
-
     # Поиск записи
     record = db.query(ReputationRecord).filter(
         ReputationRecord.id == record_id,
@@ -394,34 +352,17 @@ def edit_record(
     if not record:
         raise HTTPException(status_code=404)
 
-    # Валидация дат
-    try:
-        hired_dt = datetime.strptime(hired_at, "%Y-%m-%d")
-    except ValueError:
+    check = validate_record(position, hired_at, fired_at, misconduct, dismissal_reason, commendation)
+    if not check.ok:
         return templates.TemplateResponse("edit_record.html", {
             "request": request,
             "record": record,
-            "error": "Некорректная дата приёма"
+            "error": check.error
         })
 
-    fired_dt = None
-    if fired_at:
-        try:
-            fired_dt = datetime.strptime(fired_at, "%Y-%m-%d")
-        except ValueError:
-            return templates.TemplateResponse("edit_record.html", {
-                "request": request,
-                "record": record,
-                "error": "Некорректная дата увольнения"
-            })
-
     # Обновление записи
-    record.hired_at = hired_dt
-    record.fired_at = fired_dt
-    record.position = position
-    record.misconduct = misconduct or None
-    record.dismissal_reason = dismissal_reason or None
-    record.commendation = commendation or None
+    for name, value in check.record_fields().items():
+        setattr(record, name, value)
 
     db.commit()
     return RedirectResponse(url="/employees", status_code=302)
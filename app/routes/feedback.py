@@ -5,10 +5,11 @@ import os
 from datetime import date
 from collections import defaultdict
 
-from starlette.templating import Jinja2Templates
 
 from app.auth import get_current_user
 from app.models import User
+from app.tracing import http_client_span
+from app.templating import templates
 
 
 router = APIRouter()
@@ -16,7 +17,6 @@ router = APIRouter()
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
-templates = Jinja2Templates(directory="templates")
 # Хранилище лимитов (только для примера, после перезапуска обнуляется)
 feedback_limits = defaultdict(lambda: {"date": None, "count": 0})
 
@@ -63,9 +63,11 @@ async def feedback(
     )
 
     if TELEGRAM_TOKEN and TELEGRAM_CHAT_ID:
-        requests.post(
-            f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-            data={"chat_id": TELEGRAM_CHAT_ID, "text": text}
-        )
+        url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
+        with http_client_span("POST", url):
+            requests.post(
+                url,
+                data={"chat_id": TELEGRAM_CHAT_ID, "text": text}
+            )
 
     return RedirectResponse("/", status_code=302)
@@ -2,7 +2,6 @@ from datetime import datetime, timedelta
 from random import randint
 from fastapi import APIRouter, Request, Depends, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 import requests
 import os
@@ -12,9 +11,11 @@ from app.models import User
 from app.auth import verify_password, create_access_token
 from app.brute_force import is_brute_force, log_login_attempt
 from app.email_utils import send_2fa_code
+from app.tracing import http_client_span, span
+from app.page_cache import cached_page
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 
 def verify_recaptcha(token: str) -> bool:
@@ -22,12 +23,14 @@ def verify_recaptcha(token: str) -> bool:
     secret = os.getenv("SECRET_CAPTCHA_KEY")
     if not secret:
         return False
+    url = "https://www.google.com/recaptcha/api/siteverify"
     try:
-        resp = requests.post(
-            "https://www.google.com/recaptcha/api/siteverify",
-            data={'secret': secret, 'response': token},
-            timeout=3
-        )
+        with http_client_span("POST", url):
+            resp = requests.post(
+                url,
+                data={'secret': secret, 'response': token},
+                timeout=3
+            )
         result = resp.json()
         return result.get('success', False)
     except Exception as e:
@@ -38,7 +41,7 @@ def verify_recaptcha(token: str) -> bool:
 @router.get("/login", response_class=HTMLResponse)
 def login_form(request: Request):
     """Отображение формы входа"""
-    return templates.TemplateResponse("login.html", {"request": request})
+    return cached_page(request, "login.html")
 
 
 @router.post("/login")
@@ -53,7 +56,9 @@ def login_user(
     ip = request.client.host
 
     # Проверка на брутфорс
-    if is_brute_force(session, email, ip):
+    with span("login.is_brute_force"):
+        brute_force = is_brute_force(session, email, ip)
+    if brute_force:
         return templates.TemplateResponse("login.html", {
             "request": request,
             "error": "Слишком много попыток входа. Попробуйте через 15 минут."
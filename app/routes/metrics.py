@@ -0,0 +1,45 @@
+import ipaddress
+import os
+import secrets
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+
+from app.metrics import render_latest
+
+# Если задан — /metrics доступен только с заголовком Authorization: Bearer <METRICS_TOKEN>,
+# иначе — только с адресов из METRICS_ALLOWED_NETS (через запятую, CIDR).
+# По умолчанию только loopback: за обратным прокси и в Docker внешние запросы
+# приходят с частного адреса шлюза, поэтому «любая частная сеть» — не защита.
+# Prometheus в сети Docker: METRICS_ALLOWED_NETS=127.0.0.0/8,::1/128,<подсеть Prometheus>
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_ALLOWED_NETS = tuple(
+    ipaddress.ip_network(net.strip())
+    for net in os.getenv("METRICS_ALLOWED_NETS", "127.0.0.0/8,::1/128").split(",")
+    if net.strip()
+)
+
+router = APIRouter()
+
+
+def _is_allowed(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    # ::ffff:127.0.0.1 (двухстековый сокет) сравниваем как IPv4
+    address = getattr(address, "ipv4_mapped", None) or address
+    return any(address in net for net in METRICS_ALLOWED_NETS)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if METRICS_TOKEN:
+        authorization = request.headers.get("authorization", "")
+        if not secrets.compare_digest(authorization, f"Bearer {METRICS_TOKEN}"):
+            raise HTTPException(status_code=404)
+    elif request.client is None or not _is_allowed(request.client.host):
+        raise HTTPException(status_code=404)
+
+    body, content_type = render_latest()
+    return Response(body, media_type=content_type)
@@ -1,21 +1,23 @@
 import os
-import shutil
-from fastapi import APIRouter, Request, Form, File, UploadFile, Depends
+from fastapi import APIRouter, Request, Depends
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import RedirectResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
 from app.auth import get_session
-from app.models import User
+from app.models import User, UploadedFile
 from app.auth import get_session_user
+from app.passport_processing import schedule_passport_processing
+from app.storage import passport_key
+from app.uploads import ALLOWED_EXTENSIONS, UploadError, delete_upload, receive_upload
+from app.templating import templates
 
-templates = Jinja2Templates(directory="templates")
 
 router = APIRouter()
 
 import uuid
 
-ALLOWED_EXTENSIONS = {"pdf", "png", "jpg", "jpeg"}
+REQUIRED_FIELDS = ("company_name", "city", "inn_or_ogrn")
 
 
 def generate_safe_filename(original_filename: str, user_id: int) -> str:
@@ -36,6 +38,23 @@ def generate_safe_filename(original_filename: str, user_id: int) -> str:
     else:
         return new_name
 
+
+def save_verification_request(db: Session, user: User, fields: dict, filename: str) -> None:
+    """
+    Сохраняет заявку на верификацию и ставит паспорт в обработку.
+    Синхронная (БД), из async-обработчиков вызывается через run_in_threadpool.
+    """
+    user.company_name = fields["company_name"]
+    user.city = fields["city"]
+    user.inn_or_ogrn = fields["inn_or_ogrn"]
+    user.passport_filename = filename
+    user.verification_status = "pending"
+    user.rejection_reason = None
+    db.add(UploadedFile(key=passport_key(filename), filename=filename, owner_id=user.id))
+    db.commit()
+
+    schedule_passport_processing(filename)
+
 @router.get("/onboarding", response_class=HTMLResponse)
 def onboarding_form(
     request: Request,
@@ -65,16 +84,16 @@ def onboarding_form(
     })
 
 @router.post("/onboarding")
-def submit_onboarding(
+async def submit_onboarding(
         request: Request,
-        company_name: str = Form(...),
-        city: str = Form(...),
-        inn_or_ogrn: str = Form(...),
-        passport_file: UploadFile = File(...),
         db: Session = Depends(get_session),
         current_user: User = Depends(get_session_user)
 ):
-    user = db.query(User).filter(User.id == current_user.id).first()
+    if not current_user:
+        return RedirectResponse("/login", status_code=302)
+
+    # get_session_user загружает пользователя в ту же сессию db
+    user = current_user
     if user.verification_status == "pending":
         return templates.TemplateResponse("onboarding_pending.html", {
             "request": request,
@@ -85,49 +104,29 @@ def submit_onboarding(
     if user.verification_status == "approved":
         return RedirectResponse("/", status_code=302)
 
-    _, ext = os.path.splitext(passport_file.filename)
-    ext = ext.lower().lstrip(".")
-
-    if ext not in ALLOWED_EXTENSIONS:
+    # В event loop остаётся только чтение тела; БД и хранилище — в пуле потоков.
+    # Файл пишется на диск потоком; формат, сигнатура и размер проверяются на лету
+    try:
+        fields, filename = await receive_upload(
+            request,
+            "passport_file",
+            lambda original: generate_safe_filename(original, user.id)
+        )
+    except UploadError as exc:
         return templates.TemplateResponse("onboarding.html", {
             "request": request,
             "user": current_user,
-            "error_message": f"Недопустимый формат файла: .{ext}. "
-                             f"Разрешено: {', '.join(ALLOWED_EXTENSIONS)}."
+            "error_message": exc.message
         })
 
-    MAX_MB = 20
-    MAX_SIZE = MAX_MB * 1024 * 1024
-
-    # Определяем размер
-    passport_file.file.seek(0, 2)  # Перемещаем указатель в конец файла
-    file_size = passport_file.file.tell()  # Считываем позицию (размер)
-    passport_file.file.seek(0)  # Возвращаемся в начало файла
-
-    if file_size > MAX_SIZE:
-        # Превышен лимит — возвращаем шаблон или выбрасываем ошибку
+    if not all(fields.get(name, "").strip() for name in REQUIRED_FIELDS):
+        await run_in_threadpool(delete_upload, filename)
         return templates.TemplateResponse("onboarding.html", {
             "request": request,
             "user": current_user,
-            "error_message": f"Файл превышает {MAX_MB} МБ. Попробуйте другой документ."
+            "error_message": "Заполните все поля формы."
         })
 
-    # Можно добавить «безопасное» имя вместо простого:
-    filename = generate_safe_filename(passport_file.filename, current_user.id)
-    # Или используем генерацию безопасного имени (см. ниже)
-
-    filepath = os.path.join("static", "uploads", filename)
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-
-    with open(filepath, "wb") as buffer:
-        shutil.copyfileobj(passport_file.file, buffer)
-
-    user.company_name = company_name
-    user.city = city
-    user.inn_or_ogrn = inn_or_ogrn
-    user.passport_filename = filename
-    user.verification_status = "pending"
-    user.rejection_reason = None
-    db.commit()
+    await run_in_threadpool(save_verification_request, db, user, fields, filename)
 
     return templates.TemplateResponse("onboarding_submitted.html", {"request": request})
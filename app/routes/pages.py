@@ -2,13 +2,13 @@ from typing import Optional
 
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
 from app.auth import optional_user
 from app.models import User
+from app.page_cache import cached_page
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -26,9 +26,9 @@ def root(
 
 @router.get("/policy", response_class=HTMLResponse)
 def policy(request: Request):
-    return templates.TemplateResponse("policy.html", {"request": request})
+    return cached_page(request, "policy.html")
 
 
 @router.get("/terms", response_class=HTMLResponse)
 def terms(request: Request):
-    return templates.TemplateResponse("terms.html", {"request": request})
+    return cached_page(request, "terms.html")
@@ -5,19 +5,19 @@ from app.database import get_session
 from app.models import User
 from app.auth import create_access_token, hash_password
 from app.email_utils import send_password_reset_email  # Предполагаем, что такая функция есть
-from fastapi.templating import Jinja2Templates
+from app.page_cache import cached_page
+from app.templating import templates
 import os
 from jose import ExpiredSignatureError
 from fastapi.responses import RedirectResponse
 from jose import jwt, JWTError
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 @router.get("/forgot-password", response_class=HTMLResponse)
 def forgot_password_form(request: Request):
     """Простая страница, где пользователь укажет email для восстановления."""
-    return templates.TemplateResponse("forgot_password.html", {"request": request})
+    return cached_page(request, "forgot_password.html")
 
 @router.post("/forgot-password", response_class=HTMLResponse)
 def forgot_password_send(
@@ -1,7 +1,6 @@
 from datetime import datetime
 from fastapi import APIRouter, Request, Depends, HTTPException, Form
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 import secrets
 from email_validator import validate_email, EmailNotValidError
@@ -10,10 +9,11 @@ from app.database import get_session
 from app.models import User, PendingUser
 from app.auth import hash_password
 from app.email_utils import send_verification_email
-from app.bad_words import BAD_WORDS
+from app.profanity import contains_profanity
+from app.page_cache import cached_page
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 # Константы валидации
 MAX_NAME_LENGTH = 50
@@ -24,7 +24,7 @@ MAX_EMAIL_LENGTH = 254
 @router.get("/register", response_class=HTMLResponse)
 def register_form(request: Request):
     """Отображение формы регистрации"""
-    return templates.TemplateResponse("register.html", {"request": request})
+    return cached_page(request, "register.html")
 
 
 @router.post("/register", response_class=HTMLResponse)
@@ -47,7 +47,7 @@ def register_user(
         })
 
     # Проверка на плохие слова в имени
-    if any(bad_word in clean_name.lower() for bad_word in BAD_WORDS):
+    if contains_profanity(clean_name):
         return templates.TemplateResponse("register.html", {
             "request": request,
             "error": "Имя содержит недопустимые слова"
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Request, Depends, HTTPException, status
+from typing import List
+
+from fastapi import APIRouter, Request, Depends, HTTPException, status, Form
 from fastapi.responses import RedirectResponse
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.auth import get_current_user
 from app.database import get_session
 from app.models import User  # В модели User предполагается поле "is_blocked"
 from app.models import Employee  # Если нужно для расширенных методов
+from app.models import ReputationRecord
 
 router = APIRouter()
 
@@ -18,6 +22,58 @@ def ensure_superadmin(current_user: User = Depends(get_current_user)) -> User:
         )
     return current_user
 
+def set_users_blocked(db: Session, user_ids: List[int], blocked: bool) -> List[int]:
+    """
+    Меняет is_blocked у пачки пользователей одним UPDATE в текущей транзакции,
+    вместе с копией флага в их репутационных записях.
+    Супер-админов не трогает. Возвращает id, у которых статус действительно изменился.
+    """
+    if not user_ids:
+        return []
+    changed = db.execute(
+        update(User)
+        .where(
+            User.id.in_(user_ids),
+            User.role != "superadmin",
+            User.is_blocked == (not blocked)
+        )
+        .values(is_blocked=blocked)
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    if changed:
+        # В той же транзакции: проверка видит новый статус сразу после коммита
+        db.execute(
+            update(ReputationRecord)
+            .where(ReputationRecord.employer_id.in_(changed))
+            .values(employer_blocked=blocked)
+            .execution_options(synchronize_session=False)
+        )
+    return changed
+
+
+@router.post("/superadmin/block")
+def block_users(
+    user_ids: List[int] = Form([]),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(ensure_superadmin)
+):
+    """Блокируем отмеченных пользователей одной транзакцией"""
+    set_users_blocked(db, user_ids, True)
+    db.commit()
+    return RedirectResponse("/admin/users/list", status_code=302)
+
+@router.post("/superadmin/unblock")
+def unblock_users(
+    user_ids: List[int] = Form([]),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(ensure_superadmin)
+):
+    """Разблокируем отмеченных пользователей одной транзакцией"""
+    set_users_blocked(db, user_ids, False)
+    db.commit()
+    return RedirectResponse("/admin/users/list", status_code=302)
+
 @router.post("/superadmin/block/{user_id}")
 def block_user(
     user_id: int,
@@ -40,7 +96,7 @@ def block_user(
             detail="Нельзя блокировать другого супер-админа."
         )
 
-    user.is_blocked = True
+    set_users_blocked(db, [user.id], True)
     db.commit()
 
     # После блокировки перенаправляем на список пользователей
@@ -59,7 +115,7 @@ def unblock_user(
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
 
-    user.is_blocked = False
+    set_users_blocked(db, [user.id], False)
     db.commit()
 
     return RedirectResponse("/admin/users/list", status_code=302)
@@ -1,10 +1,78 @@
 """
 Настройка статических файлов
 """
+import os
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.types import Scope
+
+from app.assets import COMPRESSIBLE_EXTENSIONS, DIST_DIR, DIST_SUBDIR, STATIC_DIR, STATIC_URL
+from app.content_encoding import choose_encoding
+
+# Собранные файлы (app.assets) не меняются: новое содержимое — новое имя
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Исходные файлы — с проверкой по ETag при каждом использовании
+REVALIDATE_CACHE_CONTROL = "no-cache"
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles, который для собранных файлов (immutable=True — каталог
+    сборки app.assets) отдаёт готовый .br/.gz, если клиент его принимает,
+    и разрешает кэшировать их навсегда
+    """
+
+    def __init__(self, *args, immutable: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable = immutable
+
+    async def check_config(self) -> None:
+        # каталога сборки нет (разработка без python -m app.assets build) — 404, а не 500
+        if self.immutable and not os.path.isdir(self.directory):
+            return
+        await super().check_config()
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if not self.immutable:
+            response = await super().get_response(path, scope)
+            response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+            return response
+
+        response = None
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        # картинки не сжимаются при сборке — не ищем варианты зря
+        compressible = os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+        available = list(ENCODING_SUFFIXES) if compressible else []
+        encoding = choose_encoding(accept_encoding, available)
+        while encoding and response is None:
+            try:
+                response = await super().get_response(path + ENCODING_SUFFIXES[encoding], scope)
+                response.headers["Content-Encoding"] = encoding
+            except HTTPException as exc:
+                if exc.status_code != 404:
+                    raise
+                # варианта нет (картинка или сжатие не дало выигрыша) — пробуем следующий
+                available.remove(encoding)
+                encoding = choose_encoding(accept_encoding, available)
+
+        if response is None:
+            response = await super().get_response(path, scope)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
 
 
 def setup_static_files(app: FastAPI) -> None:
     """Настройка статических файлов"""
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+    # Сборка может лежать вне static/ (ASSETS_DIST_DIR, см. app.assets)
+    app.mount(
+        STATIC_URL + DIST_SUBDIR,
+        PrecompressedStaticFiles(directory=DIST_DIR, immutable=True, check_dir=False),
+        name="static_dist"
+    )
+    app.mount("/static", PrecompressedStaticFiles(directory=STATIC_DIR), name="static")
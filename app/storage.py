@@ -0,0 +1,177 @@
+"""
+Хранилище документов верификации (паспорта и их превью).
+
+Файлы лежат вне /static и отдаются только через админские эндпоинты.
+Интерфейс повторяет операции S3 (put/get/head/delete object), поэтому
+локальная реализация и S3-совместимый бакет взаимозаменяемы.
+
+Локальный бэкенд раскладывает объекты по подпапкам по хэшу ключа:
+    <root>/ab/cd/<key>,  где abcd… = sha256(key)
+чтобы в одном каталоге не копились сотни тысяч файлов.
+
+Перенос старых файлов из static/uploads:
+    python -m app.storage migrate static/uploads
+
+S3 локально — MinIO из docker-compose (профиль s3):
+    docker compose --profile s3 up -d minio minio-init
+    STORAGE_BACKEND=s3 S3_BUCKET=truststaff-private S3_ENDPOINT_URL=http://127.0.0.1:9000 \
+    AWS_ACCESS_KEY_ID=minioadmin AWS_SECRET_ACCESS_KEY=minioadmin uvicorn app.main:app
+"""
+import hashlib
+import os
+import shutil
+import sys
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+STORAGE_ROOT = os.getenv("STORAGE_ROOT", os.path.join("media", "private"))
+# Каталог для временных файлов загрузки; для локального бэкенда — на той же ФС, что и root,
+# чтобы put_object был атомарным os.replace
+STORAGE_TMP_DIR = os.path.join(STORAGE_ROOT, ".tmp")
+
+S3_BUCKET = os.getenv("S3_BUCKET")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+
+SHARD_LEVELS = 2
+SHARD_WIDTH = 2
+
+
+class Storage(ABC):
+    """Минимальный S3-подобный интерфейс; бэкенд без любого из методов не создаётся"""
+
+    @abstractmethod
+    def put_object(self, key: str, source_path: str) -> None:
+        """Забирает готовый локальный файл source_path под ключ key"""
+
+    @abstractmethod
+    def get_object(self, key: str) -> BinaryIO:
+        """Объект, открытый на чтение"""
+
+    @abstractmethod
+    def head_object(self, key: str) -> Optional[int]:
+        """Размер объекта или None, если его нет"""
+
+    @abstractmethod
+    def delete_object(self, key: str) -> None:
+        """Удаляет объект; отсутствующий объект — не ошибка"""
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Путь на диске, если объект доступен локально (для sendfile); иначе None"""
+        return None
+
+    def exists(self, key: str) -> bool:
+        return self.head_object(key) is not None
+
+
+class LocalShardedStorage(Storage):
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        if not key or key.startswith("/") or ".." in key.split("/"):
+            raise ValueError(f"Недопустимый ключ: {key!r}")
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        shards = [digest[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(SHARD_LEVELS)]
+        return os.path.join(self.root, *shards, key)
+
+    def put_object(self, key: str, source_path: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+
+    def get_object(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def head_object(self, key: str) -> Optional[int]:
+        try:
+            return os.stat(self._path(key)).st_size
+        except FileNotFoundError:
+            return None
+
+    def delete_object(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        return path if os.path.exists(path) else None
+
+
+class S3Storage(Storage):
+    """S3-совместимый бакет (AWS S3, MinIO); client — готовый клиент boto3 или совместимый"""
+
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None, client=None):
+        import boto3
+        from botocore.exceptions import ClientError
+
+        self.bucket = bucket
+        self.client = client or boto3.client("s3", endpoint_url=endpoint_url)
+        self._client_error = ClientError
+
+    def put_object(self, key: str, source_path: str) -> None:
+        self.client.upload_file(source_path, self.bucket, key)
+        os.unlink(source_path)
+
+    def get_object(self, key: str) -> BinaryIO:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+
+    def head_object(self, key: str) -> Optional[int]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+        except self._client_error:
+            return None
+
+    def delete_object(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+
+_storage: Optional[Storage] = None
+
+
+def get_storage() -> Storage:
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == "s3":
+            _storage = S3Storage(S3_BUCKET, S3_ENDPOINT_URL)
+        else:
+            _storage = LocalShardedStorage(STORAGE_ROOT)
+    return _storage
+
+
+# --- ключи объектов ---
+
+def passport_key(filename: str) -> str:
+    return f"passports/{filename}"
+
+
+def preview_key(filename: str) -> str:
+    return f"previews/{filename}"
+
+
+def migrate_flat_directory(source_dir: str) -> int:
+    """Переносит файлы паспортов из плоского каталога в хранилище"""
+    storage = get_storage()
+    moved = 0
+    with os.scandir(source_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.startswith("passport_"):
+                os.makedirs(STORAGE_TMP_DIR, exist_ok=True)
+                tmp_path = os.path.join(STORAGE_TMP_DIR, entry.name)
+                shutil.move(entry.path, tmp_path)
+                storage.put_object(passport_key(entry.name), tmp_path)
+                moved += 1
+    return moved
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "migrate":
+        print(f"Перенесено файлов: {migrate_flat_directory(sys.argv[2])}")
+    else:
+        print(__doc__)
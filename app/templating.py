@@ -0,0 +1,73 @@
+"""
+Единое окружение Jinja2 для всех роутеров, обработчиков ошибок и PDF-согласий.
+
+- один кэш скомпилированных шаблонов на процесс вместо отдельного
+  Jinja2Templates в каждом модуле;
+- auto_reload выключен: шаблоны не проверяются на изменение (stat) при каждом
+  рендере. Для разработки — TEMPLATES_AUTO_RELOAD=1;
+- байткод шаблонов кэшируется на диске: новый воркер не компилирует шаблоны
+  заново, а читает готовый код. По умолчанию — личный каталог пользователя
+  процесса во временном каталоге, который Jinja2 создаёт с правами 0700 и
+  проверяет владельца (чужой байткод не загрузится). TEMPLATES_BYTECODE_CACHE_DIR
+  задаёт свой каталог (создаётся с правами 0700), пустое значение выключает кэш;
+- precompile_templates() при старте загружает все шаблоны, чтобы первый
+  запрос к странице не платил за компиляцию;
+- static_url('style.css') в шаблонах — ссылка на собранную статику с хешем
+  в имени (app.assets).
+"""
+import logging
+import os
+import time
+from typing import Optional
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from app.assets import static_url
+
+TEMPLATES_DIR = os.getenv("TEMPLATES_DIR", "templates")
+TEMPLATES_AUTO_RELOAD = os.getenv("TEMPLATES_AUTO_RELOAD", "0") == "1"
+# None — личный каталог от Jinja2, "" — без кэша
+TEMPLATES_BYTECODE_CACHE_DIR = os.getenv("TEMPLATES_BYTECODE_CACHE_DIR")
+# Все шаблоны должны помещаться в кэш окружения, иначе часть будет вытесняться
+TEMPLATES_CACHE_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def create_environment(
+    directory: str = TEMPLATES_DIR,
+    auto_reload: bool = TEMPLATES_AUTO_RELOAD,
+    bytecode_cache_dir: Optional[str] = TEMPLATES_BYTECODE_CACHE_DIR
+) -> Environment:
+    bytecode_cache = None
+    if bytecode_cache_dir is None:
+        bytecode_cache = FileSystemBytecodeCache()
+    elif bytecode_cache_dir:
+        os.makedirs(bytecode_cache_dir, mode=0o700, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+    environment = Environment(
+        loader=FileSystemLoader(directory),
+        autoescape=True,  # как у Jinja2Templates(directory=...)
+        auto_reload=auto_reload,
+        bytecode_cache=bytecode_cache,
+        cache_size=TEMPLATES_CACHE_SIZE,
+    )
+    environment.globals["static_url"] = static_url
+    return environment
+
+
+env = create_environment()
+templates = Jinja2Templates(env=env)
+
+
+def precompile_templates() -> int:
+    """Загружает все шаблоны в кэш окружения; возвращает их число"""
+    started = time.perf_counter()
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    logger.info(
+        "Шаблоны загружены: %d за %.1f мс", len(names), (time.perf_counter() - started) * 1000
+    )
+    return len(names)
@@ -0,0 +1,387 @@
+"""
+Трассировка запросов: где прошло время внутри одного HTTP-запроса.
+
+Спаны совместимы с OpenTelemetry: 128-битный trace_id, 64-битный span_id,
+входящий заголовок W3C traceparent продолжает чужую трассу, экспорт — в
+формате OTLP/JSON (resourceSpans), который понимают Jaeger, Tempo и
+OpenTelemetry Collector.
+
+Что попадает в трассу:
+  - корневой спан HTTP-запроса (TracingMiddleware);
+  - каждое SQL-выражение (события engine, см. app/database.py);
+  - bcrypt, внешние HTTP-вызовы, SMTP, wkhtmltopdf — через span(...) на месте вызова.
+
+Сэмплирование головное: решение принимается один раз в начале запроса
+(TRACE_SAMPLE_RATE, от 0 до 1), и для несэмплированных запросов span(...)
+ничего не делает. Флаг sampled во входящем traceparent учитывается только
+от своих сервисов — адресов из TRACE_TRUSTED_NETS (CIDR через запятую, по
+умолчанию никого): иначе любой клиент включал бы трассировку каждого своего
+запроса. От остальных берётся только trace_id, решение — по TRACE_SAMPLE_RATE.
+
+Экспорт (в фоновом потоке, запрос его не ждёт):
+  TRACE_EXPORT_FILE=traces.jsonl            — по строке OTLP/JSON на трассу;
+  TRACE_EXPORT_URL=http://host:4318/v1/traces — OTLP/HTTP JSON в коллектор.
+
+Локальная замена коллектора для разработки:
+    python -m app.tracing collect --port 4318 --out traces.jsonl
+"""
+import ipaddress
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+load_dotenv()
+
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE")
+TRACE_EXPORT_URL = os.getenv("TRACE_EXPORT_URL")
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "truststaff")
+TRACE_TRUSTED_NETS = tuple(
+    ipaddress.ip_network(net.strip())
+    for net in os.getenv("TRACE_TRUSTED_NETS", "").split(",")
+    if net.strip()
+)
+
+TRACING_ENABLED = TRACE_SAMPLE_RATE > 0 and bool(TRACE_EXPORT_FILE or TRACE_EXPORT_URL)
+
+EXPORT_QUEUE_SIZE = 1000
+EXPORT_TIMEOUT = 5
+DB_STATEMENT_MAX_LENGTH = 500
+
+# Виды спанов OTLP
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+STATUS_ERROR = 2
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+logger = logging.getLogger(__name__)
+
+
+class _Trace:
+    """Спаны одной трассы в этом процессе; экспортируются, когда закрывается корень"""
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List["Span"] = []
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "attributes",
+                 "start_ns", "end_ns", "status_code", "status_message")
+
+    def __init__(self, trace: _Trace, name: str, parent_id: Optional[str] = None,
+                 kind: int = KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.status_code = 0
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"[:500]
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        self.trace.spans.append(self)
+
+
+class _NoopSpan:
+    """Заглушка для несэмплированных запросов"""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current_span.get()
+    return current.trace.trace_id if current else None
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: int = KIND_INTERNAL):
+    """Дочерний спан текущего; вне сэмплированного запроса — пустая операция"""
+    parent = _current_span.get()
+    if parent is None:
+        yield _NOOP
+        return
+
+    current = Span(parent.trace, name, parent.span_id, kind, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.record_exception(exc)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def http_client_span(method: str, url: str):
+    """Спан исходящего HTTP-вызова. Путь и query не пишем: в них бывают токены (Telegram)"""
+    host = urlsplit(url).hostname or ""
+    return span(
+        f"{method} {host}",
+        {"http.request.method": method, "server.address": host},
+        kind=KIND_CLIENT
+    )
+
+
+# --- SQL ---
+
+class SqlTracing:
+    """Спан на каждое SQL-выражение сэмплированного запроса (подключается в app/database.py)"""
+
+    def __init__(self, db_system: str):
+        self.db_system = db_system
+
+    def start(self, statement: str) -> Optional[Span]:
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        return Span(
+            parent.trace, statement.lstrip().split(None, 1)[0].upper(), parent.span_id, KIND_CLIENT,
+            {"db.system": self.db_system, "db.statement": statement[:DB_STATEMENT_MAX_LENGTH]}
+        )
+
+    def end(self, db_span: Optional[Span], statement: str, elapsed: float, error: Optional[BaseException]) -> None:
+        if db_span is None:
+            return
+        if error is not None:
+            db_span.record_exception(error)
+        db_span.end()
+
+
+# --- экспорт ---
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(item: Span) -> dict:
+    data = {
+        "traceId": item.trace.trace_id,
+        "spanId": item.span_id,
+        "name": item.name,
+        "kind": item.kind,
+        "startTimeUnixNano": str(item.start_ns),
+        "endTimeUnixNano": str(item.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in item.attributes.items()],
+        "status": {"code": item.status_code, "message": item.status_message} if item.status_code else {},
+    }
+    if item.parent_id:
+        data["parentSpanId"] = item.parent_id
+    return data
+
+
+def to_otlp(spans: List[Span]) -> dict:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [_otlp_span(item) for item in spans],
+            }],
+        }]
+    }
+
+
+class _Exporter:
+    """Очередь готовых трасс и фоновый поток, который пишет их в файл и/или коллектор"""
+
+    def __init__(self):
+        self._queue: "queue.Queue[List[Span]]" = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, spans: List[Span]) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            # трассировка не должна тормозить приложение — лишнее просто теряем
+            pass
+
+    def _run(self) -> None:
+        while True:
+            payload = json.dumps(to_otlp(self._queue.get()), ensure_ascii=False)
+            try:
+                if TRACE_EXPORT_FILE:
+                    with open(TRACE_EXPORT_FILE, "a", encoding="utf-8") as out:
+                        out.write(payload + "\n")
+                if TRACE_EXPORT_URL:
+                    request = urllib.request.Request(
+                        TRACE_EXPORT_URL, data=payload.encode("utf-8"),
+                        headers={"Content-Type": "application/json"}, method="POST"
+                    )
+                    urllib.request.urlopen(request, timeout=EXPORT_TIMEOUT).close()
+            except Exception as exc:
+                logger.warning("Не удалось экспортировать трассу: %r", exc)
+
+
+_exporter = _Exporter()
+
+
+# --- HTTP ---
+
+def parse_traceparent(value: str) -> Optional[tuple]:
+    """(trace_id, parent_span_id, sampled) из заголовка W3C traceparent или None"""
+    match = TRACEPARENT.match(value.strip())
+    if not match:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+def _is_trusted(scope: Scope) -> bool:
+    client = scope.get("client")
+    if not client or not TRACE_TRUSTED_NETS:
+        return False
+    try:
+        address = ipaddress.ip_address(client[0])
+    except ValueError:
+        return False
+    address = getattr(address, "ipv4_mapped", None) or address
+    return any(address in net for net in TRACE_TRUSTED_NETS)
+
+
+def _start_decision(scope: Scope):
+    """(trace_id, parent_span_id) для сэмплированного запроса или None"""
+    incoming = None
+    for name, value in scope.get("headers", []):
+        if name == b"traceparent":
+            incoming = parse_traceparent(value.decode("latin-1"))
+            break
+
+    if incoming is not None:
+        trace_id, parent_id, sampled = incoming
+        if sampled and _is_trusted(scope):
+            return trace_id, parent_id
+        # чужой флаг не в счёт, но если сэмплируем сами — продолжаем ту же трассу
+        return (trace_id, parent_id) if random.random() < TRACE_SAMPLE_RATE else None
+
+    if random.random() < TRACE_SAMPLE_RATE:
+        return f"{random.getrandbits(128):032x}", None
+    return None
+
+
+class TracingMiddleware:
+    """Корневой спан на HTTP-запрос; сэмплированным ответам добавляет X-Trace-Id"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        decision = _start_decision(scope) if scope["type"] == "http" else None
+        if decision is None:
+            await self.app(scope, receive, send)
+            return
+
+        trace_id, parent_id = decision
+        root = Span(_Trace(trace_id), scope["method"], parent_id, KIND_SERVER, {
+            "http.request.method": scope["method"],
+            "url.path": scope["path"],
+        })
+        token = _current_span.set(root)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status_code = STATUS_ERROR
+                headers = list(message.get("headers", []))
+                headers.append((b"x-trace-id", trace_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            root.record_exception(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                root.name = f"{scope['method']} {route}"
+                root.set_attribute("http.route", route)
+            root.end()
+            _exporter.submit(root.trace.spans)
+
+
+# --- замена коллектора для разработки ---
+
+def serve_collector(port: int, out_path: str) -> None:
+    """Принимает OTLP/HTTP JSON на /v1/traces и дописывает тела в out_path"""
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with lock, open(out_path, "ab") as out:
+                out.write(body.rstrip(b"\n") + b"\n")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format, *args):
+            pass
+
+    print(f"Коллектор слушает http://127.0.0.1:{port}/v1/traces, пишет в {out_path}")
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "collect":
+        args = dict(zip(sys.argv[2::2], sys.argv[3::2]))
+        serve_collector(int(args.get("--port", "4318")), args.get("--out", "traces.jsonl"))
+    else:
+        print(__doc__)
@@ -0,0 +1,238 @@
+"""
+Потоковый приём загружаемых документов (паспорт при верификации).
+
+Тело multipart-запроса разбирается по мере поступления: файл пишется
+кусками во временный файл хранилища, размер и сигнатура проверяются
+на лету, а по завершении файл атомарно передаётся в хранилище (app.storage).
+"""
+import os
+import uuid
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Request
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+from app.storage import STORAGE_TMP_DIR, get_storage, passport_key
+
+ALLOWED_EXTENSIONS = {"pdf", "png", "jpg", "jpeg"}
+
+# Единый лимит для HTML и API
+MAX_UPLOAD_MB = 20
+MAX_UPLOAD_SIZE = MAX_UPLOAD_MB * 1024 * 1024
+
+# Текстовые поля формы (название компании, город, ИНН) — короткие
+MAX_FIELD_SIZE = 4 * 1024
+# Запас на заголовки частей и текстовые поля при проверке Content-Length
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Сигнатуры (magic bytes) допустимых форматов
+MAGIC_BYTES = {
+    "pdf": (b"%PDF-",),
+    "png": (b"\x89PNG\r\n\x1a\n",),
+    "jpg": (b"\xff\xd8\xff",),
+    "jpeg": (b"\xff\xd8\xff",),
+}
+MAGIC_PREFIX_LEN = max(len(sig) for sigs in MAGIC_BYTES.values() for sig in sigs)
+
+
+class UploadError(Exception):
+    """Загрузка отклонена; message можно показывать пользователю"""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+def delete_upload(filename: str) -> None:
+    """Удаляет уже сохранённый файл (форма не прошла проверку); синхронно — в хранилище может быть сетевой вызов"""
+    get_storage().delete_object(passport_key(filename))
+
+
+def file_extension(filename: str) -> str:
+    _, ext = os.path.splitext(filename or "")
+    return ext.lower().lstrip(".")
+
+
+class _StreamingUpload:
+    """Состояние разбора одного multipart-запроса"""
+
+    def __init__(self, file_field: str, filename_factory: Callable[[str], str]):
+        self.file_field = file_field
+        self.filename_factory = filename_factory
+        self.fields: Dict[str, str] = {}
+
+        self.saved_filename: Optional[str] = None
+        self.tmp_path: Optional[str] = None
+        self.file = None
+        self.size = 0
+        self.ext = ""
+        self.head = bytearray()
+        self.magic_checked = False
+
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._part_name = ""
+        self._part_is_file = False
+        self._part_data = bytearray()
+        # куски файла, накопленные за один parser.write(); пишутся на диск в потоке
+        self._pending = []
+        self.file_finished = False
+
+    # --- callbacks python-multipart ---
+
+    def on_part_begin(self):
+        self._disposition = b""
+        self._part_name = ""
+        self._part_is_file = False
+        self._part_data = bytearray()
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        self._part_name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        if b"filename" not in options:
+            return
+
+        if self._part_name != self.file_field or self.saved_filename is not None:
+            raise UploadError("Неожиданный файл в форме.")
+
+        original = options[b"filename"].decode("utf-8", errors="replace")
+        self.ext = file_extension(original)
+        if self.ext not in ALLOWED_EXTENSIONS:
+            raise UploadError(
+                f"Недопустимый формат файла: .{self.ext}. "
+                f"Разрешено: {', '.join(sorted(ALLOWED_EXTENSIONS))}."
+            )
+
+        self._part_is_file = True
+        self.saved_filename = self.filename_factory(original)
+        self.tmp_path = os.path.join(STORAGE_TMP_DIR, f"{uuid.uuid4().hex}.part")
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        chunk = data[start:end]
+        if not self._part_is_file:
+            if len(self._part_data) + len(chunk) > MAX_FIELD_SIZE:
+                raise UploadError("Слишком длинное значение поля формы.")
+            self._part_data.extend(chunk)
+            return
+
+        self.size += len(chunk)
+        if self.size > MAX_UPLOAD_SIZE:
+            raise UploadError(f"Файл превышает {MAX_UPLOAD_MB} МБ. Попробуйте другой документ.")
+
+        if not self.magic_checked:
+            self.head.extend(chunk[:MAGIC_PREFIX_LEN - len(self.head)])
+            if len(self.head) >= MAGIC_PREFIX_LEN:
+                self._check_magic()
+        self._pending.append(chunk)
+
+    def on_part_end(self):
+        if self._part_is_file:
+            if not self.magic_checked:
+                self._check_magic()
+            self.file_finished = True
+        else:
+            self.fields[self._part_name] = self._part_data.decode("utf-8", errors="replace")
+
+    def _check_magic(self):
+        self.magic_checked = True
+        head = bytes(self.head)
+        if not any(head.startswith(sig) for sig in MAGIC_BYTES[self.ext]):
+            raise UploadError("Содержимое файла не соответствует его формату.")
+
+    # --- запись на диск ---
+
+    async def flush(self):
+        if self._pending:
+            if self.file is None:
+                os.makedirs(STORAGE_TMP_DIR, exist_ok=True)
+                self.file = await run_in_threadpool(open, self.tmp_path, "wb")
+            data = b"".join(self._pending)
+            self._pending.clear()
+            await run_in_threadpool(self.file.write, data)
+
+    async def commit(self) -> str:
+        await self.flush()
+        if self.file is None:
+            raise UploadError("Файл пустой.")
+        key = passport_key(self.saved_filename)
+
+        def _finish():
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            get_storage().put_object(key, self.tmp_path)
+
+        await run_in_threadpool(_finish)
+        self.file = None
+        return self.saved_filename
+
+    def discard(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if self.tmp_path and os.path.exists(self.tmp_path):
+            os.unlink(self.tmp_path)
+
+
+async def receive_upload(
+    request: Request,
+    file_field: str,
+    filename_factory: Callable[[str], str],
+) -> Tuple[Dict[str, str], str]:
+    """
+    Разбирает multipart-запрос потоком и сохраняет файл из поля file_field.
+    Возвращает (текстовые поля формы, имя сохранённого файла).
+    При превышении лимита или неверной сигнатуре чтение прекращается сразу.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() \
+            and int(content_length) > MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD:
+        raise UploadError(f"Файл превышает {MAX_UPLOAD_MB} МБ. Попробуйте другой документ.")
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UploadError("Ожидается форма multipart/form-data.")
+
+    upload = _StreamingUpload(file_field, filename_factory)
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": upload.on_part_begin,
+        "on_part_data": upload.on_part_data,
+        "on_part_end": upload.on_part_end,
+        "on_header_field": upload.on_header_field,
+        "on_header_value": upload.on_header_value,
+        "on_header_end": upload.on_header_end,
+        "on_headers_finished": upload.on_headers_finished,
+    })
+
+    try:
+        try:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                await upload.flush()
+            parser.finalize()
+        except MultipartParseError:
+            raise UploadError("Некорректная форма.")
+
+        if upload.saved_filename is None or not upload.file_finished:
+            raise UploadError("Файл не передан.")
+        filename = await upload.commit()
+    except BaseException:
+        upload.discard()
+        raise
+
+    return upload.fields, filename
@@ -0,0 +1,73 @@
+"""
+Поиск пользователей для админки: по началу email, названию компании,
+ИНН/ОГРН и городу.
+
+Каждый вид условия рассчитан на свой индекс (см. миграцию add user search indexes):
+  - email и ИНН/ОГРН — поиск по префиксу, btree с varchar_pattern_ops;
+  - компания и город — подстрока в lower(...), GIN-индекс pg_trgm.
+Строка из одних цифр ищется только по ИНН/ОГРН, строка с «@» — только по email.
+"""
+import re
+from typing import List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import User
+
+SEARCH_MIN_LENGTH = 2
+# Триграммный индекс помогает только начиная с 3 символов
+TRIGRAM_MIN_LENGTH = 3
+SEARCH_RESULTS_LIMIT = 20
+
+DIGITS_ONLY = re.compile(r"^\d+$")
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split()).lower()
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _lookups(query: str):
+    """Условия поиска в порядке приоритета; каждое обслуживается своим индексом"""
+    escaped = _escape_like(query)
+    prefix = f"{escaped}%"
+
+    if DIGITS_ONLY.match(query):
+        return [User.inn_or_ogrn.like(prefix, escape="\\")]
+    if "@" in query:
+        return [User.email.like(prefix, escape="\\")]
+
+    lookups = [User.email.like(prefix, escape="\\")]
+    if len(query) >= TRIGRAM_MIN_LENGTH:
+        contains = f"%{escaped}%"
+        lookups += [
+            func.lower(User.company_name).like(contains, escape="\\"),
+            func.lower(User.city).like(contains, escape="\\"),
+        ]
+    return lookups
+
+
+def search_users(db: Session, query: str, limit: int = SEARCH_RESULTS_LIMIT) -> List[User]:
+    """
+    Пользователи, подходящие под строку поиска.
+    Условия выполняются по очереди отдельными запросами с LIMIT: так ни один
+    из них не сортирует всё множество совпадений (у «ооо» их сотни тысяч).
+    """
+    query = normalize_query(query)
+    if len(query) < SEARCH_MIN_LENGTH:
+        return []
+
+    found = {}
+    for condition in _lookups(query):
+        lookup = db.query(User).filter(condition)
+        if found:
+            lookup = lookup.filter(User.id.not_in(list(found)))
+        for user in lookup.limit(limit - len(found)).all():
+            found[user.id] = user
+        if len(found) >= limit:
+            break
+    return list(found.values())
@@ -0,0 +1,194 @@
+"""
+Отдельный процесс для фоновых задач.
+
+Запуск:
+    python -m app.worker
+
+Можно запускать несколько копий: планировщик работает только у лидера
+(держит advisory lock в Postgres), остальные ждут и подхватывают
+лидерство, если лидер упал. Расписание хранится в БД (таблица
+apscheduler_jobs), каждый запуск задачи пишется в job_run.
+Дополнительно каждая задача выполняется под собственным advisory lock,
+поэтому одновременно она не запустится дважды даже при смене лидера.
+
+Запуски и длительность задач пишутся в метрики Prometheus (app/metrics.py);
+если задан WORKER_METRICS_PORT, воркер отдаёт их на этом порту.
+"""
+import json
+import logging
+import os
+import socket
+import time
+import traceback
+import zlib
+from datetime import datetime
+
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.blocking import BlockingScheduler
+from sqlalchemy import text
+
+from app.database import SessionLocal, engine
+from app.jobs.cleanup_PU import cleanup_pending_users
+from app.jobs.cleanup_uploads import cleanup_expired_uploads
+from app.jobs.partitions import maintain_partitions
+from app.jobs.reputation_consistency import repair_employer_blocked
+from app.metrics import JOB_DURATION, JOB_RUNS, start_metrics_server
+from app.models import JobRun
+
+# Имя задачи → (функция, параметры интервала)
+JOBS = {
+    "cleanup_pending_users": (cleanup_pending_users, {"minutes": 10}),
+    "cleanup_expired_uploads": (cleanup_expired_uploads, {"hours": 1}),
+    "maintain_partitions": (maintain_partitions, {"hours": 24}),
+    "repair_employer_blocked": (repair_employer_blocked, {"hours": 24}),
+}
+
+LEADER_LOCK_NAME = "truststaff-worker-leader"
+LEADER_RETRY_SECONDS = 15
+LEADER_HEARTBEAT_SECONDS = 30
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "0"))
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+logger = logging.getLogger("app.worker")
+
+
+def _lock_id(name: str) -> int:
+    """Стабильный 32-битный ключ advisory lock по имени"""
+    return zlib.crc32(name.encode("utf-8"))
+
+
+def _is_postgres() -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def _try_advisory_lock(conn, name: str) -> bool:
+    if not _is_postgres():
+        # локальная разработка на SQLite: считаем, что воркер один
+        return True
+    return bool(conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": _lock_id(name)}).scalar())
+
+
+def _advisory_unlock(conn, name: str) -> None:
+    if _is_postgres():
+        conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _lock_id(name)})
+
+
+def _record_run(run_id, **values) -> int:
+    session = SessionLocal()
+    try:
+        if run_id is None:
+            run = JobRun(**values)
+            session.add(run)
+        else:
+            run = session.get(JobRun, run_id)
+            for key, value in values.items():
+                setattr(run, key, value)
+        session.commit()
+        return run.id
+    finally:
+        session.close()
+
+
+def run_tracked(job_name: str) -> None:
+    """Выполняет задачу из JOBS под advisory lock и пишет результат в job_run"""
+    func, _ = JOBS[job_name]
+    started = time.monotonic()
+    run_id = _record_run(None, job_name=job_name, worker=WORKER_ID)
+
+    with engine.connect() as lock_conn:
+        locked = _try_advisory_lock(lock_conn, f"job:{job_name}")
+        # advisory lock сессионный: закрываем транзакцию сразу, иначе соединение
+        # висит idle in transaction всю задачу и держит xmin (vacuum не чистит удалённое)
+        lock_conn.commit()
+        if not locked:
+            _record_run(run_id, status="skipped", finished_at=datetime.utcnow(), duration_ms=0)
+            JOB_RUNS.labels(job_name, "skipped").inc()
+            return
+        try:
+            result = func()
+        except Exception as exc:
+            JOB_RUNS.labels(job_name, "failed").inc()
+            JOB_DURATION.labels(job_name).observe(time.monotonic() - started)
+            _record_run(
+                run_id,
+                status="failed",
+                finished_at=datetime.utcnow(),
+                duration_ms=int((time.monotonic() - started) * 1000),
+                error="".join(traceback.format_exception(exc))[-4000:]
+            )
+            logger.exception("Задача %s завершилась с ошибкой", job_name)
+            return
+        finally:
+            _advisory_unlock(lock_conn, f"job:{job_name}")
+            lock_conn.commit()
+
+    JOB_RUNS.labels(job_name, "success").inc()
+    JOB_DURATION.labels(job_name).observe(time.monotonic() - started)
+    _record_run(
+        run_id,
+        status="success",
+        finished_at=datetime.utcnow(),
+        duration_ms=int((time.monotonic() - started) * 1000),
+        result=json.dumps(result, default=str) if result is not None else None
+    )
+
+
+def _acquire_leadership():
+    """Блокируется, пока этот процесс не станет лидером; возвращает соединение с локом"""
+    while True:
+        conn = engine.connect()
+        if _try_advisory_lock(conn, LEADER_LOCK_NAME):
+            conn.commit()
+            logger.info("Воркер %s стал лидером", WORKER_ID)
+            return conn
+        conn.close()
+        time.sleep(LEADER_RETRY_SECONDS)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    if WORKER_METRICS_PORT:
+        # у каждой копии воркера свои метрики, в том числе у ожидающих лидерства
+        start_metrics_server(WORKER_METRICS_PORT)
+    leader_conn = _acquire_leadership()
+
+    scheduler = BlockingScheduler(
+        jobstores={
+            "default": SQLAlchemyJobStore(engine=engine),
+            "local": MemoryJobStore(),
+        },
+        job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 300},
+        timezone="UTC",
+    )
+
+    for job_name, (_, interval) in JOBS.items():
+        scheduler.add_job(
+            "app.worker:run_tracked",
+            "interval",
+            args=[job_name],
+            id=job_name,
+            replace_existing=True,
+            **interval
+        )
+
+    def heartbeat():
+        # Соединение с локом потеряно → лидерство могло перейти к другому воркеру
+        try:
+            leader_conn.execute(text("SELECT 1"))
+            leader_conn.commit()
+        except Exception:
+            logger.error("Потеряно соединение с локом лидера, останавливаемся")
+            scheduler.shutdown(wait=False)
+
+    scheduler.add_job(heartbeat, "interval", seconds=LEADER_HEARTBEAT_SECONDS, jobstore="local")
+
+    try:
+        scheduler.start()
+    finally:
+        leader_conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Бенчмарк сжатия ответов: CPU против байтов на типичных ответах приложения.
+
+Для каждого ответа и каждого алгоритма/уровня считаются размер после сжатия,
+доля от исходного и время сжатия (медиана по повторам), а также пропускная
+способность в МБ/с. По этим цифрам выбраны уровни по умолчанию в
+app.compression: сжатие выполняется на каждый запрос, и лишние миллисекунды
+CPU на воркере дороже нескольких сэкономленных килобайт.
+
+Ответы:
+  check_page        — /check: 10 однофамильцев по 5 отзывов;
+  admin_user_result — admin_search_user_result.html: 30 сотрудников с отзывами;
+  policy            — policy.html;
+  api_employees     — JSON /api/employees: 50 сотрудников;
+  api_check         — JSON /api/employees/check: 10 сотрудников по 5 отзывов;
+  small_json        — короткий JSON-ответ (меньше порога COMPRESSION_MIN_SIZE).
+
+Запуск из корня репозитория:
+    python -m benchmarks.compression_bench --repeats 50
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from app.templating import TEMPLATES_DIR, create_environment
+from benchmarks import report
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SEED = 42
+LEVELS = {
+    "gzip": (1, 6, 9),
+    "br": (1, 4, 6, 11),
+    "zstd": (1, 3, 9, 19),
+}
+
+LAST_NAMES = ["Иванов", "Кузнецова", "Смирнов", "Попова", "Ахмеджанов", "Салтыков-Щедрин"]
+FIRST_NAMES = ["Пётр", "Анна", "Рустам", "Мария", "Игорь", "Екатерина"]
+MIDDLE_NAMES = ["Сергеевич", "Дмитриевна", "Ильдарович", "Олеговна", "Петрович"]
+POSITIONS = ["Старший продавец", "Кассир", "Кладовщик", "Менеджер по продажам", "Бариста", "Курьер"]
+PHRASES = [
+    "Систематически опаздывал на смену.",
+    "Дважды не вышел без предупреждения.",
+    "Недостача по итогам инвентаризации, частично возмещена.",
+    "С покупателями вежлив, план продаж выполнял.",
+    "Наставлял новых сотрудников.",
+    "Нарушал кассовую дисциплину.",
+    "Ответственный, инициативный, рекомендую.",
+    "Конфликтовал с коллегами.",
+]
+REASONS = ["По собственному желанию", "По соглашению сторон", "Истёк срок договора", None]
+
+
+def _text(rng: random.Random, max_phrases: int = 4):
+    count = rng.randint(0, max_phrases)
+    return " ".join(rng.sample(PHRASES, count)) or None
+
+
+def _full_name(rng: random.Random) -> str:
+    return f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(MIDDLE_NAMES)}"
+
+
+def _record(rng: random.Random, record_id: int) -> SimpleNamespace:
+    hired_at = datetime(2015, 1, 1) + timedelta(days=rng.randint(0, 2500))
+    return SimpleNamespace(
+        id=record_id, employer_id=rng.randint(1, 5000), position=rng.choice(POSITIONS),
+        hired_at=hired_at, fired_at=hired_at + timedelta(days=rng.randint(30, 900)),
+        created_at=hired_at + timedelta(days=1000), misconduct=_text(rng),
+        dismissal_reason=rng.choice(REASONS), commendation=_text(rng, 2)
+    )
+
+
+def _employee(rng: random.Random, emp_id: int, records: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=emp_id, full_name=_full_name(rng),
+        birth_date=date(1970, 1, 1) + timedelta(days=rng.randint(0, 12000)),
+        contact=f"+7 9{rng.randint(10, 99)} {rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(10, 99)}",
+        records=[_record(rng, emp_id * 100 + n) for n in range(records)]
+    )
+
+
+def _record_json(record: SimpleNamespace) -> dict:
+    return {
+        "id": record.id,
+        "position": record.position,
+        "hired_at": record.hired_at.isoformat(),
+        "fired_at": record.fired_at.isoformat(),
+        "misconduct": record.misconduct,
+        "commendation": record.commendation,
+    }
+
+
+def build_payloads() -> dict:
+    rng = random.Random(SEED)
+    env = create_environment(auto_reload=False, bytecode_cache_dir="")
+    user = SimpleNamespace(
+        id=7, name="Пётр", email="petr@example.ru", role="admin", verification_status="approved",
+        rejection_reason=None, company_name="ООО Ромашка", is_blocked=False, created_at=datetime(2024, 5, 1),
+        is_approved=True, city="Казань", inn_or_ogrn="1651000010", passport_filename=None,
+        is_email_verified=True, email_verification_token=None, password_reset_requested_at=None
+    )
+
+    check_employees = [_employee(rng, n, 5) for n in range(10)]
+    check_result = [
+        {
+            "employee_id": emp.id, "full_name": emp.full_name, "birth_date": emp.birth_date,
+            "records": [
+                {"is_blocked_employer": False, **vars(r)} for r in emp.records
+            ],
+            "record_count": len(emp.records), "checks_count": rng.randint(0, 40),
+            "likes_count": rng.randint(0, 10), "dislikes_count": rng.randint(0, 5),
+            "my_reaction": rng.choice(["like", "dislike", None]),
+        }
+        for emp in check_employees
+    ]
+    api_check = [
+        {
+            "employee_id": item["employee_id"], "full_name": item["full_name"],
+            "birth_date": item["birth_date"].isoformat(), "record_count": item["record_count"],
+            "records": [
+                {"is_blocked_employer": False, "employer_id": r.employer_id, "dismissal_reason": r.dismissal_reason,
+                 **_record_json(r)}
+                for r in emp.records
+            ],
+        }
+        for item, emp in zip(check_result, check_employees)
+    ]
+    api_employees = [
+        {
+            "id": emp.id, "full_name": emp.full_name, "birth_date": emp.birth_date.isoformat(),
+            "contact": emp.contact, "record_count": len(emp.records),
+            "records": [_record_json(r) for r in emp.records],
+        }
+        for emp in (_employee(rng, n, rng.randint(0, 3)) for n in range(50))
+    ]
+
+    def render(name: str, **context) -> bytes:
+        return env.get_template(name).render({"request": None, **context}).encode("utf-8")
+
+    def to_json(data) -> bytes:
+        # как JSONResponse: без пробелов, ensure_ascii=False
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    return {
+        "check_page": render("check.html", user=user, result=check_result),
+        "admin_user_result": render(
+            "admin_search_user_result.html", user=user, searched_email=user.email, found_user=user,
+            employees=[_employee(rng, n, rng.randint(0, 4)) for n in range(30)]
+        ),
+        "policy": render("policy.html"),
+        "api_employees": to_json(api_employees),
+        "api_check": to_json(api_check),
+        "small_json": to_json({"status": "success", "employee_id": 184467}),
+    }
+
+
+def compressors() -> dict:
+    result = {}
+    for level in LEVELS["gzip"]:
+        result[f"gzip-{level}"] = lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0)
+    if brotli is not None:
+        for quality in LEVELS["br"]:
+            result[f"br-{quality}"] = lambda data, quality=quality: brotli.compress(data, quality=quality)
+    if zstandard is not None:
+        for level in LEVELS["zstd"]:
+            result[f"zstd-{level}"] = zstandard.ZstdCompressor(level=level).compress
+    return result
+
+
+def bench(payloads: dict, repeats: int) -> dict:
+    results = {}
+    for payload_name, data in payloads.items():
+        print(f"\n{payload_name}: {len(data)} байт")
+        print(f"  {'алгоритм':<10} {'байт':>8} {'доля':>7} {'мкс':>9} {'МБ/с':>8}")
+        for name, compress in compressors().items():
+            samples = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                compressed = compress(data)
+                samples.append((time.perf_counter() - started) * 1e6)
+            median_us = statistics.median(samples)
+            row = {
+                "original_bytes": len(data),
+                "compressed_bytes": len(compressed),
+                "ratio": round(len(compressed) / len(data), 4),
+                "median_us": round(median_us, 1),
+                "min_us": round(min(samples), 1),
+                "mb_per_s": round(len(data) / median_us, 1),
+            }
+            results[f"{payload_name}/{name}"] = row
+            print(
+                f"  {name:<10} {row['compressed_bytes']:>8} {row['ratio']:>7.3f} "
+                f"{row['median_us']:>9.1f} {row['mb_per_s']:>8.1f}"
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--out", default=report.RESULTS_DIR)
+    args = parser.parse_args()
+
+    if not os.path.isdir(TEMPLATES_DIR):
+        raise SystemExit("Запускайте из корня репозитория: нужен каталог templates")
+    if brotli is None or zstandard is None:
+        print("Не установлены: " + ", ".join(
+            name for name, module in (("brotli", brotli), ("zstandard", zstandard)) if module is None
+        ))
+
+    results = bench(build_payloads(), args.repeats)
+    data = {"meta": report.run_meta({"repeats": args.repeats}), "steps": results}
+    print(f"\nРезультат: {report.write_result('compression', data, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
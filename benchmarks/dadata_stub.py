@@ -0,0 +1,216 @@
+"""
+Локальный стенд API подсказок DaData (suggest/party) и бенчмарк автокомплита.
+
+Стенд отвечает в формате DaData на POST /suggestions/api/4_1/rs/suggest/party
+по детерминированному списку организаций. Задержку и долю ошибок можно задать,
+чтобы проверить таймауты и предохранитель app.dadata. GET /stats — сколько
+запросов пришло (и сбрасывает счётчик).
+
+    python -m benchmarks.dadata_stub serve --port 8765 --delay-ms 40 --fail-rate 0.1
+    DADATA_URL=http://127.0.0.1:8765/suggestions/api/4_1/rs/suggest/party DADATA_TOKEN=x uvicorn app.main:app
+
+Бенчмарк поднимает стенд в этом же процессе и прогоняет «набор текста»:
+каждая сессия — запросы на каждую следующую букву названия (худший случай,
+без паузы 300 мс во фронтенде). Сравниваются:
+  per_request — новый httpx.AsyncClient на каждый запрос (как было);
+  pooled      — общий клиент app.dadata без кэша;
+  cached      — общий клиент с LRU/TTL-кэшем и отбором по началу запроса.
+Стенд работает по HTTP без TLS, поэтому выигрыш per_request → pooled здесь
+меньше, чем с настоящей DaData (там ещё DNS и TLS-рукопожатие).
+
+Запуск из корня репозитория:
+    python -m benchmarks.dadata_stub bench --sessions 50 --delay-ms 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import List
+
+# Модули app читают настройки при импорте; к БД бенчмарк не обращается
+os.environ.setdefault("SECRET_KEY", "dadata-bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("DADATA_TOKEN", "stub-token")
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from benchmarks import report
+
+SUGGEST_PATH = "/suggestions/api/4_1/rs/suggest/party"
+SEED = 42
+ORGANIZATIONS = 500
+
+FORMS = ["ООО", "АО", "ИП", "ПАО"]
+WORDS = [
+    "Ромашка", "Техностр", "Техносервис", "Северный", "Альфа", "Альтаир", "Восток", "Восход",
+    "Гранит", "Гарант", "Магистраль", "Меридиан", "Продторг", "Промсвязь", "Стройинвест",
+    "Строймаш", "Логистик", "Лидер", "Вектор", "Весна", "Кристалл", "Континент", "Сибирь",
+]
+CITIES = ["г Москва", "г Казань", "г Новосибирск", "г Екатеринбург", "г Самара", "г Ростов-на-Дону"]
+
+
+def build_organizations(count: int = ORGANIZATIONS) -> List[dict]:
+    rng = random.Random(SEED)
+    result = []
+    for n in range(count):
+        name = f'{rng.choice(FORMS)} "{rng.choice(WORDS).upper()} {rng.choice(WORDS).upper()}"'
+        result.append({
+            "value": name,
+            "data": {
+                "inn": f"{7700000000 + n * 7919:010d}",
+                "address": {"value": f"{rng.choice(CITIES)}, ул {rng.choice(WORDS)}, д {rng.randint(1, 120)}"},
+            },
+        })
+    return result
+
+
+def create_stub(delay_ms: float = 0, fail_rate: float = 0.0) -> Starlette:
+    organizations = build_organizations()
+    index = [
+        (org, f'{org["value"]} {org["data"]["inn"]} {org["data"]["address"]["value"]}'.casefold().split())
+        for org in organizations
+    ]
+    rng = random.Random(SEED)
+    stats = {"requests": 0}
+
+    async def suggest(request: Request):
+        stats["requests"] += 1
+        payload = await request.json()
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+        if fail_rate and rng.random() < fail_rate:
+            return JSONResponse({"message": "stub failure"}, status_code=503)
+        if not request.headers.get("authorization", "").startswith("Token "):
+            return JSONResponse({"message": "Unauthorized"}, status_code=401)
+        words = payload.get("query", "").casefold().replace('"', " ").split()
+        count = payload.get("count", 10)
+        found = [
+            org for org, tokens in index
+            if all(any(token.strip('",').startswith(word) for token in tokens) for word in words)
+        ]
+        return JSONResponse({"suggestions": found[:count]})
+
+    async def get_stats(request: Request):
+        result = dict(stats)
+        stats["requests"] = 0
+        return JSONResponse(result)
+
+    return Starlette(routes=[
+        Route(SUGGEST_PATH, suggest, methods=["POST"]),
+        Route("/stats", get_stats),
+    ])
+
+
+class _StubServer:
+    """Стенд в фоновом потоке на время бенчмарка"""
+
+    def __init__(self, app: Starlette, port: int):
+        self.server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def typing_sessions(sessions: int) -> List[List[str]]:
+    """Запросы по буквам: «ро», «ром», ... — для названий организаций из стенда"""
+    rng = random.Random(SEED + 1)
+    organizations = build_organizations()
+    result = []
+    for _ in range(sessions):
+        name = rng.choice(organizations)["value"].split('"')[1].casefold()
+        typed = name[:rng.randint(6, min(len(name), 14))]
+        result.append([typed[:end] for end in range(2, len(typed) + 1)])
+    return result
+
+
+async def _run_mode(mode: str, url: str, sessions: List[List[str]]) -> dict:
+    from app.dadata import DadataSuggestions, SuggestionCache, create_client
+
+    samples, errors = [], 0
+    suggestions = DadataSuggestions(url=url, client=create_client())
+    if mode == "pooled":
+        suggestions.cache = SuggestionCache(max_size=0)
+
+    async def per_request(query: str):
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                url, json={"query": query, "count": 10},
+                headers={"Authorization": "Token stub-token", "Content-Type": "application/json"}
+            )
+            return response.json()
+
+    started_all = time.perf_counter()
+    for session in sessions:
+        for query in session:
+            started = time.perf_counter()
+            try:
+                if mode == "per_request":
+                    await per_request(query)
+                else:
+                    await suggestions.suggest(query)
+            except Exception:
+                errors += 1
+            samples.append((time.perf_counter() - started) * 1000)
+    wall = time.perf_counter() - started_all
+    await suggestions.close()
+    return report.summarize(samples, wall_seconds=wall, errors=errors)
+
+
+def bench(args) -> None:
+    base = f"http://127.0.0.1:{args.port}"
+    sessions = typing_sessions(args.sessions)
+    steps = {}
+    with _StubServer(create_stub(args.delay_ms, args.fail_rate), args.port):
+        print(f"{'режим':<12} {'запросов':>8} {'к стенду':>9} {'p50 мс':>8} {'p95 мс':>8} {'ошибок':>7}")
+        for mode in ("per_request", "pooled", "cached"):
+            httpx.get(base + "/stats")
+            result = asyncio.run(_run_mode(mode, base + SUGGEST_PATH, sessions))
+            result["upstream_requests"] = httpx.get(base + "/stats").json()["requests"]
+            steps[mode] = result
+            print(
+                f"{mode:<12} {result['count']:>8} {result['upstream_requests']:>9} "
+                f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['errors']:>7}"
+            )
+
+    params = {"sessions": args.sessions, "delay_ms": args.delay_ms, "fail_rate": args.fail_rate}
+    data = {"meta": report.run_meta(params), "steps": steps}
+    print(f"Результат: {report.write_result('dadata', data, args.out)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("serve", "bench"):
+        command = sub.add_parser(name)
+        command.add_argument("--port", type=int, default=8765)
+        command.add_argument("--delay-ms", type=float, default=20)
+        command.add_argument("--fail-rate", type=float, default=0.0)
+        if name == "bench":
+            command.add_argument("--sessions", type=int, default=50)
+            command.add_argument("--out", default=report.RESULTS_DIR)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        uvicorn.run(create_stub(args.delay_ms, args.fail_rate), port=args.port)
+    else:
+        bench(args)
+
+
+if __name__ == "__main__":
+    main()
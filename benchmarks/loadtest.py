@@ -0,0 +1,282 @@
+"""
+Нагрузочный тест основных сценариев на app.main:app.
+
+Приложение запускается в этом же процессе (httpx.ASGITransport), без сети и
+uvicorn: замер включает middleware, обработчики, шаблоны и PostgreSQL, но не
+TCP. Каждый виртуальный пользователь — отдельный работодатель из наполнения
+(benchmarks.seed) со своим IP и в цикле проходит:
+
+    login → 2fa → check → react → add_employee → add_record → consent_pdf,
+    плюс admin_list от имени администратора.
+
+Внешние вызовы заглушены, чтобы мерить свой код: reCAPTCHA всегда проходит,
+2FA-письмо не отправляется (код читается из БД). Глобальный лимит 100 запросов
+в минуту отключается (--with-rate-limit оставляет его). consent_pdf пропускается,
+если не установлен wkhtmltopdf. Перед прогоном состояние учётных записей
+виртуальных пользователей сбрасывается, поэтому прогоны повторяемы.
+
+Результат — throughput и p50/p95/p99 по каждому шагу, в консоль и в JSON
+(benchmarks/results/loadtest-<время>-<коммит>.json) для сравнения коммитов.
+
+Запуск из корня репозитория (база наполнена benchmarks.seed):
+    DATABASE_URL=postgresql://.../truststaff_bench python -m benchmarks.loadtest run --users 16 --iterations 10
+    python -m benchmarks.loadtest compare old.json new.json --threshold 10
+"""
+import argparse
+import asyncio
+import shutil
+import time
+from collections import defaultdict
+
+import httpx
+
+from benchmarks import report
+from benchmarks.seed import ADMIN_EMAIL, BENCH_ACCOUNTS, BENCH_PASSWORD
+
+STEPS = ["login", "2fa", "check", "react", "add_employee", "add_record", "consent_pdf", "admin_list"]
+
+# Ожидаемые коды ответа: ошибки валидации в этих формах отдаются страницей с 200,
+# поэтому для форм с редиректом 200 — тоже ошибка
+EXPECTED_STATUS = {
+    "login": 200,
+    "2fa": 302,
+    "check": 200,
+    "react": 303,
+    "add_employee": 302,
+    "add_record": 302,
+    "consent_pdf": 200,
+    "admin_list": 200,
+}
+
+# Дневной лимит проверок (app/routes/check.py) и лимит сотрудников на работодателя
+MAX_ITERATIONS = 20
+BASE_URL = "https://bench.local"  # cookie access_token выставляется с Secure
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, step: str, client: httpx.AsyncClient, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.samples[step].append(elapsed_ms)
+        if response.status_code != EXPECTED_STATUS[step]:
+            self.errors[step] += 1
+        return response
+
+
+def _client(app, ip: str) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, client=(ip, 40000))
+    return httpx.AsyncClient(transport=transport, base_url=BASE_URL, timeout=120)
+
+
+def _vu_ip(vu: int) -> str:
+    return f"10.77.{vu // 250}.{vu % 250 + 1}"
+
+
+def prepare(engine, users: int) -> dict:
+    """Сброс состояния учётных записей виртуальных пользователей и план прогона"""
+    from sqlalchemy import text
+
+    with engine.begin() as conn:
+        accounts = conn.execute(text("""
+            SELECT id, email FROM "user"
+            WHERE id <= :limit AND verification_status = 'approved' AND NOT is_blocked AND role = 'user'
+            ORDER BY id LIMIT :users
+        """), {"limit": BENCH_ACCOUNTS, "users": users}).fetchall()
+        if len(accounts) < users:
+            raise SystemExit(f"В наполнении только {len(accounts)} учётных записей для виртуальных пользователей")
+        ids = [row.id for row in accounts]
+
+        own_employees = "SELECT id FROM employee WHERE created_by_user_id = ANY(:ids)"
+        conn.execute(text(f"DELETE FROM employee_reaction WHERE employee_id IN ({own_employees})"), {"ids": ids})
+        conn.execute(text(f"DELETE FROM reputationrecord WHERE employee_id IN ({own_employees})"), {"ids": ids})
+        conn.execute(text("DELETE FROM employee WHERE created_by_user_id = ANY(:ids)"), {"ids": ids})
+        conn.execute(text("DELETE FROM reputationrecord WHERE employer_id = ANY(:ids)"), {"ids": ids})
+        conn.execute(text("DELETE FROM employee_reaction WHERE employer_id = ANY(:ids)"), {"ids": ids})
+        conn.execute(text("DELETE FROM check_log WHERE user_id = ANY(:ids)"), {"ids": ids})
+        conn.execute(text("DELETE FROM loginattempt WHERE email LIKE '%@bench.local'"))
+        conn.execute(text("DELETE FROM rate_limit"))
+
+        # ФИО для проверок: у каждого есть однофамильцы и отзывы
+        names = [row[0] for row in conn.execute(text(
+            "SELECT DISTINCT full_name FROM employee ORDER BY full_name LIMIT 200"
+        ))]
+        targets = [row[0] for row in conn.execute(text(
+            "SELECT id FROM employee WHERE created_by_user_id > :limit ORDER BY id LIMIT 500"
+        ), {"limit": BENCH_ACCOUNTS})]
+        seed_counts = {
+            "users": conn.execute(text('SELECT count(*) FROM "user"')).scalar(),
+            "employees": conn.execute(text("SELECT count(*) FROM employee")).scalar(),
+            "records": conn.execute(text("SELECT count(*) FROM reputationrecord")).scalar(),
+            "reactions": conn.execute(text("SELECT count(*) FROM employee_reaction")).scalar(),
+            "check_logs": conn.execute(text("SELECT count(*) FROM check_log")).scalar(),
+        }
+    if not names or not targets:
+        raise SystemExit("База не наполнена: запустите python -m benchmarks.seed")
+    return {"accounts": accounts, "names": names, "targets": targets, "seed_counts": seed_counts}
+
+
+async def login(rec: Recorder, client: httpx.AsyncClient, engine, user_id: int, email: str) -> None:
+    from sqlalchemy import text
+
+    await rec.request("login", client, "POST", "/login", data={
+        "email": email, "password": BENCH_PASSWORD, "g-recaptcha-response": "bench"
+    })
+
+    def read_code():
+        with engine.connect() as conn:
+            return conn.execute(text('SELECT twofa_code FROM "user" WHERE id = :id'), {"id": user_id}).scalar()
+
+    code = await asyncio.to_thread(read_code)
+    # access_token из ответа клиент сохраняет сам
+    await rec.request("2fa", client, "POST", "/2fa", data={"twofa_code": code or "", "email": email})
+
+
+async def virtual_user(vu: int, app, engine, plan: dict, rec: Recorder, admin: httpx.AsyncClient,
+                       args) -> None:
+    from sqlalchemy import text
+
+    account = plan["accounts"][vu]
+    names, targets = plan["names"], plan["targets"]
+
+    def last_employee_id():
+        with engine.connect() as conn:
+            return conn.execute(text(
+                "SELECT max(id) FROM employee WHERE created_by_user_id = :id"
+            ), {"id": account.id}).scalar()
+
+    async with _client(app, _vu_ip(vu)) as client:
+        for i in range(args.warmup + args.iterations):
+            # прогревочные проходы пишутся в отдельный, отбрасываемый Recorder
+            rec_step = rec if i >= args.warmup else Recorder()
+            n = vu * (args.warmup + args.iterations) + i
+
+            await login(rec_step, client, engine, account.id, account.email)
+            await rec_step.request("check", client, "POST", "/check", data={"full_name": names[n % len(names)]})
+            await rec_step.request("react", client, "POST", f"/employee/{targets[n % len(targets)]}/react",
+                                   data={"reaction": "like" if n % 3 else "dislike"})
+            await rec_step.request("add_employee", client, "POST", "/add-employee", data={
+                "last_name": "Нагрузочный", "first_name": f"Тест{i}", "middle_name": "Сценарьевич",
+                "birth_date": "1990-05-17", "contact": f"+7999{n:07d}",
+            })
+            employee_id = await asyncio.to_thread(last_employee_id)
+            if employee_id:
+                await rec_step.request("add_record", client, "POST", f"/employee/{employee_id}/add-record", data={
+                    "position": "Кладовщик", "hired_at": "2022-03-01", "fired_at": "2023-08-15",
+                    "dismissal_reason": "По собственному желанию",
+                    "commendation": "Аккуратный, без нареканий",
+                })
+                if args.pdf:
+                    await rec_step.request("consent_pdf", client, "POST", f"/employee/{employee_id}/generate-consent")
+            await rec_step.request("admin_list", admin, "GET", "/admin/users/list")
+
+
+async def run_journeys(app, engine, plan: dict, args) -> tuple:
+    rec = Recorder()
+    admin_id = plan["admin_id"]
+    async with _client(app, "10.77.255.1") as admin:
+        await login(Recorder(), admin, engine, admin_id, ADMIN_EMAIL)
+        if "access_token" not in admin.cookies:
+            raise SystemExit("Администратор не вошёл: проверьте наполнение")
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            virtual_user(vu, app, engine, plan, rec, admin, args) for vu in range(args.users)
+        ))
+        wall = time.perf_counter() - started
+    return rec, wall
+
+
+def run(args) -> None:
+    if args.warmup + args.iterations > MAX_ITERATIONS:
+        raise SystemExit(f"warmup + iterations не больше {MAX_ITERATIONS}: дневной лимит проверок и сотрудников")
+
+    # Импорт после разбора аргументов: app.database читает DATABASE_URL при импорте
+    from sqlalchemy import text
+
+    import app.routes.login as login_routes
+    from app.database import engine
+    from app.limit import rate_limit_100_per_minute
+    from app.main import app
+
+    login_routes.verify_recaptcha = lambda token: True
+    login_routes.send_2fa_code = lambda email, code: None
+    if not args.with_rate_limit:
+        app.dependency_overrides[rate_limit_100_per_minute] = lambda: None
+    if args.no_sql_echo:
+        engine.echo = False
+    args.pdf = not args.skip_pdf and shutil.which("wkhtmltopdf") is not None
+
+    plan = prepare(engine, args.users)
+    with engine.connect() as conn:
+        plan["admin_id"] = conn.execute(text('SELECT id FROM "user" WHERE email = :e'), {"e": ADMIN_EMAIL}).scalar()
+
+    rec, wall = asyncio.run(run_journeys(app, engine, plan, args))
+
+    steps = {
+        step: report.summarize(rec.samples[step], wall, rec.errors[step])
+        for step in STEPS if rec.samples.get(step)
+    }
+    all_samples = [ms for samples in rec.samples.values() for ms in samples]
+    data = {
+        "meta": report.run_meta({
+            "users": args.users, "iterations": args.iterations, "warmup": args.warmup,
+            "rate_limit": args.with_rate_limit, "consent_pdf": args.pdf, "sql_echo": engine.echo,
+            "pool_size": engine.pool.size() if hasattr(engine.pool, "size") else None,
+        }),
+        "seed": plan["seed_counts"],
+        "wall_seconds": round(wall, 3),
+        "total": report.summarize(all_samples, wall, sum(rec.errors.values())),
+        "steps": steps,
+    }
+
+    print(f"{'шаг':<14}{'запросов':>9}{'ошибок':>8}{'rps':>9}{'p50 мс':>10}{'p95 мс':>10}{'p99 мс':>10}")
+    for step, s in {**steps, "всего": data["total"]}.items():
+        print(f"{step:<14}{s['count']:>9}{s['errors']:>8}{s['throughput_rps']:>9.1f}"
+              f"{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}")
+    if not args.pdf:
+        print("consent_pdf пропущен (нет wkhtmltopdf или --skip-pdf)")
+    print(f"Результат: {report.write_result('loadtest', data, args.out)}")
+
+
+def compare(args) -> None:
+    old, new = report.load_result(args.old), report.load_result(args.new)
+    print(f"{old['meta']['commit'][:8]} → {new['meta']['commit'][:8]}, метрика {args.metric}")
+    regressions = report.compare(old["steps"], new["steps"], args.metric, args.threshold)
+    if regressions:
+        raise SystemExit(f"Регрессия больше {args.threshold}%: {', '.join(regressions)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="прогон сценариев")
+    run_parser.add_argument("--users", type=int, default=16, help="виртуальных пользователей")
+    run_parser.add_argument("--iterations", type=int, default=10, help="проходов сценария на пользователя")
+    run_parser.add_argument("--warmup", type=int, default=1, help="проходов без замера")
+    run_parser.add_argument("--with-rate-limit", action="store_true", help="не отключать лимит 100 запросов/мин")
+    run_parser.add_argument("--no-sql-echo", action="store_true",
+                            help="выключить echo движка (по умолчанию — как в app/database.py)")
+    run_parser.add_argument("--skip-pdf", action="store_true", help="не генерировать PDF-согласия")
+    run_parser.add_argument("--out", default=report.RESULTS_DIR)
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="сравнить два JSON-результата")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"])
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="допустимый рост, %%")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    if args.command == "run" and args.users > BENCH_ACCOUNTS:
+        parser.error(f"--users не больше {BENCH_ACCOUNTS} (BENCH_ACCOUNTS в benchmarks.seed)")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Микробенчмарки горячих функций на чистом Python (без БД и HTTP).
+
+Каждый бенчмарк — функция-фабрика в BENCHMARKS: готовит реалистичные входные
+данные (кириллические ФИО, длинные тексты отзывов до MAX_TEXT_LENGTH) и
+возвращает вызываемый объект без аргументов. Замер как в pytest-benchmark:
+число вызовов в раунде подбирается через timeit.autorange (не меньше 0.2 с),
+затем несколько раундов; в результат идут min/median/mean/stddev в мкс на вызов.
+
+Эталон (baseline) хранится в benchmarks/baselines/micro.json. Абсолютные
+значения зависят от машины, поэтому эталон пересохраняют на той же машине,
+где потом сравнивают (например, на CI-раннере). Эталон сохраняется только
+с чистого дерева и по всем бенчмаркам (без -k), чтобы commit в meta
+соответствовал замеренному коду.
+
+Запуск из корня репозитория:
+    python -m benchmarks.micro run                       # замер, JSON в benchmarks/results
+    python -m benchmarks.micro run -k bad_words          # только бенчмарки с подстрокой в имени
+    python -m benchmarks.micro baseline                  # перезаписать эталон
+    python -m benchmarks.micro compare --threshold 20    # замер и сравнение с эталоном
+    python -m benchmarks.micro compare --result benchmarks/results/micro-....json
+"""
+import argparse
+import json
+import os
+import statistics
+import timeit
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict
+
+# Модули app читают настройки при импорте; к БД бенчмарки не обращаются
+os.environ.setdefault("SECRET_KEY", "microbench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from benchmarks import report
+
+BASELINE_PATH = os.path.join("benchmarks", "baselines", "micro.json")
+ROUNDS = 7
+
+NAME_PARTS = [
+    ("Иванов", "Пётр", "Сергеевич"),
+    ("Кузнецова", "Анна", "Дмитриевна"),
+    ("Салтыков-Щедрин", "Михаил", "Евграфович"),
+    ("Ахмеджанов", "Рустам", "Ильдарович"),
+]
+RECORD_TEXT = (
+    "Систематически опаздывал на смену, дважды не вышел без предупреждения. "
+    "Недостача по итогам инвентаризации в марте, частично возмещена. "
+    "С покупателями вежлив, план продаж выполнял, наставлял новых сотрудников. "
+)
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def _long_text(length: int) -> str:
+    return (RECORD_TEXT * (length // len(RECORD_TEXT) + 1))[:length]
+
+
+@benchmark
+def contains_bad_words_name():
+    from app.routes.employee_management import contains_bad_words
+    names = [part for parts in NAME_PARTS for part in parts]
+    return lambda: [contains_bad_words(name) for name in names]
+
+
+@benchmark
+def contains_bad_words_record_text():
+    from app.record_validation import MAX_TEXT_LENGTH
+    from app.routes.employee_management import contains_bad_words
+    text = _long_text(MAX_TEXT_LENGTH)
+    return lambda: contains_bad_words(text)
+
+
+@benchmark
+def profanity_full_name():
+    # так проверяется имя при регистрации (app.routes.register)
+    from app.profanity import contains_profanity
+    names = [" ".join(parts) for parts in NAME_PARTS]
+    return lambda: [contains_profanity(name) for name in names]
+
+
+def _legacy_contains_bad_words(text: str) -> bool:
+    """Проверка до app.profanity: подстрочный поиск каждого слова списка"""
+    from app.bad_words import BAD_WORDS
+    return any(bad in text.lower() for bad in BAD_WORDS)
+
+
+@benchmark
+def profanity_legacy_record_fields():
+    from app.record_validation import MAX_TEXT_LENGTH
+    fields = [_long_text(MAX_TEXT_LENGTH), _long_text(300), _long_text(200), "Старший продавец-консультант"]
+    return lambda: any(_legacy_contains_bad_words(field) for field in fields)
+
+
+@benchmark
+def profanity_automaton_record_fields():
+    from app.profanity import contains_profanity
+    from app.record_validation import MAX_TEXT_LENGTH
+    fields = [_long_text(MAX_TEXT_LENGTH), _long_text(300), _long_text(200), "Старший продавец-консультант"]
+    return lambda: contains_profanity(*fields)
+
+
+@benchmark
+def profanity_automaton_evasions():
+    from app.profanity import contains_profanity
+    texts = ["xуй", "cyka", "п0дор", "3алупа", "хуууй", "a$$hole", "s.hit", "Соска", "ivan455@mail.ru"]
+    return lambda: [contains_profanity(text) for text in texts]
+
+
+@benchmark
+def validate_record_batch():
+    """Пачка из 10 отзывов с заполненными текстовыми полями"""
+    from app.record_validation import MAX_TEXT_LENGTH, validate_records
+    records = [
+        {
+            "position": "Старший продавец-консультант", "hired_at": "2019-03-01", "fired_at": "2023-08-15",
+            "misconduct": _long_text(MAX_TEXT_LENGTH), "dismissal_reason": "По собственному желанию",
+            "commendation": _long_text(200),
+        }
+        for _ in range(10)
+    ]
+    return lambda: validate_records(records)
+
+
+@benchmark
+def create_access_token():
+    from app.auth import create_access_token
+    return lambda: create_access_token({"sub": "184467"})
+
+
+@benchmark
+def decode_token():
+    from app.auth import create_access_token, decode_token
+    token = create_access_token({"sub": "184467"})
+    return lambda: decode_token(token)
+
+
+@benchmark
+def decode_token_invalid():
+    from app.auth import create_access_token, decode_token
+    token = create_access_token({"sub": "184467"})[:-4] + "AAAA"
+    return lambda: decode_token(token)
+
+
+@benchmark
+def generate_safe_filename():
+    from app.routes.onboarding import generate_safe_filename
+    names = ["Паспорт скан.PDF", "photo_2024-05-01.jpeg", "passport", "документ.docx"]
+    return lambda: [generate_safe_filename(name, 184467) for name in names]
+
+
+@benchmark
+def check_result_assembly():
+    """20 однофамильцев по 10 отзывов, каждый 7-й работодатель заблокирован"""
+    from app.models import Employee, ReputationRecord
+    from app.routes.check import assemble_check_result
+
+    employees, records_by_employee, counts, reactions = [], {}, {}, {}
+    for emp_id in range(1, 21):
+        last, first, middle = NAME_PARTS[emp_id % len(NAME_PARTS)]
+        employees.append(Employee(
+            id=emp_id, full_name=f"{last} {first} {middle}",
+            birth_date=date(1985, 1, 1) + timedelta(days=emp_id * 97), created_by_user_id=1
+        ))
+        records_by_employee[emp_id] = [
+            ReputationRecord(
+                id=emp_id * 100 + n, employee_id=emp_id, employer_id=n + 2,
+                employer_blocked=n % 7 == 0, position="Старший продавец-консультант",
+                hired_at=datetime(2019, 3, 1), fired_at=datetime(2023, 8, 15),
+                misconduct=_long_text(300), dismissal_reason="По собственному желанию",
+                commendation=_long_text(200)
+            )
+            for n in range(10)
+        ]
+        counts[emp_id] = {"checks": emp_id * 3, "likes": emp_id, "dislikes": emp_id % 4}
+        if emp_id % 2:
+            reactions[emp_id] = "like"
+    return lambda: assemble_check_result(employees, records_by_employee, counts, reactions)
+
+
+def _page_request(accept_encoding: str = "gzip, deflate, br"):
+    from starlette.requests import Request
+    return Request({
+        "type": "http", "method": "GET", "path": "/policy", "query_string": b"",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+        "state": {"csp_nonce": "bench-nonce"},
+    })
+
+
+@benchmark
+def policy_page_render():
+    """/policy как было: рендер шаблона на каждый запрос"""
+    from app.templating import templates
+    request = _page_request()
+    return lambda: templates.TemplateResponse("policy.html", {"request": request})
+
+
+@benchmark
+def policy_page_cached():
+    """/policy из app.page_cache: готовый brotli-вариант"""
+    from app.page_cache import cached_page
+    request = _page_request()
+    return lambda: cached_page(request, "policy.html")
+
+
+def measure(factory: Callable[[], Callable[[], object]], rounds: int = ROUNDS) -> dict:
+    func = factory()
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    per_call_us = [total / number * 1e6 for total in timer.repeat(repeat=rounds, number=number)]
+    return {
+        "min_us": round(min(per_call_us), 4),
+        "median_us": round(statistics.median(per_call_us), 4),
+        "mean_us": round(statistics.fmean(per_call_us), 4),
+        "stddev_us": round(statistics.stdev(per_call_us), 4) if rounds > 1 else 0.0,
+        "rounds": rounds,
+        "iterations": number,
+        "ops": round(1e6 / statistics.median(per_call_us), 1),
+    }
+
+
+def run_all(pattern: str = "", rounds: int = ROUNDS) -> dict:
+    results = {}
+    print(f"{'бенчмарк':<34}{'min мкс':>12}{'median мкс':>12}{'stddev':>10}{'ops/с':>14}")
+    for name, factory in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        stats = measure(factory, rounds)
+        results[name] = stats
+        print(f"{name:<34}{stats['min_us']:>12.2f}{stats['median_us']:>12.2f}"
+              f"{stats['stddev_us']:>10.2f}{stats['ops']:>14.0f}")
+    return {"meta": report.run_meta({"rounds": rounds, "filter": pattern}), "benchmarks": results}
+
+
+def cmd_run(args) -> None:
+    data = run_all(args.k, args.rounds)
+    print(f"Результат: {report.write_result('micro', data, args.out)}")
+
+
+def cmd_baseline(args) -> None:
+    if args.k:
+        raise SystemExit("Эталон пишется по всем бенчмаркам, -k не поддерживается")
+    if report.run_meta({})["dirty"] and not args.allow_dirty:
+        raise SystemExit("В дереве есть незакоммиченные изменения: закоммитьте их или передайте --allow-dirty")
+    data = run_all("", args.rounds)
+    os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+    with open(args.baseline, "w", encoding="utf-8") as out:
+        json.dump(data, out, ensure_ascii=False, indent=2)
+    print(f"Эталон сохранён: {args.baseline}")
+
+
+def cmd_compare(args) -> None:
+    baseline = report.load_result(args.baseline)
+    current = report.load_result(args.result) if args.result else run_all(args.k, args.rounds)
+    if args.k:
+        baseline["benchmarks"] = {
+            name: stats for name, stats in baseline["benchmarks"].items() if args.k in name
+        }
+    print(f"\nэталон {baseline['meta']['commit'][:8]} → {current['meta']['commit'][:8]}, метрика {args.metric}")
+    regressions = report.compare(baseline["benchmarks"], current["benchmarks"], args.metric, args.threshold)
+    if regressions:
+        raise SystemExit(f"Регрессия больше {args.threshold}%: {', '.join(regressions)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(sub):
+        sub.add_argument("-k", default="", help="только бенчмарки с этой подстрокой в имени")
+        sub.add_argument("--rounds", type=int, default=ROUNDS)
+
+    run_parser = commands.add_parser("run", help="замер")
+    add_common(run_parser)
+    run_parser.add_argument("--out", default=report.RESULTS_DIR)
+    run_parser.set_defaults(func=cmd_run)
+
+    baseline_parser = commands.add_parser("baseline", help="перезаписать эталон")
+    add_common(baseline_parser)
+    baseline_parser.add_argument("--baseline", default=BASELINE_PATH)
+    baseline_parser.add_argument("--allow-dirty", action="store_true", help="сохранить эталон с грязного дерева")
+    baseline_parser.set_defaults(func=cmd_baseline)
+
+    compare_parser = commands.add_parser("compare", help="сравнить с эталоном")
+    add_common(compare_parser)
+    compare_parser.add_argument("--baseline", default=BASELINE_PATH)
+    compare_parser.add_argument("--result", help="готовый JSON вместо нового замера")
+    # min устойчивее к фоновому шуму, чем median
+    compare_parser.add_argument("--metric", default="min_us", choices=["min_us", "median_us", "mean_us"])
+    compare_parser.add_argument("--threshold", type=float, default=20.0, help="допустимый рост, %%")
+    compare_parser.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Общие части бенчмарков: сводка по выборке, метаданные запуска, JSON-результаты
+и сравнение двух результатов между коммитами.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+
+def summarize(samples_ms: List[float], wall_seconds: Optional[float] = None, errors: int = 0) -> dict:
+    """count, ошибки, пропускная способность и перцентили (мс) по выборке"""
+    ordered = sorted(samples_ms)
+    count = len(ordered)
+    summary = {"count": count, "errors": errors}
+    if wall_seconds:
+        summary["throughput_rps"] = round(count / wall_seconds, 2)
+    if not ordered:
+        return summary
+
+    if count >= 2:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ordered[0]
+    summary.update({
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "max_ms": round(ordered[-1], 3),
+    })
+    return summary
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_meta(params: dict) -> dict:
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "params": params,
+    }
+
+
+def write_result(name: str, data: dict, out_dir: str = RESULTS_DIR) -> str:
+    """Пишет <out_dir>/<name>-<время>-<коммит>.json и возвращает путь"""
+    os.makedirs(out_dir, exist_ok=True)
+    meta = data.get("meta", {})
+    stamp = meta.get("timestamp", "").replace(":", "").replace("-", "")
+    path = os.path.join(out_dir, f"{name}-{stamp}-{meta.get('commit', '')[:8] or 'nogit'}.json")
+    with open(path, "w", encoding="utf-8") as out:
+        json.dump(data, out, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_result(path: str) -> dict:
+    with open(path, encoding="utf-8") as src:
+        return json.load(src)
+
+
+def compare(old: Dict[str, dict], new: Dict[str, dict], metric: str, threshold_pct: float) -> List[str]:
+    """
+    Печатает таблицу old → new по каждому шагу и возвращает список регрессий:
+    шагов, где metric вырос больше чем на threshold_pct процентов.
+    """
+    regressions = []
+    print(f"{'':<36}{'было':>12}{'стало':>12}{'изм.':>10}")
+    for name in sorted(set(old) | set(new)):
+        before = old.get(name, {}).get(metric)
+        after = new.get(name, {}).get(metric)
+        if before is None or after is None:
+            shown = [f"{value:.3f}" if value is not None else "—" for value in (before, after)]
+            print(f"{name:<36}{shown[0]:>12}{shown[1]:>12}")
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        mark = ""
+        if change > threshold_pct:
+            mark = "  ← регрессия"
+            regressions.append(name)
+        print(f"{name:<36}{before:>12.3f}{after:>12.3f}{change:>+9.1f}%{mark}")
+    return regressions
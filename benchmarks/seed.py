@@ -0,0 +1,230 @@
+"""
+Детерминированное наполнение PostgreSQL для нагрузочных тестов (benchmarks.loadtest).
+
+Данные генерируются на стороне БД через generate_series: одинаковые параметры
+дают одинаковые строки, миллион записей вставляется за секунды. Все таблицы
+предварительно очищаются (TRUNCATE ... RESTART IDENTITY), поэтому запускать
+можно только на отдельной базе: в имени должно быть «bench» или «test»,
+иначе нужен --force.
+
+Первые BENCH_ACCOUNTS работодателей — «чистые» учётные записи без своих
+сотрудников и отзывов: ими ходят виртуальные пользователи нагрузочного теста
+(лимит — 30 сотрудников на работодателя). Пароль у всех пользователей —
+BENCH_PASSWORD, администратор — admin@bench.local.
+
+Запуск из корня репозитория:
+    DATABASE_URL=postgresql://.../truststaff_bench python -m benchmarks.seed --create-schema
+    python -m benchmarks.seed --users 100000 --employees 1000000 --records 3000000
+
+--create-schema создаёт таблицы по моделям (как app.init_db). Индексы и
+секции, которые заводятся только миграциями, при этом не появляются — для
+замеров, близких к проду, накатите миграции на базу и запускайте без флага.
+"""
+import argparse
+import os
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlmodel import SQLModel
+
+from app import models  # noqa: F401 — регистрирует таблицы в metadata
+from app.auth import hash_password
+
+BENCH_PASSWORD = "bench-password"
+BENCH_ACCOUNTS = 64
+ADMIN_EMAIL = "admin@bench.local"
+
+DEFAULT_COUNTS = {
+    "users": 2_000,
+    "employees": 20_000,
+    "records": 50_000,
+    "reactions": 20_000,
+    "check_logs": 50_000,
+}
+
+LAST_NAMES = ["Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов",
+              "Михайлов", "Новиков", "Фёдоров", "Морозов", "Волков", "Алексеев", "Лебедев"]
+FIRST_NAMES = ["Александр", "Сергей", "Дмитрий", "Андрей", "Алексей", "Максим", "Иван",
+               "Михаил", "Николай", "Евгений", "Павел", "Роман"]
+MIDDLE_NAMES = ["Александрович", "Сергеевич", "Дмитриевич", "Андреевич", "Иванович",
+                "Михайлович", "Петрович", "Николаевич", "Викторович"]
+POSITIONS = ["Продавец", "Кассир", "Кладовщик", "Водитель", "Менеджер", "Бухгалтер",
+             "Повар", "Официант", "Охранник", "Грузчик"]
+CITIES = ["Москва", "Санкт-Петербург", "Казань", "Пермь", "Омск", "Самара", "Тула"]
+
+TABLES = ["employee_reaction", "reputationrecord", "check_log", "loginattempt",
+          "rate_limit", "uploaded_file", "employee", '"user"']
+
+# Каждое выражение получает :n (сколько строк) и счётчики остальных таблиц.
+# Блокирован каждый 50-й работодатель, на проверке — каждый 10-й.
+SEED_SQL = {
+    "users": """
+        INSERT INTO "user" (id, name, email, password_hash, created_at, is_approved,
+                            company_name, city, inn_or_ogrn, verification_status, role,
+                            is_email_verified, is_blocked)
+        SELECT g, 'Работодатель ' || g, 'user' || g || '@bench.local', :password_hash,
+               TIMESTAMP '2024-01-01' + g * INTERVAL '7 minutes',
+               g <= :accounts OR g % 10 <> 0,
+               'ООО Компания ' || g, (:cities)[1 + g % cardinality(:cities)],
+               lpad(g::text, 10, '7'),
+               CASE WHEN g > :accounts AND g % 10 = 0 THEN 'pending' ELSE 'approved' END,
+               'user', TRUE, g > :accounts AND g % 50 = 0
+        FROM generate_series(1, :n) AS g
+    """,
+    "admin": """
+        INSERT INTO "user" (id, name, email, password_hash, created_at, is_approved,
+                            verification_status, role, is_email_verified, is_blocked)
+        VALUES (:users + 1, 'Администратор', :admin_email, :password_hash,
+                TIMESTAMP '2024-01-01', TRUE, 'approved', 'admin', TRUE, FALSE)
+    """,
+    "employees": """
+        INSERT INTO employee (id, full_name, birth_date, contact, created_by_user_id,
+                              checks_count, likes_count, dislikes_count)
+        SELECT g,
+               (:last_names)[1 + g % cardinality(:last_names)] || ' '
+                 || (:first_names)[1 + (g / cardinality(:last_names)) % cardinality(:first_names)] || ' '
+                 || (:middle_names)[1 + (g / 7) % cardinality(:middle_names)],
+               DATE '1965-01-01' + (g * 37) % 14000,
+               '+7900' || lpad((g % 10000000)::text, 7, '0'),
+               :accounts + 1 + g % (:users - :accounts),
+               g % 40, 0, 0
+        FROM generate_series(1, :n) AS g
+    """,
+    "records": """
+        INSERT INTO reputationrecord (id, employee_id, employer_id, created_at, employer_blocked,
+                                      position, hired_at, fired_at, misconduct,
+                                      dismissal_reason, commendation)
+        SELECT g, e.employee_id, e.employer_id,
+               TIMESTAMP '2024-01-01' + g * INTERVAL '3 minutes',
+               e.employer_id % 50 = 0,
+               (:positions)[1 + g % cardinality(:positions)],
+               TIMESTAMP '2015-01-01' + (g % 3000) * INTERVAL '1 day',
+               TIMESTAMP '2015-01-01' + (g % 3000 + 200) * INTERVAL '1 day',
+               CASE WHEN g % 5 = 0 THEN 'Опоздания без уважительной причины' END,
+               CASE WHEN g % 3 = 0 THEN 'По собственному желанию' END,
+               CASE WHEN g % 4 = 0 THEN 'Ответственный, выполняет план' END
+        FROM generate_series(1, :n) AS g,
+             LATERAL (SELECT 1 + g % :employees AS employee_id,
+                             :accounts + 1 + (g * 7) % (:users - :accounts) AS employer_id) AS e
+    """,
+    # пара (сотрудник, работодатель) уникальна, пока n <= employees * (users - accounts)
+    "reactions": """
+        INSERT INTO employee_reaction (id, employee_id, employer_id, reaction, created_at, updated_at)
+        SELECT g, 1 + g % :employees,
+               :accounts + 1 + (g / :employees) % (:users - :accounts),
+               CASE WHEN g % 3 = 0 THEN 'dislike' ELSE 'like' END,
+               TIMESTAMP '2024-06-01' + g * INTERVAL '1 minute',
+               TIMESTAMP '2024-06-01' + g * INTERVAL '1 minute'
+        FROM generate_series(1, :n) AS g
+    """,
+    "reaction_counters": """
+        UPDATE employee SET likes_count = r.likes, dislikes_count = r.dislikes
+        FROM (
+            SELECT employee_id,
+                   count(*) FILTER (WHERE reaction = 'like') AS likes,
+                   count(*) FILTER (WHERE reaction = 'dislike') AS dislikes
+            FROM employee_reaction GROUP BY employee_id
+        ) AS r
+        WHERE employee.id = r.employee_id
+    """,
+    # журнал проверок за последние 30 дней; сегодняшних записей нет,
+    # чтобы не упереться в дневной лимит проверок
+    "check_logs": """
+        INSERT INTO check_log (id, user_id, created_at)
+        SELECT g, 1 + g % :users,
+               date_trunc('day', now() AT TIME ZONE 'UTC') - INTERVAL '1 minute'
+                 - (g % (30 * 24 * 60)) * INTERVAL '1 minute'
+        FROM generate_series(1, :n) AS g
+    """,
+}
+
+SEQUENCES = {
+    '"user"': "user_id_seq",
+    "employee": "employee_id_seq",
+    "reputationrecord": "reputationrecord_id_seq",
+    "employee_reaction": "employee_reaction_id_seq",
+    "check_log": "check_log_id_seq",
+}
+
+
+def check_target(url: str, force: bool) -> None:
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql":
+        raise SystemExit("Наполнение рассчитано на PostgreSQL (generate_series)")
+    name = parsed.database or ""
+    if not force and "bench" not in name and "test" not in name:
+        raise SystemExit(
+            f"База «{name}» не похожа на тестовую: все таблицы будут очищены. "
+            "Используйте базу с «bench» или «test» в имени либо --force."
+        )
+
+
+def create_schema(engine) -> None:
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # в проде у employee_reaction эти DEFAULT есть: set_reaction их не передаёт
+        conn.execute(text(
+            "ALTER TABLE employee_reaction "
+            "ALTER COLUMN created_at SET DEFAULT (now() AT TIME ZONE 'UTC'), "
+            "ALTER COLUMN updated_at SET DEFAULT (now() AT TIME ZONE 'UTC')"
+        ))
+
+
+def seed(engine, counts: dict) -> dict:
+    """Очищает таблицы и наполняет их; возвращает время каждого шага в секундах"""
+    if counts["users"] <= BENCH_ACCOUNTS:
+        raise SystemExit(f"Нужно больше {BENCH_ACCOUNTS} пользователей")
+
+    params = {
+        **counts,
+        "accounts": BENCH_ACCOUNTS,
+        "password_hash": hash_password(BENCH_PASSWORD),
+        "admin_email": ADMIN_EMAIL,
+        "cities": CITIES,
+        "last_names": LAST_NAMES,
+        "first_names": FIRST_NAMES,
+        "middle_names": MIDDLE_NAMES,
+        "positions": POSITIONS,
+    }
+    timings = {}
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE"))
+        for step, sql in SEED_SQL.items():
+            started = time.perf_counter()
+            n = counts.get(step, 0)
+            conn.execute(text(sql), {**params, "n": n})
+            timings[step] = round(time.perf_counter() - started, 3)
+        for table, sequence in SEQUENCES.items():
+            conn.execute(text(
+                f"SELECT setval('{sequence}', (SELECT COALESCE(MAX(id), 0) + 1 FROM {table}), false)"
+            ))
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE"))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    for name, default in DEFAULT_COUNTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    parser.add_argument("--create-schema", action="store_true", help="создать таблицы по моделям")
+    parser.add_argument("--force", action="store_true", help="разрешить базу без bench/test в имени")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        raise SystemExit("Не задан DATABASE_URL")
+    check_target(args.database_url, args.force)
+
+    counts = {name: getattr(args, name) for name in DEFAULT_COUNTS}
+    engine = create_engine(args.database_url)
+    if args.create_schema:
+        create_schema(engine)
+    timings = seed(engine, counts)
+    for step, seconds in timings.items():
+        print(f"{step:<20}{counts.get(step, ''):>12}{seconds:>10.2f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Бенчмарк шаблонов: время старта (компиляция всех шаблонов) и задержка рендера.
+
+Старт сравнивает:
+  per_module   — как было: отдельное окружение в каждом модуле, каждое
+                 компилирует свои шаблоны (base/header/footer — в каждом заново);
+  cold         — общее окружение, байткод-кэш пуст (первый воркер после деплоя);
+  bytecode     — общее окружение, байткод уже на диске (остальные воркеры и рестарты).
+
+Рендер сравнивает auto_reload=True (stat файла шаблона и его родителей на каждый
+get_template, как было) и auto_reload=False (app.templating) на страницах,
+которые отдаются чаще всего.
+
+Запуск из корня репозитория:
+    python -m benchmarks.templates_bench --renders 2000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from app.templating import TEMPLATES_DIR, create_environment
+from benchmarks import report
+
+# Сколько модулей держали своё Jinja2Templates
+PER_MODULE_ENVS = 11
+STARTUP_REPEATS = 5
+
+USER = SimpleNamespace(
+    id=7, name="Пётр", email="petr@example.ru", role="user", verification_status="approved",
+    rejection_reason=None, company_name="ООО Ромашка", is_blocked=False
+)
+
+
+def _check_result():
+    record = {
+        "is_blocked_employer": False, "employer_id": 3, "position": "Старший продавец",
+        "hired_at": datetime(2019, 3, 1), "fired_at": datetime(2023, 8, 15),
+        "misconduct": "Опоздания", "dismissal_reason": "По собственному желанию",
+        "commendation": "Ответственный, выполнял план продаж",
+    }
+    return [
+        {
+            "employee_id": emp_id, "full_name": "Иванов Пётр Сергеевич",
+            "birth_date": date(1990, 5, 17), "records": [record] * 5, "record_count": 5,
+            "checks_count": 12, "likes_count": 4, "dislikes_count": 1, "my_reaction": "like",
+        }
+        for emp_id in range(10)
+    ]
+
+
+PAGES = {
+    "login.html": {},
+    "index.html": {"user": USER},
+    "check.html": {"user": USER, "result": _check_result()},
+    "add_record.html": {"user": USER, "employee_id": 1, "error": None},
+}
+
+
+def _compile_all(env) -> int:
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+def bench_startup() -> dict:
+    results = {}
+    cache_dir = tempfile.mkdtemp(prefix="jinja-bench-")
+    try:
+        samples = {"per_module": [], "cold": [], "bytecode": []}
+        for _ in range(STARTUP_REPEATS):
+            started = time.perf_counter()
+            for _ in range(PER_MODULE_ENVS):
+                env = create_environment(auto_reload=True, bytecode_cache_dir="")
+                # в каждом модуле компилируются его страницы и общие base/header/footer
+                for name in ("base.html", "header.html", "footer.html", "login.html"):
+                    env.get_template(name)
+            samples["per_module"].append((time.perf_counter() - started) * 1000)
+
+            shutil.rmtree(cache_dir)
+            started = time.perf_counter()
+            count = _compile_all(create_environment(auto_reload=False, bytecode_cache_dir=cache_dir))
+            samples["cold"].append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            _compile_all(create_environment(auto_reload=False, bytecode_cache_dir=cache_dir))
+            samples["bytecode"].append((time.perf_counter() - started) * 1000)
+
+        print(f"Старт ({count} шаблонов, мс):")
+        for name, values in samples.items():
+            results[f"startup_{name}"] = report.summarize(values)
+            print(f"  {name:<12} min {min(values):8.2f}   median {sorted(values)[len(values) // 2]:8.2f}")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+
+def bench_render(renders: int) -> dict:
+    results = {}
+    print(f"Рендер ({renders} раз, мс):")
+    for auto_reload in (True, False):
+        env = create_environment(auto_reload=auto_reload, bytecode_cache_dir="")
+        _compile_all(env)
+        for name, context in PAGES.items():
+            samples = []
+            for _ in range(renders):
+                started = time.perf_counter()
+                # так же, как TemplateResponse: get_template на каждый ответ
+                env.get_template(name).render(context)
+                samples.append((time.perf_counter() - started) * 1000)
+            key = f"render_{name.removesuffix('.html')}_{'reload' if auto_reload else 'cached'}"
+            results[key] = report.summarize(samples)
+            print(f"  {key:<32} p50 {results[key]['p50_ms']:7.3f}   p99 {results[key]['p99_ms']:7.3f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=2000)
+    parser.add_argument("--out", default=report.RESULTS_DIR)
+    args = parser.parse_args()
+
+    if not os.path.isdir(TEMPLATES_DIR):
+        raise SystemExit("Запускайте из корня репозитория: нужен каталог templates")
+
+    steps = {**bench_startup(), **bench_render(args.renders)}
+    data = {"meta": report.run_meta({"renders": args.renders}), "steps": steps}
+    print(f"Результат: {report.write_result('templates', data, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Бенчмарк приёма паспортов: N одновременных загрузок по 20 МБ.
+
+Сравнивает старый путь (request.form() со спулингом python-multipart,
+затем shutil.copyfileobj) и потоковый app.uploads.receive_upload.
+Печатает время и пиковое потребление памяти Python (tracemalloc).
+
+Запуск из корня репозитория:
+    python -m benchmarks.upload_bench --concurrency 8 --size-mb 20
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from starlette.requests import Request
+
+from app import storage, uploads
+
+BOUNDARY = b"----truststaffbench"
+CHUNK = 64 * 1024
+
+
+def _multipart_parts(size: int):
+    """Тело запроса кусками, без сборки всех 20 МБ в памяти"""
+    yield (
+        b"--" + BOUNDARY + b"\r\n"
+        b'Content-Disposition: form-data; name="company_name"\r\n\r\n'
+        b"\xd0\x9e\xd0\x9e\xd0\x9e \xd0\xa2\xd0\xb5\xd1\x81\xd1\x82\r\n"
+        b"--" + BOUNDARY + b"\r\n"
+        b'Content-Disposition: form-data; name="passport_file"; filename="passport.pdf"\r\n'
+        b"Content-Type: application/pdf\r\n\r\n"
+        b"%PDF-1.4\n"
+    )
+    payload = b"0" * CHUNK
+    left = size - len(b"%PDF-1.4\n")
+    while left > 0:
+        yield payload[:min(CHUNK, left)]
+        left -= CHUNK
+    yield b"\r\n--" + BOUNDARY + b"--\r\n"
+
+
+def _make_request(size: int) -> Request:
+    parts = _multipart_parts(size)
+
+    async def receive():
+        for chunk in parts:
+            await asyncio.sleep(0)
+            return {"type": "http.request", "body": chunk, "more_body": True}
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/onboarding",
+        "headers": [(b"content-type", b"multipart/form-data; boundary=" + BOUNDARY)],
+    }
+    return Request(scope, receive)
+
+
+async def _legacy_upload(request: Request, target_dir: str, n: int):
+    form = await request.form(max_part_size=uploads.MAX_UPLOAD_SIZE)
+    upload = form["passport_file"]
+    upload.file.seek(0, 2)
+    upload.file.tell()
+    upload.file.seek(0)
+    with open(os.path.join(target_dir, f"legacy_{n}.pdf"), "wb") as buffer:
+        shutil.copyfileobj(upload.file, buffer)
+    await form.close()
+
+
+async def _streaming_upload(request: Request, n: int):
+    await uploads.receive_upload(request, "passport_file", lambda original: f"stream_{n}.pdf")
+
+
+async def _run(mode: str, concurrency: int, size: int, target_dir: str):
+    requests = [_make_request(size) for _ in range(concurrency)]
+    if mode == "legacy":
+        jobs = [_legacy_upload(req, target_dir, n) for n, req in enumerate(requests)]
+    else:
+        jobs = [_streaming_upload(req, n) for n, req in enumerate(requests)]
+    await asyncio.gather(*jobs)
+
+
+def bench(mode: str, concurrency: int, size_mb: int) -> dict:
+    size = size_mb * 1024 * 1024 - 1024
+    with tempfile.TemporaryDirectory() as target_dir:
+        storage._storage = storage.LocalShardedStorage(target_dir)
+        uploads.STORAGE_TMP_DIR = os.path.join(target_dir, ".tmp")
+        tracemalloc.start()
+        started = time.perf_counter()
+        asyncio.run(_run(mode, concurrency, size, target_dir))
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "size_mb": size_mb,
+        "seconds": round(elapsed, 3),
+        "throughput_mb_s": round(concurrency * size_mb / elapsed, 1),
+        "peak_python_mb": round(peak / 1024 / 1024, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=20)
+    args = parser.parse_args()
+
+    for mode in ("legacy", "streaming"):
+        print(bench(mode, args.concurrency, args.size_mb))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+#!/bin/sh
+# Подготовка контейнера перед запуском приложения или воркера
+set -e
+
+# Метрики нескольких процессов (app/metrics.py): каталог должен существовать
+# и быть пустым — файлы прошлого запуска с теми же PID исказят счётчики
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+    find "$PROMETHEUS_MULTIPROC_DIR" -mindepth 1 -delete
+fi
+
+# Исходники смонтированы поверх /app (docker-compose.yml) и могут отличаться
+# от тех, что были при сборке образа: собираем статику из них (app/assets.py)
+if [ "$ASSETS_BUILD_ON_START" = "1" ]; then
+    python -m app.assets build > /dev/null
+fi
+
+exec "$@"
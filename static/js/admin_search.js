@@ -0,0 +1,37 @@
+document.addEventListener("DOMContentLoaded", () => {
+  const inputEl = document.getElementById("user-search");
+  const listEl = document.getElementById("user-suggestions");
+  if (!inputEl || !listEl) return;
+
+  let timerId;
+  let controller;
+
+  inputEl.addEventListener("input", () => {
+    const query = inputEl.value.trim();
+    clearTimeout(timerId);
+    if (query.length < 2) {
+      listEl.innerHTML = "";
+      return;
+    }
+    timerId = setTimeout(() => loadSuggestions(query), 200);
+  });
+
+  async function loadSuggestions(query) {
+    // Предыдущий запрос больше не нужен — отменяем, чтобы старый ответ не затёр новый
+    if (controller) controller.abort();
+    controller = new AbortController();
+
+    try {
+      const response = await fetch(`/admin/search/users?q=${encodeURIComponent(query)}`, {
+        signal: controller.signal
+      });
+      if (!response.ok) {
+        console.error("Ошибка поиска пользователей", response.status);
+        return;
+      }
+      listEl.innerHTML = await response.text();
+    } catch (err) {
+      if (err.name !== "AbortError") console.error(err);
+    }
+  }
+});
@@ -3,16 +3,14 @@ document.addEventListener("DOMContentLoaded", () => {
   if (!loadMoreBtn) return;  // если has_more == False, кнопки нет
 
   // считываем data-* атрибуты
-  let skip = parseInt(loadMoreBtn.dataset.skip, 10);
+  // cursor — непрозрачная метка последнего показанного пользователя
+  let cursor = loadMoreBtn.dataset.cursor;
   const limit = parseInt(loadMoreBtn.dataset.limit, 10);
 
   loadMoreBtn.addEventListener("click", async () => {
-    // Увеличиваем skip
-    skip += limit;
-
     // partial=1 → мы хотим вернуть только список <li>
     // (без обёртки, чтобы вставить в конец <ul>)
-    const url = `/admin/users/list?skip=${skip}&limit=${limit}&partial=1`;
+    const url = `/admin/users/list?cursor=${encodeURIComponent(cursor)}&limit=${limit}&partial=1`;
 
     try {
       const response = await fetch(url);
@@ -28,8 +26,9 @@ document.addEventListener("DOMContentLoaded", () => {
         ul.insertAdjacentHTML("beforeend", html);
       }
 
-      // Если ничего не пришло, убираем кнопку
-      if (!html.trim()) {
+      // Курсор следующей страницы приходит в заголовке; пустой — страниц больше нет
+      cursor = response.headers.get("X-Next-Cursor") || "";
+      if (!cursor || !html.trim()) {
         loadMoreBtn.remove();
       }
     } catch (err) {
@@ -0,0 +1,114 @@
+"""
+Общие фикстуры тестов.
+
+Приложение поднимается в процессе (TestClient) на SQLite-базе во временном
+каталоге; таблицы пересоздаются перед каждым тестом. Настройки окружения
+задаются до импорта app — модули читают их при импорте.
+"""
+import logging
+import os
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix="truststaff-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_TMP_DIR}/test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+# QueryBudgetMiddleware подключается только при QUERY_BUDGET_MODE != off
+os.environ.setdefault("QUERY_BUDGET_MODE", "warn")
+os.environ.setdefault("TEMPLATES_BYTECODE_CACHE_DIR", "")
+os.environ.setdefault("DADATA_TOKEN", "test-token")
+os.environ.setdefault("STORAGE_ROOT", os.path.join(_TMP_DIR, "storage"))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
+
+from app.auth import create_access_token
+from app.database import engine
+from app.limit import rate_limit_100_per_minute
+from app.main import app
+from app.models import User
+from app.query_budget import QueryLog, observe_requests
+
+engine.echo = False
+logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+
+@pytest.fixture(autouse=True)
+def database():
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+
+
+@pytest.fixture
+def db(database):
+    with Session(database) as session:
+        yield session
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[rate_limit_100_per_minute] = lambda: None
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def make_user(db):
+    """Одобренный работодатель с подтверждённой почтой"""
+    def factory(email: str = "employer@example.ru", **fields) -> User:
+        values = {
+            "name": "Работодатель", "password_hash": "x",
+            "verification_status": "approved", "is_email_verified": True,
+        }
+        values.update(fields)
+        user = User(email=email, **values)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+    return factory
+
+
+@pytest.fixture
+def login(client):
+    def log_in(user: User) -> None:
+        client.cookies.set("access_token", create_access_token({"sub": str(user.id)}))
+    return log_in
+
+
+class RequestBudgets:
+    """SQL каждого HTTP-запроса, сделанного в тесте (см. app.query_budget)"""
+
+    def __init__(self, logs: list):
+        self.logs: list = logs
+
+    def for_route(self, route: str) -> list:
+        return [log for log in self.logs if log.route == route]
+
+    @property
+    def last(self) -> QueryLog:
+        assert self.logs, "в тесте не было HTTP-запросов"
+        return self.logs[-1]
+
+    def assert_within(self, max_statements: int, max_repeats: int = None, route: str = None) -> None:
+        """Бюджет для всех запросов теста или только для маршрута route (/admin/user/{user_id})"""
+        logs = self.for_route(route) if route else self.logs
+        assert logs, f"не было запросов к {route or 'приложению'}"
+        for log in logs:
+            log.assert_within(max_statements, max_repeats)
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Бюджет SQL на эндпоинт:
+
+        def test_check(client, query_budget):
+            client.post("/check", data={...})
+            query_budget.assert_within(max_statements=10, max_repeats=2)
+    """
+    with observe_requests() as logs:
+        yield RequestBudgets(logs)
@@ -0,0 +1,81 @@
+import base64
+import re
+from datetime import datetime
+
+import pytest
+
+from app.routes import admin
+from app.routes.admin import _cached_users_count, decode_users_cursor, encode_users_cursor
+
+CREATED_AT = datetime(2024, 5, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def superadmin(make_user, login):
+    user = make_user("root@example.ru", role="superadmin", created_at=datetime(2020, 1, 1))
+    login(user)
+    return user
+
+
+def _page(client, cursor: str = "", limit: int = 2):
+    params = {"partial": "true", "limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+    return client.get("/admin/users/list", params=params)
+
+
+def test_cursor_round_trip(make_user):
+    user = make_user(created_at=datetime(2024, 5, 1, 12, 30, 15, 123456))
+
+    cursor = encode_users_cursor(user)
+
+    assert "=" not in cursor
+    assert decode_users_cursor(cursor) == (True, user.created_at, user.id)
+
+
+def test_paging_is_stable_with_equal_created_at(client, make_user, superadmin):
+    approved = [make_user(f"a{n}@example.ru", created_at=CREATED_AT).id for n in range(3)]
+    pending = [
+        make_user(f"p{n}@example.ru", created_at=CREATED_AT, verification_status="pending").id
+        for n in range(3)
+    ]
+
+    seen, cursor = [], ""
+    while True:
+        response = _page(client, cursor)
+        assert response.status_code == 200
+        seen.extend(int(user_id) for user_id in re.findall(r'href="/admin/user/(\d+)"', response.text))
+        cursor = response.headers["X-Next-Cursor"]
+        if not cursor:
+            break
+
+    # одобренные первыми, внутри одинакового created_at — по id от новых к старым
+    expected = sorted(approved, reverse=True) + [superadmin.id] + sorted(pending, reverse=True)
+    assert seen == expected
+
+
+@pytest.mark.parametrize("cursor", [
+    "не-base64!",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    base64.urlsafe_b64encode(b"1|2024-05-01T12:00:00").decode(),
+    base64.urlsafe_b64encode(b"1|yesterday|5").decode(),
+    base64.urlsafe_b64encode(b"1|2024-05-01T12:00:00|5;drop").decode(),
+    base64.urlsafe_b64encode(b"2|2024-05-01T12:00:00|5").decode(),
+])
+def test_bad_cursor_is_rejected(client, superadmin, cursor):
+    assert _page(client, cursor).status_code == 400
+
+
+def test_users_count_cache_expires(db, make_user, monkeypatch):
+    clock = type("Clock", (), {"now": 1000.0, "monotonic": lambda self: self.now})()
+    monkeypatch.setattr(admin, "time", clock)
+    monkeypatch.setattr(admin, "_users_count_cache", {"value": None, "expires": 0.0})
+    make_user("first@example.ru")
+
+    assert _cached_users_count(db) == 1
+    make_user("second@example.ru")
+    clock.now += admin.USERS_COUNT_TTL_SECONDS - 1
+    assert _cached_users_count(db) == 1  # в пределах TTL — старое значение
+
+    clock.now += 1
+    assert _cached_users_count(db) == 2
@@ -0,0 +1,41 @@
+import json
+import os
+
+from app.assets import MANIFEST_NAME, build, load_manifest
+
+
+def _write(path, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def test_build_outside_static_dir(tmp_path):
+    static_dir, dist_dir = str(tmp_path / "static"), str(tmp_path / "built")
+    _write(os.path.join(static_dir, "style.css"), "body { color: black; }\n" * 100)
+    _write(os.path.join(static_dir, "js", "app.js"), "console.log(1);\n")
+    # старая сборка среди исходников в новую не попадает
+    _write(os.path.join(static_dir, "dist", "style.0000000000.css"), "stale")
+
+    manifest = build(static_dir, dist_dir)
+
+    assert set(manifest) == {"style.css", "js/app.js"}
+    css = manifest["style.css"]
+    assert css.startswith("dist/style.") and css.endswith(".css")
+    built_css = os.path.join(dist_dir, css.removeprefix("dist/"))
+    assert os.path.exists(built_css) and os.path.exists(built_css + ".gz")
+    with open(os.path.join(dist_dir, MANIFEST_NAME), encoding="utf-8") as f:
+        assert json.load(f) == manifest
+    assert load_manifest(dist_dir) == manifest
+
+
+def test_rebuild_replaces_previous_output(tmp_path):
+    static_dir, dist_dir = str(tmp_path / "static"), str(tmp_path / "built")
+    _write(os.path.join(static_dir, "style.css"), "a {}")
+    old = build(static_dir, dist_dir)["style.css"]
+
+    _write(os.path.join(static_dir, "style.css"), "b {}")
+    new = build(static_dir, dist_dir)["style.css"]
+
+    assert old != new
+    assert not os.path.exists(os.path.join(dist_dir, old.removeprefix("dist/")))
@@ -0,0 +1,123 @@
+import asyncio
+import gzip
+
+import pytest
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+
+from app.compression import CompressionMiddleware
+
+TEXT = "Отзыв о сотруднике. " * 200  # ~7 КБ, хорошо сжимается
+
+
+def _call(app, accept_encoding: str = "gzip", method: str = "GET") -> list:
+    """Прогоняет запрос через CompressionMiddleware, возвращает отправленные ASGI-сообщения"""
+    messages = []
+    scope = {
+        "type": "http", "asgi": {"spec_version": "2.4"}, "method": method, "path": "/", "query_string": b"",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(CompressionMiddleware(app, minimum_size=1024, encodings=("gzip",))(scope, receive, send))
+    return messages
+
+
+def _headers(messages: list) -> dict:
+    return {k.decode(): v.decode() for k, v in messages[0]["headers"]}
+
+
+def _body(messages: list) -> bytes:
+    return b"".join(m.get("body", b"") for m in messages[1:])
+
+
+def test_compresses_whole_response_with_length_and_vary():
+    messages = _call(PlainTextResponse(TEXT))
+    headers = _headers(messages)
+
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(_body(messages))
+    assert gzip.decompress(_body(messages)).decode() == TEXT
+
+
+def test_small_response_is_not_compressed():
+    messages = _call(PlainTextResponse("коротко"))
+
+    assert "content-encoding" not in _headers(messages)
+    assert _body(messages).decode() == "коротко"
+
+
+@pytest.mark.parametrize("media_type", ["application/pdf", "image/png", "application/zip"])
+def test_binary_types_are_skipped(media_type):
+    messages = _call(Response(TEXT.encode(), media_type=media_type))
+
+    assert "content-encoding" not in _headers(messages)
+    assert "vary" not in _headers(messages)
+
+
+def test_already_encoded_response_is_passed_through():
+    encoded = gzip.compress(TEXT.encode())
+    messages = _call(Response(encoded, media_type="text/html", headers={"Content-Encoding": "gzip"}))
+
+    assert _body(messages) == encoded
+
+
+@pytest.mark.parametrize("accept_encoding", ["", "identity", "gzip;q=0"])
+def test_client_without_gzip_gets_identity(accept_encoding):
+    messages = _call(PlainTextResponse(TEXT), accept_encoding=accept_encoding)
+
+    assert "content-encoding" not in _headers(messages)
+    assert _body(messages).decode() == TEXT
+
+
+def test_head_is_not_compressed():
+    messages = _call(PlainTextResponse(TEXT), method="HEAD")
+
+    assert "content-encoding" not in _headers(messages)
+
+
+def test_streaming_response_is_compressed_chunk_by_chunk():
+    chunks = [TEXT[:3000], TEXT[3000:], "конец"]
+
+    async def generate():
+        for chunk in chunks:
+            yield chunk
+
+    messages = _call(StreamingResponse(generate(), media_type="text/html"))
+    headers = _headers(messages)
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    bodies = [m for m in messages[1:] if m["type"] == "http.response.body"]
+    assert len(bodies) > 1 and bodies[-1]["more_body"] is False
+    assert all(body["body"] for body in bodies[:-1])  # каждый кусок отправлен сразу, со flush
+    assert gzip.decompress(_body(messages)).decode() == "".join(chunks)
+
+
+def test_streaming_response_below_threshold_is_sent_as_is():
+    async def generate():
+        yield "на"
+        yield "чало"
+
+    messages = _call(StreamingResponse(generate(), media_type="text/html"))
+
+    assert "content-encoding" not in _headers(messages)
+    assert _body(messages).decode() == "начало"
+
+
+@pytest.mark.parametrize("etag, expected", [('"abc"', 'W/"abc"'), ('W/"abc"', 'W/"abc"')])
+def test_strong_etag_becomes_weak(etag, expected):
+    messages = _call(PlainTextResponse(TEXT, headers={"ETag": etag}))
+
+    assert _headers(messages)["etag"] == expected
+
+
+def test_existing_vary_is_extended():
+    messages = _call(PlainTextResponse(TEXT, headers={"Vary": "Cookie"}))
+
+    assert _headers(messages)["vary"] == "Cookie, Accept-Encoding"
@@ -0,0 +1,48 @@
+import io
+import threading
+import zipfile
+
+from app import consent_pdf
+from app.consent_pdf import CONSENT_PDF_WINDOW, stream_consents_zip
+
+
+def _contexts(count: int):
+    return ({"employee_id": n, "full_name": f"Сотрудник {n}"} for n in range(count))
+
+
+def test_zip_contains_every_consent(monkeypatch):
+    monkeypatch.setattr(consent_pdf.pdfkit, "from_string", lambda html, path: html.encode())
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(stream_consents_zip(_contexts(25)))))
+
+    assert sorted(archive.namelist()) == sorted(f"consent_{n}.pdf" for n in range(25))
+    assert archive.read("consent_7.pdf").startswith(b"<!DOCTYPE")
+
+
+def test_window_is_bounded_and_close_cancels_the_rest(monkeypatch):
+    started = []
+    lock = threading.Lock()
+
+    def fake_pdf(html, path):
+        with lock:
+            started.append(html)
+        return b"%PDF"
+
+    monkeypatch.setattr(consent_pdf.pdfkit, "from_string", fake_pdf)
+
+    consumed = []
+    contexts = _contexts(100)
+
+    def lazy():
+        for ctx in contexts:
+            consumed.append(ctx["employee_id"])
+            yield ctx
+
+    stream = stream_consents_zip(lazy())
+    next(stream)
+    # после первой записи взято не больше окна и ещё одного на её место
+    assert len(consumed) <= CONSENT_PDF_WINDOW + 1
+
+    stream.close()
+    assert len(consumed) <= CONSENT_PDF_WINDOW + 1
+    assert len(started) <= len(consumed)
@@ -0,0 +1,132 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.dadata import (
+    CircuitBreaker, DadataRejected, DadataSuggestions, DadataUnavailable, Suggestion, SuggestionCache,
+    create_client, normalize_query,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _org(name: str, inn: str = "7700000000") -> dict:
+    return {"value": name, "data": {"inn": inn, "address": {"value": "г Москва"}}}
+
+
+def _suggestions(handler, breaker=None, cache=None) -> DadataSuggestions:
+    return DadataSuggestions(
+        url="http://dadata.test/suggest",
+        client=create_client(transport=httpx.MockTransport(handler)),
+        cache=cache or SuggestionCache(),
+        breaker=breaker or CircuitBreaker(failures=2, reset_seconds=30),
+    )
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_normalize_query():
+    assert normalize_query("  ООО   Ромашка ") == "ооо ромашка"
+
+
+def test_breaker_opens_after_failures_and_probes_once():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failures=2, reset_seconds=30, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now += 30
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()  # второй запрос ждёт результата пробного
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_cache_ttl_lru_and_prefix():
+    clock = FakeClock()
+    cache = SuggestionCache(max_size=2, ttl_seconds=60, complete_below=10, clock=clock)
+    romashka = Suggestion("ООО \"РОМАШКА\"", "7700000001", "г Москва")
+    lider = Suggestion("АО \"ЛИДЕР\"", "7700000002", "г Казань")
+
+    cache.put("ром", [romashka, lider])
+    assert cache.get_by_prefix("ромаш") == [romashka]
+    assert cache.get_by_prefix("каз") is None  # нет ответа на начало запроса
+
+    cache.put("a", [])
+    cache.put("b", [])
+    assert cache.get("ром") is None  # вытеснен как самый старый
+
+    clock.now += 61
+    assert cache.get("b") is None
+
+
+def test_server_errors_trip_the_breaker():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    suggestions = _suggestions(handler)
+    for query in ("ром", "роман", "ромб"):
+        with pytest.raises(DadataUnavailable):
+            _run(suggestions.suggest(query))
+
+    assert suggestions.breaker.state == "open"
+    assert len(calls) == 2  # третий запрос отклонён предохранителем
+
+
+def test_client_errors_do_not_trip_the_breaker():
+    def handler(request):
+        return httpx.Response(403, json={"message": "Forbidden"})
+
+    suggestions = _suggestions(handler)
+    for query in ("ром", "роман", "ромб"):
+        with pytest.raises(DadataRejected):
+            _run(suggestions.suggest(query))
+
+    assert suggestions.breaker.state == "closed"
+
+
+def test_malformed_items_are_rejected_not_crashing():
+    def handler(request):
+        return httpx.Response(200, json={"suggestions": [{"value": "ООО \"РОМАШКА\""}]})
+
+    with pytest.raises(DadataRejected):
+        _run(_suggestions(handler).suggest("ромашка"))
+
+
+def test_answers_are_cached():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"suggestions": [_org("ООО \"РОМАШКА\"")]})
+
+    suggestions = _suggestions(handler)
+
+    first = _run(suggestions.suggest("Ромашка"))
+    again = _run(suggestions.suggest("  ромашка "))
+    longer = _run(suggestions.suggest("ромашка мос"))
+
+    assert first == again == longer
+    assert first[0].as_dict()["display"] == "ООО \"РОМАШКА\"\n7700000000  г Москва"
+    assert len(calls) == 1
@@ -0,0 +1,101 @@
+import os
+from datetime import date, datetime, timedelta
+
+from prometheus_client import REGISTRY
+
+from app.jobs.cleanup_PU import PENDING_USER_TTL_MINUTES, cleanup_pending_users
+from app.jobs.cleanup_uploads import UPLOAD_RETENTION_HOURS, cleanup_expired_uploads
+from app.jobs.reputation_consistency import repair_employer_blocked
+from app.models import Employee, PendingUser, ReputationRecord, UploadedFile, User
+from app.passport_processing import preview_name, thumb_name
+from app.storage import STORAGE_TMP_DIR, LocalShardedStorage, passport_key, preview_key
+
+
+def _deleted_total() -> float:
+    return REGISTRY.get_sample_value(
+        "background_job_rows_total", {"job": "cleanup_pending_users", "action": "deleted"}
+    ) or 0.0
+
+
+def test_cleanup_pending_users_deletes_expired_and_counts_them(db):
+    expired = datetime.utcnow() - timedelta(minutes=PENDING_USER_TTL_MINUTES + 1)
+    for n in range(3):
+        db.add(PendingUser(
+            name="Иван", email=f"old{n}@example.ru", password_hash="x",
+            email_verification_token=f"old{n}", created_at=expired
+        ))
+    db.add(PendingUser(name="Пётр", email="new@example.ru", password_hash="x", email_verification_token="new"))
+    db.commit()
+    before = _deleted_total()
+
+    result = cleanup_pending_users()
+
+    assert result["rows_deleted"] == 3
+    assert _deleted_total() - before == 3
+    assert [u.email for u in db.query(PendingUser).all()] == ["new@example.ru"]
+
+
+def _stored_upload(db, storage, owner, name: str, status: str, age_hours: float) -> UploadedFile:
+    """Паспорт с превью в хранилище и запись UploadedFile нужного возраста"""
+    for key in (passport_key(name), preview_key(preview_name(name)), preview_key(thumb_name(name))):
+        path = os.path.join(STORAGE_TMP_DIR, f"{name}.part")
+        os.makedirs(STORAGE_TMP_DIR, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"data")
+        storage.put_object(key, path)
+    upload = UploadedFile(
+        key=passport_key(name), filename=name, owner_id=owner.id, status=status,
+        created_at=datetime.utcnow() - timedelta(hours=age_hours)
+    )
+    db.add(upload)
+    db.commit()
+    return upload
+
+
+def test_cleanup_expired_uploads_removes_only_expired_decided_files(db, make_user, monkeypatch, tmp_path):
+    storage = LocalShardedStorage(str(tmp_path))
+    monkeypatch.setattr("app.storage._storage", storage)
+    old = UPLOAD_RETENTION_HOURS + 1
+    approved = make_user("approved@example.ru", passport_filename="passport_1_a.jpg")
+    fresh = make_user("fresh@example.ru", passport_filename="passport_2_b.jpg")
+    pending = make_user("pending@example.ru", passport_filename="passport_3_c.jpg", verification_status="pending")
+    _stored_upload(db, storage, approved, "passport_1_a.jpg", "approved", old)
+    _stored_upload(db, storage, fresh, "passport_2_b.jpg", "rejected", 1)
+    _stored_upload(db, storage, pending, "passport_3_c.jpg", "pending", old * 10)
+
+    result = cleanup_expired_uploads()
+
+    assert result["files_deleted"] == 1
+    assert [u.filename for u in db.query(UploadedFile).order_by(UploadedFile.filename)] == [
+        "passport_2_b.jpg", "passport_3_c.jpg"
+    ]
+    for name, kept in (("passport_1_a.jpg", False), ("passport_2_b.jpg", True), ("passport_3_c.jpg", True)):
+        assert storage.exists(passport_key(name)) is kept
+        assert storage.exists(preview_key(preview_name(name))) is kept
+        assert storage.exists(preview_key(thumb_name(name))) is kept
+    db.expire_all()
+    assert db.get(User, approved.id).passport_filename is None
+    assert db.get(User, pending.id).passport_filename == "passport_3_c.jpg"
+
+
+def test_repair_employer_blocked_fixes_drifted_flags(db, make_user):
+    blocked = make_user("blocked@example.ru", is_blocked=True)
+    active = make_user("active@example.ru")
+    employee = Employee(full_name="Иванов Иван", birth_date=date(1990, 1, 1), created_by_user_id=active.id)
+    db.add(employee)
+    db.flush()
+    # флаги расходятся с is_blocked работодателя в обе стороны; третья запись верная
+    records = [
+        ReputationRecord(employee_id=employee.id, employer_id=employer.id, employer_blocked=flag,
+                         position="Кассир", hired_at=datetime(2023, 1, 1))
+        for employer, flag in ((blocked, False), (active, True), (active, False))
+    ]
+    db.add_all(records)
+    db.commit()
+
+    result = repair_employer_blocked()
+
+    assert result["rows_repaired"] == 2
+    db.expire_all()
+    assert [db.get(ReputationRecord, r.id).employer_blocked for r in records] == [True, False, False]
+    assert repair_employer_blocked()["rows_repaired"] == 0
@@ -0,0 +1,22 @@
+import pytest
+from starlette.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.mark.parametrize("host, status", [
+    ("127.0.0.1", 200),
+    ("::1", 200),
+    ("::ffff:127.0.0.1", 200),
+    # адрес шлюза Docker / обратного прокси — частный, но не разрешённый
+    ("172.17.0.1", 404),
+    ("10.0.0.5", 404),
+    ("203.0.113.7", 404),
+])
+def test_metrics_only_from_allowed_nets(host, status):
+    with TestClient(app, client=(host, 40000)) as client:
+        response = client.get("/metrics")
+
+    assert response.status_code == status
+    if status == 200:
+        assert "http_requests_total" in response.text
@@ -0,0 +1,35 @@
+import pytest
+
+from app.page_cache import zstandard
+
+
+def _get(client, accept_encoding: str, **headers):
+    return client.get("/policy", headers={"Accept-Encoding": accept_encoding, **headers})
+
+
+def test_each_encoding_has_its_own_etag(client):
+    identity = _get(client, "identity")
+    gzipped = _get(client, "gzip")
+
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert identity.headers["etag"] != gzipped.headers["etag"]
+    # httpx распаковывает тело сам
+    assert gzipped.content == identity.content
+
+
+def test_not_modified_only_for_the_same_representation(client):
+    gzip_etag = _get(client, "gzip").headers["etag"]
+
+    assert _get(client, "gzip", **{"If-None-Match": gzip_etag}).status_code == 304
+    assert _get(client, "gzip", **{"If-None-Match": "W/" + gzip_etag}).status_code == 304
+    # тот же ETag у клиента без gzip — другое тело, отдаём его целиком
+    assert _get(client, "identity", **{"If-None-Match": gzip_etag}).status_code == 200
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard не установлен")
+def test_zstd_preferred_like_compression_middleware(client):
+    response = _get(client, "gzip, br, zstd")
+
+    assert response.headers["content-encoding"] == "zstd"
+    assert response.headers["etag"].endswith('-zstd"')
@@ -0,0 +1,52 @@
+import pytest
+
+from app.bad_words import BAD_WORDS
+from app.profanity import contains_profanity
+
+# Как слово встречается в отзыве: само по себе, с цифрами и знаками вокруг
+SPELLINGS = [
+    "{}",
+    "{}123",
+    "{}2024!!!",
+    "клиент сказал: {}, и ушёл",
+    "({})",
+    "{}@",
+]
+
+
+@pytest.mark.parametrize("spelling", SPELLINGS)
+def test_every_bad_word_is_found(spelling):
+    missed = [word for word in BAD_WORDS if not contains_profanity(spelling.format(word))]
+    assert not missed
+
+
+def test_every_bad_word_is_found_in_upper_case():
+    missed = [word for word in BAD_WORDS if not contains_profanity(word.upper() + "123")]
+    assert not missed
+
+
+@pytest.mark.parametrize("text", ["wh0r3123", "a$$123", "wh0r@123", "h03123", "sh1t", "3алупа", "xуй", "хуууй", "reeetard", "fuuuck"])
+def test_obfuscated_spellings(text):
+    assert contains_profanity(text)
+
+
+@pytest.mark.parametrize("text", [
+    "Продавец-консультант, уволен по собственному желанию",
+    "тебе",
+    "соска",
+    "ivan455@mail.ru",
+    "+7 (912) 345-67-89",
+    "Опоздания 3 раза за месяц",
+    "Cook",
+    "cookie",
+    "Повар Cook",
+    "kook",
+    "Kookaburra",
+])
+def test_clean_text(text):
+    assert not contains_profanity(text)
+
+
+def test_several_fields_in_one_call():
+    assert contains_profanity(None, "", "всё хорошо", "sh1t")
+    assert not contains_profanity(None, "", "всё хорошо")
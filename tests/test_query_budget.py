@@ -0,0 +1,47 @@
+from datetime import date, datetime
+
+from app.models import Employee, ReputationRecord
+from app.query_budget import QueryLog
+
+
+def _add_namesakes(db, employer, count: int, records_each: int, first_day: int = 1) -> None:
+    for n in range(count):
+        employee = Employee(
+            full_name="Иванов Пётр Сергеевич", birth_date=date(1985, 1, first_day + n), created_by_user_id=employer.id
+        )
+        db.add(employee)
+        db.flush()
+        for _ in range(records_each):
+            db.add(ReputationRecord(
+                employee_id=employee.id, employer_id=employer.id, position="Продавец",
+                hired_at=datetime(2020, 1, 1), fired_at=datetime(2021, 1, 1)
+            ))
+    db.commit()
+
+
+def test_check_sql_does_not_grow_with_results(client, db, make_user, login, query_budget):
+    employer = make_user()
+    login(employer)
+
+    _add_namesakes(db, employer, count=1, records_each=5)
+    response = client.post("/check", data={"full_name": "Иванов Пётр Сергеевич"})
+    assert response.status_code == 200
+    single = query_budget.last.statements
+
+    _add_namesakes(db, employer, count=9, records_each=5, first_day=2)
+    response = client.post("/check", data={"full_name": "Иванов Пётр Сергеевич"})
+    assert response.status_code == 200
+    assert response.text.count("Продавец") == 50
+
+    query_budget.assert_within(max_statements=15, max_repeats=3, route="/check")
+    # 10 однофамильцев по 5 отзывов — столько же запросов, сколько для одного
+    assert query_budget.last.statements == single
+
+
+def test_repeated_statement_reported_as_n_plus_one():
+    log = QueryLog()
+    for _ in range(7):
+        log.record("SELECT * FROM reputationrecord WHERE employee_id = ?", 0.001)
+
+    assert any(v.startswith("N+1") for v in log.violations)
+    assert log.repeated(min_count=7) == [("SELECT * FROM reputationrecord WHERE employee_id = ?", 7)]
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from app.record_validation import MAX_TEXT_LENGTH, validate_record, validate_records
+
+
+def _fields(validation) -> list:
+    return [error.field for error in validation.errors]
+
+
+def test_valid_record_is_stripped_and_parsed():
+    validation = validate_record("  Продавец ", "2020-01-01", "2021-06-30", misconduct="", commendation=" Грамота ")
+
+    assert validation.ok
+    assert validation.record_fields() == {
+        "position": "Продавец",
+        "hired_at": datetime(2020, 1, 1),
+        "fired_at": datetime(2021, 6, 30),
+        "misconduct": None,
+        "dismissal_reason": None,
+        "commendation": "Грамота",
+    }
+
+
+def test_required_position_and_length_limit():
+    validation = validate_record("   ", "2020-01-01", dismissal_reason="х" * (MAX_TEXT_LENGTH + 1))
+
+    assert _fields(validation) == ["position", "dismissal_reason"]
+    assert validation.error == "Укажите должность"
+
+
+def test_dates():
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+
+    assert _fields(validate_record("Продавец", "01.01.2020")) == ["hired_at"]
+    assert _fields(validate_record("Продавец", tomorrow)) == ["hired_at"]
+    assert _fields(validate_record("Продавец", "2020-01-01", "2020-13-01")) == ["fired_at"]
+    assert validate_record("Продавец", "2020-05-01", "2020-04-30").error == "Дата увольнения раньше даты приёма"
+
+
+def test_profanity_reported_per_field():
+    validation = validate_record("Продавец", "2020-01-01", misconduct="назвал клиента xуйлом")
+
+    assert _fields(validation) == ["misconduct"]
+    assert validation.error_list() == [
+        {"field": "misconduct", "message": "Нарушение: текст содержит недопустимые слова"}
+    ]
+
+
+def test_batch_flags_only_the_offending_record():
+    clean = {"position": "Кассир", "hired_at": "2019-03-01"}
+    dirty = {"position": "Кассир", "hired_at": "2019-03-01", "commendation": "п1дор"}
+
+    results = validate_records([clean, dirty, clean])
+
+    assert [r.ok for r in results] == [True, False, True]
+    assert _fields(results[1]) == ["commendation"]
@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import UploadedFile, User
+from app.review_queue import claim_batch, decide, held_batch
+
+
+@pytest.fixture
+def applicants(make_user):
+    return [
+        make_user(f"applicant{n}@example.ru", verification_status="pending").id
+        for n in range(6)
+    ]
+
+
+@pytest.fixture
+def admins(make_user):
+    return make_user("admin1@example.ru", role="admin"), make_user("admin2@example.ru", role="admin")
+
+
+def _ids(users) -> list:
+    return [u.id for u in users]
+
+
+def test_two_admins_get_disjoint_batches(db, applicants, admins):
+    first, second = admins
+
+    batch1 = _ids(claim_batch(db, first.id, size=4))
+    batch2 = _ids(claim_batch(db, second.id, size=4))
+
+    assert batch1 == applicants[:4]
+    assert batch2 == applicants[4:]
+    assert claim_batch(db, second.id, size=4, after_id=applicants[-1]) == []
+
+
+def test_repeated_claim_keeps_own_batch(db, applicants, admins):
+    first, _ = admins
+
+    batch = _ids(claim_batch(db, first.id, size=3, after_id=applicants[1]))
+
+    assert _ids(claim_batch(db, first.id, size=3)) == batch  # свои заявки идут первыми
+    assert _ids(held_batch(db, first.id)) == batch
+
+
+def test_expired_lease_is_claimed_again(db, applicants, admins):
+    first, second = admins
+    claim_batch(db, first.id, size=2)
+    db.query(User).filter(User.review_claimed_by_id == first.id).update(
+        {User.review_claim_expires_at: datetime.utcnow() - timedelta(minutes=1)}
+    )
+    db.commit()
+
+    assert held_batch(db, first.id) == []
+    assert _ids(claim_batch(db, second.id, size=2)) == applicants[:2]
+
+
+def test_decide_applies_only_to_own_claims(db, applicants, admins):
+    first, second = admins
+    db.add(UploadedFile(key="passports/a.jpg", filename="a.jpg", owner_id=applicants[0]))
+    db.commit()
+    claim_batch(db, first.id, size=2)
+
+    # чужие и ещё не взятые заявки не меняются
+    assert decide(db, second.id, applicants[:3], "approved") == []
+    assert decide(db, first.id, applicants[:3], "approved") == applicants[:2]
+
+    db.expire_all()
+    statuses = {u.id: u.verification_status for u in db.query(User).filter(User.id.in_(applicants[:3]))}
+    assert statuses == {applicants[0]: "approved", applicants[1]: "approved", applicants[2]: "pending"}
+    assert db.query(UploadedFile).one().status == "approved"
+    assert decide(db, first.id, applicants[:2], "rejected", "повтор") == []  # уже решены
+
+
+def test_review_page_does_not_claim(client, db, applicants, admins, login):
+    first, _ = admins
+    login(first)
+
+    response = client.get("/admin/review")
+
+    assert response.status_code == 200
+    assert 'action="/admin/review/claim"' in response.text
+    assert held_batch(db, first.id) == []
+
+
+def test_claim_is_post_and_page_shows_held(client, db, applicants, admins, login):
+    first, _ = admins
+    login(first)
+
+    response = client.post("/admin/review/claim", data={"size": 2}, follow_redirects=False)
+    assert response.status_code == 302
+
+    page = client.get(response.headers["location"])
+    assert _ids(held_batch(db, first.id)) == applicants[:2]
+    assert f'value="{applicants[0]}"' in page.text and f'value="{applicants[2]}"' not in page.text
+
+
+def test_next_releases_and_claims_following(client, db, applicants, admins, login):
+    first, _ = admins
+    login(first)
+    client.post("/admin/review/claim", data={"size": 2})
+
+    client.post("/admin/review/next", data={"after": applicants[1], "size": 2})
+
+    assert _ids(held_batch(db, first.id)) == applicants[2:4]
+
+
+class NoCallsStorage:
+    """Страница заявок не должна ходить в хранилище"""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"обращение к хранилищу: {name}")
+
+
+def test_review_page_reads_thumbnail_flag_without_storage(client, db, make_user, admins, login, monkeypatch):
+    first, _ = admins
+    users = [
+        make_user(f"thumb{n}@example.ru", verification_status="pending", passport_filename=f"passport_{n}.jpg")
+        for n in range(3)
+    ]
+    for n, user in enumerate(users):
+        db.add(UploadedFile(key=f"passports/passport_{n}.jpg", filename=f"passport_{n}.jpg",
+                            owner_id=user.id, thumbnail_ready=n != 1))
+    db.commit()
+    monkeypatch.setattr("app.storage._storage", NoCallsStorage())
+    login(first)
+    client.post("/admin/review/claim", data={"size": 3})
+
+    page = client.get("/admin/review").text
+
+    assert [f"/admin/passport/{u.id}/thumb" in page for u in users] == [True, False, True]
+
+
+def test_processing_marks_thumbnail_ready(db, make_user, monkeypatch, tmp_path):
+    from PIL import Image
+
+    from app.passport_processing import process_passport
+    from app.storage import LocalShardedStorage, passport_key
+
+    storage = LocalShardedStorage(str(tmp_path / "storage"))
+    monkeypatch.setattr("app.storage._storage", storage)
+    source = tmp_path / "scan.jpg"
+    Image.new("RGB", (800, 600), "white").save(source, "JPEG")
+    storage.put_object(passport_key("passport_9.jpg"), str(source))
+    owner = make_user(passport_filename="passport_9.jpg")
+    db.add(UploadedFile(key=passport_key("passport_9.jpg"), filename="passport_9.jpg", owner_id=owner.id))
+    db.commit()
+
+    assert process_passport("passport_9.jpg") is True
+
+    db.expire_all()
+    assert db.query(UploadedFile).one().thumbnail_ready is True
@@ -0,0 +1,95 @@
+import io
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.storage import LocalShardedStorage, S3Storage, Storage, passport_key
+
+
+class FakeS3Client:
+    """Бакеты в памяти: те вызовы boto3, которыми пользуется S3Storage"""
+
+    def __init__(self):
+        self.buckets = {"private": {}}
+
+    def _bucket(self, name: str) -> dict:
+        if name not in self.buckets:
+            raise ClientError({"Error": {"Code": "NoSuchBucket"}}, "Bucket")
+        return self.buckets[name]
+
+    def upload_file(self, filename: str, bucket: str, key: str) -> None:
+        with open(filename, "rb") as f:
+            self._bucket(bucket)[key] = f.read()
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        try:
+            return {"Body": io.BytesIO(self._bucket(Bucket)[Key])}
+        except KeyError:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        try:
+            return {"ContentLength": len(self._bucket(Bucket)[Key])}
+        except KeyError:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+
+    def delete_object(self, Bucket: str, Key: str) -> None:
+        self._bucket(Bucket).pop(Key, None)
+
+
+@pytest.fixture(params=["local", "s3"])
+def storage(request, tmp_path):
+    if request.param == "local":
+        return LocalShardedStorage(str(tmp_path / "root"))
+    return S3Storage("private", client=FakeS3Client())
+
+
+def _upload(tmp_path, content: bytes) -> str:
+    path = tmp_path / "upload.tmp"
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_put_get_head_delete(storage, tmp_path):
+    key = passport_key("passport_1.jpg")
+    source = _upload(tmp_path, b"jpeg-bytes")
+
+    storage.put_object(key, source)
+
+    assert not (tmp_path / "upload.tmp").exists()  # файл загрузки забран
+    assert storage.head_object(key) == len(b"jpeg-bytes")
+    assert storage.get_object(key).read() == b"jpeg-bytes"
+
+    storage.delete_object(key)
+    assert not storage.exists(key)
+    storage.delete_object(key)  # повторное удаление — не ошибка
+
+
+def test_missing_object(storage):
+    assert storage.head_object(passport_key("nope.jpg")) is None
+
+
+def test_local_storage_shards_and_rejects_traversal(tmp_path):
+    storage = LocalShardedStorage(str(tmp_path))
+    storage.put_object("passports/a.jpg", _upload(tmp_path, b"x"))
+
+    path = storage.local_path("passports/a.jpg")
+    assert path.startswith(str(tmp_path)) and path.endswith("passports/a.jpg")
+    assert len(path[len(str(tmp_path)):].strip("/").split("/")) == 4  # ab/cd/passports/a.jpg
+    with pytest.raises(ValueError):
+        storage.local_path("../etc/passwd")
+
+
+def test_incomplete_backend_fails_on_creation():
+    class WithoutDelete(Storage):
+        def put_object(self, key, source_path):
+            pass
+
+        def get_object(self, key):
+            pass
+
+        def head_object(self, key):
+            return None
+
+    with pytest.raises(TypeError, match="delete_object"):
+        WithoutDelete()
@@ -0,0 +1,28 @@
+import os
+import stat
+
+from jinja2 import FileSystemBytecodeCache
+
+from app.templating import create_environment
+
+
+def test_default_bytecode_cache_is_private():
+    cache = create_environment(bytecode_cache_dir=None).bytecode_cache
+
+    assert isinstance(cache, FileSystemBytecodeCache)
+    info = os.stat(cache.directory)
+    assert info.st_uid == os.getuid()
+    assert stat.S_IMODE(info.st_mode) == 0o700
+
+
+def test_explicit_bytecode_cache_dir_is_created_private(tmp_path):
+    directory = tmp_path / "jinja"
+    env = create_environment(bytecode_cache_dir=str(directory))
+    env.get_template("policy.html")
+
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    assert os.listdir(directory)
+
+
+def test_empty_value_disables_bytecode_cache():
+    assert create_environment(bytecode_cache_dir="").bytecode_cache is None
@@ -0,0 +1,133 @@
+import asyncio
+import ipaddress
+
+import pytest
+from starlette.responses import PlainTextResponse
+
+from app import tracing
+from app.tracing import TracingMiddleware, parse_traceparent, span, to_otlp
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    traces = []
+    monkeypatch.setattr(tracing._exporter, "submit", traces.append)
+    return traces
+
+
+def _scope(traceparent: str = None, client: str = "203.0.113.7") -> dict:
+    headers = [(b"traceparent", traceparent.encode())] if traceparent else []
+    return {
+        "type": "http", "asgi": {"spec_version": "2.4"}, "method": "GET", "path": "/check",
+        "query_string": b"", "headers": headers, "client": (client, 50000),
+    }
+
+
+def _call(app, scope: dict) -> list:
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(TracingMiddleware(app)(scope, receive, send))
+    return messages
+
+
+@pytest.mark.parametrize("value, expected", [
+    (f"00-{TRACE_ID}-{PARENT_ID}-01", (TRACE_ID, PARENT_ID, True)),
+    (f"00-{TRACE_ID}-{PARENT_ID}-00", (TRACE_ID, PARENT_ID, False)),
+    (f" 00-{TRACE_ID}-{PARENT_ID}-03 ", (TRACE_ID, PARENT_ID, True)),
+    (f"00-{TRACE_ID.upper()}-{PARENT_ID}-01", None),
+    (f"01-{TRACE_ID}-{PARENT_ID}-01", None),
+    (f"00-{'0' * 32}-{PARENT_ID}-01", None),
+    (f"00-{TRACE_ID}-{'0' * 16}-01", None),
+    ("мусор", None),
+])
+def test_parse_traceparent(value, expected):
+    assert parse_traceparent(value) == expected
+
+
+@pytest.mark.parametrize("rate, sampled", [(0.0, False), (1.0, True)])
+def test_local_sampling_rate(monkeypatch, rate, sampled):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", rate)
+
+    decision = tracing._start_decision(_scope())
+
+    assert (decision is not None) is sampled
+    if sampled:
+        trace_id, parent_id = decision
+        assert len(trace_id) == 32 and parent_id is None
+
+
+def test_sampled_flag_from_untrusted_client_is_ignored(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(tracing, "TRACE_TRUSTED_NETS", (ipaddress.ip_network("10.0.0.0/8"),))
+
+    assert tracing._start_decision(_scope(f"00-{TRACE_ID}-{PARENT_ID}-01")) is None
+
+
+def test_sampled_flag_from_trusted_service_continues_trace(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(tracing, "TRACE_TRUSTED_NETS", (ipaddress.ip_network("10.0.0.0/8"),))
+
+    decision = tracing._start_decision(_scope(f"00-{TRACE_ID}-{PARENT_ID}-01", client="10.1.2.3"))
+
+    assert decision == (TRACE_ID, PARENT_ID)
+
+
+def test_locally_sampled_request_joins_incoming_trace(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+
+    assert tracing._start_decision(_scope(f"00-{TRACE_ID}-{PARENT_ID}-00")) == (TRACE_ID, PARENT_ID)
+
+
+def test_span_outside_request_is_noop(exported):
+    with span("bcrypt") as current:
+        current.set_attribute("rounds", 12)
+
+    assert current is tracing._NOOP
+    assert exported == []
+
+
+def test_middleware_records_root_and_child_spans(monkeypatch, exported):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+
+    async def app(scope, receive, send):
+        with span("bcrypt", {"rounds": 12}):
+            pass
+        with pytest.raises(ValueError):
+            with span("smtp"):
+                raise ValueError("нет соединения")
+        await PlainTextResponse("ok", status_code=503)(scope, receive, send)
+
+    messages = _call(app, _scope())
+
+    assert len(exported) == 1
+    bcrypt, smtp, root = exported[0]
+    trace_id = root.trace.trace_id
+    assert (b"x-trace-id", trace_id.encode()) in messages[0]["headers"]
+    assert root.parent_id is None and root.attributes["http.response.status_code"] == 503
+    assert root.status_code == tracing.STATUS_ERROR
+    assert bcrypt.parent_id == root.span_id and bcrypt.attributes == {"rounds": 12}
+    assert smtp.status_code == tracing.STATUS_ERROR and "нет соединения" in smtp.status_message
+    assert all(item.end_ns >= item.start_ns for item in exported[0])
+
+    otlp = to_otlp(exported[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [item["name"] for item in otlp] == ["bcrypt", "smtp", "GET"]
+    assert otlp[0]["parentSpanId"] == root.span_id and "parentSpanId" not in otlp[2]
+    assert otlp[0]["attributes"] == [{"key": "rounds", "value": {"intValue": "12"}}]
+
+
+def test_unsampled_request_is_not_traced(monkeypatch, exported):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0.0)
+
+    messages = _call(PlainTextResponse("ok"), _scope(f"00-{TRACE_ID}-{PARENT_ID}-01"))
+
+    assert exported == []
+    assert all(name != b"x-trace-id" for name, _ in messages[0]["headers"])
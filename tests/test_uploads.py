@@ -0,0 +1,191 @@
+import asyncio
+import os
+
+import pytest
+from starlette.requests import ClientDisconnect, Request
+
+from app import uploads
+from app.storage import STORAGE_TMP_DIR, LocalShardedStorage, get_storage, passport_key
+from app.uploads import UploadError, receive_upload
+
+BOUNDARY = "----truststaff-test"
+JPEG = b"\xff\xd8\xff\xe0" + b"j" * 500
+
+
+def _multipart(*parts) -> bytes:
+    """parts: (имя поля, значение) или (имя поля, имя файла, содержимое)"""
+    body = b""
+    for part in parts:
+        body += f"--{BOUNDARY}\r\n".encode()
+        if len(part) == 2:
+            name, value = part
+            body += f'Content-Disposition: form-data; name="{name}"\r\n\r\n'.encode() + value.encode()
+        else:
+            name, filename, content = part
+            body += (
+                f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                f"Content-Type: application/octet-stream\r\n\r\n"
+            ).encode() + content
+        body += b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+def _request(body: bytes, chunk_size: int = 7, disconnect_after: int = None, content_length: int = None) -> Request:
+    """Запрос, тело которого приходит кусками по chunk_size байт"""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": True}
+        for chunk in chunks[:disconnect_after]
+    ]
+    if disconnect_after is None:
+        messages.append({"type": "http.request", "body": b"", "more_body": False})
+    else:
+        messages.append({"type": "http.disconnect"})
+
+    async def receive():
+        return messages.pop(0)
+
+    headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]
+    headers.append((b"content-length", str(content_length or len(body)).encode()))
+    return Request({"type": "http", "method": "POST", "path": "/onboarding", "headers": headers}, receive)
+
+
+def _receive(request: Request):
+    return asyncio.run(receive_upload(request, "passport_file", lambda original: f"passport_1{os.path.splitext(original)[1]}"))
+
+
+def _tmp_files() -> list:
+    return os.listdir(STORAGE_TMP_DIR) if os.path.isdir(STORAGE_TMP_DIR) else []
+
+
+@pytest.fixture(autouse=True)
+def clean_storage():
+    get_storage().delete_object(passport_key("passport_1.jpg"))
+    yield
+    assert _tmp_files() == []  # временные файлы не остаются ни при успехе, ни при ошибке
+
+
+def test_streams_file_and_fields():
+    body = _multipart(("company_name", "ООО Ромашка"), ("passport_file", "scan.JPG", JPEG), ("city", "Москва"))
+
+    fields, filename = _receive(_request(body))
+
+    assert fields == {"company_name": "ООО Ромашка", "city": "Москва"}
+    assert filename == "passport_1.JPG"
+    assert get_storage().get_object(passport_key(filename)).read() == JPEG
+
+
+def test_rejects_file_over_size_limit(monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_SIZE", 200)
+    body = _multipart(("passport_file", "scan.jpg", JPEG))
+
+    with pytest.raises(UploadError, match="превышает"):
+        _receive(_request(body))
+    assert not get_storage().exists(passport_key("passport_1.jpg"))
+
+
+def test_rejects_by_content_length_before_reading():
+    body = _multipart(("passport_file", "scan.jpg", JPEG))
+    request = _request(body, content_length=uploads.MAX_UPLOAD_SIZE + uploads.MULTIPART_OVERHEAD + 1)
+
+    with pytest.raises(UploadError, match="превышает"):
+        _receive(request)
+
+
+def test_rejects_wrong_magic_bytes():
+    body = _multipart(("passport_file", "scan.png", JPEG))
+
+    with pytest.raises(UploadError, match="не соответствует"):
+        _receive(_request(body))
+
+
+def test_rejects_disallowed_extension():
+    body = _multipart(("passport_file", "scan.exe", JPEG))
+
+    with pytest.raises(UploadError, match="Недопустимый формат"):
+        _receive(_request(body))
+
+
+def test_removes_temp_file_on_client_disconnect():
+    body = _multipart(("passport_file", "scan.jpg", JPEG))
+
+    with pytest.raises(ClientDisconnect):
+        _receive(_request(body, chunk_size=64, disconnect_after=5))  # часть файла уже на диске
+    assert not get_storage().exists(passport_key("passport_1.jpg"))
+
+
+def test_removes_temp_file_on_error_after_file():
+    body = _multipart(("passport_file", "scan.jpg", JPEG), ("city", "М" * (uploads.MAX_FIELD_SIZE + 1)))
+
+    with pytest.raises(UploadError, match="Слишком длинное"):
+        _receive(_request(body))
+    assert not get_storage().exists(passport_key("passport_1.jpg"))
+
+
+@pytest.mark.parametrize("parts", [
+    [("avatar", "me.jpg", JPEG)],
+    [("passport_file", "scan.jpg", JPEG), ("passport_file", "scan2.jpg", JPEG)],
+])
+def test_rejects_unexpected_or_duplicate_file(parts):
+    with pytest.raises(UploadError, match="Неожиданный файл"):
+        _receive(_request(_multipart(*parts)))
+    assert not get_storage().exists(passport_key("passport_1.jpg"))
+
+
+def test_rejects_missing_file():
+    with pytest.raises(UploadError, match="Файл не передан"):
+        _receive(_request(_multipart(("company_name", "ООО Ромашка"))))
+
+
+def test_rejects_non_multipart():
+    request = _request(b"company_name=x")
+    request.scope["headers"] = [(b"content-type", b"application/x-www-form-urlencoded")]
+
+    with pytest.raises(UploadError, match="multipart"):
+        _receive(request)
+
+
+def test_onboarding_saves_request(client, db, make_user, login, monkeypatch):
+    from app.models import UploadedFile
+    from app.routes import onboarding
+
+    scheduled = []
+    monkeypatch.setattr(onboarding, "schedule_passport_processing", scheduled.append)
+    user = make_user(verification_status="not_requested")
+    login(user)
+
+    response = client.post(
+        "/onboarding",
+        data={"company_name": "ООО Ромашка", "city": "Москва", "inn_or_ogrn": "7700000000"},
+        files={"passport_file": ("scan.jpg", JPEG, "image/jpeg")},
+    )
+
+    assert response.status_code == 200
+    db.refresh(user)
+    assert user.verification_status == "pending"
+    assert scheduled == [user.passport_filename]
+    assert db.query(UploadedFile).filter(UploadedFile.owner_id == user.id).count() == 1
+    get_storage().delete_object(passport_key(user.passport_filename))
+
+
+def test_onboarding_deletes_file_when_fields_missing(client, make_user, login, monkeypatch, tmp_path):
+    deleted = []
+
+    class RecordingStorage(LocalShardedStorage):
+        def delete_object(self, key: str) -> None:
+            deleted.append(key)
+            super().delete_object(key)
+
+    storage = RecordingStorage(str(tmp_path))
+    monkeypatch.setattr("app.storage._storage", storage)
+    login(make_user(verification_status="not_requested"))
+
+    response = client.post(
+        "/onboarding",
+        data={"company_name": "ООО Ромашка", "city": "", "inn_or_ogrn": "7700000000"},
+        files={"passport_file": ("scan.jpg", JPEG, "image/jpeg")},
+    )
+
+    assert "Заполните все поля" in response.text
+    assert len(deleted) == 1 and deleted[0].startswith("passports/")
+    assert not storage.exists(deleted[0])
@@ -0,0 +1,54 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.models import Employee, ReputationRecord, User
+from app.routes.superadmin import set_users_blocked
+
+
+def _record(db, employer: User) -> ReputationRecord:
+    employee = Employee(full_name="Иванов Иван", birth_date=date(1990, 1, 1), created_by_user_id=employer.id)
+    db.add(employee)
+    db.flush()
+    record = ReputationRecord(
+        employee_id=employee.id, employer_id=employer.id, position="Кассир", hired_at=datetime(2023, 1, 1)
+    )
+    db.add(record)
+    db.commit()
+    return record
+
+
+def test_returns_changed_ids_and_copies_flag_to_records(db, make_user):
+    first, second = make_user("a@example.ru"), make_user("b@example.ru", is_blocked=True)
+    superadmin = make_user("root@example.ru", role="superadmin")
+    record = _record(db, first)
+
+    changed = set_users_blocked(db, [first.id, second.id, superadmin.id], True)
+    db.commit()
+
+    assert changed == [first.id]
+    db.refresh(record)
+    assert record.employer_blocked is True
+    assert db.get(User, superadmin.id).is_blocked is False
+
+
+def test_rollback_keeps_status_and_flag(db, make_user):
+    user = make_user()
+    record = _record(db, user)
+
+    set_users_blocked(db, [user.id], True)
+    db.rollback()
+
+    assert db.get(User, user.id).is_blocked is False
+    assert db.get(ReputationRecord, record.id).employer_blocked is False
+
+
+@pytest.mark.parametrize("role, checkboxes", [("admin", False), ("superadmin", True)])
+def test_bulk_checkboxes_only_for_superadmin(client, make_user, login, role, checkboxes):
+    make_user("employer@example.ru")
+    login(make_user("staff@example.ru", role=role))
+
+    response = client.get("/admin/users/list", params={"partial": "true"})
+
+    assert response.status_code == 200
+    assert ('name="user_ids"' in response.text) is checkboxes
@@ -0,0 +1,66 @@
+import pytest
+
+from app.user_search import SEARCH_RESULTS_LIMIT, search_users
+
+
+@pytest.fixture
+def users(make_user):
+    # SQLite lower() меняет регистр только у латиницы, поэтому названия латиницей
+    return {
+        "ivan": make_user("ivan.petrov@mail.ru", company_name="Romashka LLC", city="Kazan", inn_or_ogrn="7701234567"),
+        "maria": make_user("maria@yandex.ru", company_name="Vasilek", city="Moscow", inn_or_ogrn="7709876543"),
+        "percent": make_user("sale@shop.ru", company_name="100% Quality", city="Tver", inn_or_ogrn="5001112223"),
+        "underscore": make_user("a_b@shop.ru", company_name="Under_score", city="Omsk", inn_or_ogrn="5004445556"),
+        "plain": make_user("axb@shop.ru", company_name="Underxscore", city="Omsk", inn_or_ogrn="5007778889"),
+    }
+
+
+def _emails(db, query: str) -> set:
+    return {user.email for user in search_users(db, query)}
+
+
+def test_email_prefix(db, users):
+    assert _emails(db, "ivan") == {"ivan.petrov@mail.ru"}
+    assert _emails(db, "maria@") == {"maria@yandex.ru"}
+    assert _emails(db, "petrov@mail.ru") == set()  # только начало адреса
+
+
+def test_company_and_city_substring_case_insensitive(db, users):
+    assert _emails(db, "  ROMASH ") == {"ivan.petrov@mail.ru"}
+    assert _emails(db, "asilek") == {"maria@yandex.ru"}
+    assert _emails(db, "kaza") == {"ivan.petrov@mail.ru"}
+
+
+def test_digits_search_only_inn_prefix(db, users):
+    assert _emails(db, "770") == {"ivan.petrov@mail.ru", "maria@yandex.ru"}
+    assert _emails(db, "77012") == {"ivan.petrov@mail.ru"}
+    assert _emails(db, "1234567") == set()  # середина ИНН не ищется
+
+
+def test_like_wildcards_are_escaped(db, users):
+    assert _emails(db, "100%") == {"sale@shop.ru"}
+    assert _emails(db, "% qual") == {"sale@shop.ru"}
+    assert _emails(db, "a_b") == {"a_b@shop.ru"}  # «_» — не любой символ
+    assert _emails(db, "der_sc") == {"a_b@shop.ru"}
+    assert _emails(db, "%%") == set()
+    assert _emails(db, "__") == set()
+
+
+def test_short_query_returns_nothing(db, users):
+    assert search_users(db, "i") == []
+    assert search_users(db, "   ") == []
+
+
+def test_two_letters_search_only_email(db, users):
+    assert _emails(db, "om") == set()  # «om» есть в городах, но триграммы — от 3 символов
+    assert _emails(db, "ma") == {"maria@yandex.ru"}
+
+
+def test_results_are_limited_and_unique(db, make_user):
+    for n in range(SEARCH_RESULTS_LIMIT + 5):
+        make_user(f"shop{n}@example.ru", company_name="Shop", city="Shopino")
+
+    found = search_users(db, "shop")
+
+    assert len(found) == SEARCH_RESULTS_LIMIT
+    assert len({user.id for user in found}) == SEARCH_RESULTS_LIMIT